@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Vector search benchmark for the AI-native RAG Chatbot.
+
+Loads the book corpus from the local embedding store, uploads it to temporary
+Qdrant collections with different HNSW / on-disk / quantization settings and
+reports recall@k against exact search together with search latency for each
+configuration. Use it to choose the QDRANT_* settings and size the Qdrant node.
+
+Examples:
+    python benchmark_vector_search.py
+    python benchmark_vector_search.py --scale 20 --queries 500 --k 10
+    python benchmark_vector_search.py --questions eval_questions.txt
+"""
+import argparse
+import time
+import uuid
+import numpy as np
+from qdrant_client import QdrantClient, models
+from src.config.settings import settings
+from src.core.embedding_store import EmbeddingStore
+from src.core.gemini_client import GeminiClient
+from src.core.qdrant_client import build_quantization_config, build_search_params
+
+# (label, hnsw m, ef_construct, search ef, on-disk vectors, quantization, rescore, oversampling)
+DEFAULT_CONFIGS = [
+    ("float32 ef=32", 16, 100, 32, False, "none", False, 1.0),
+    ("float32 ef=128", 16, 100, 128, False, "none", False, 1.0),
+    ("float32 m=32 ef=128", 32, 200, 128, False, "none", False, 1.0),
+    ("on-disk ef=128", 16, 100, 128, True, "none", False, 1.0),
+    ("scalar", 16, 100, 128, True, "scalar", False, 1.0),
+    ("scalar+rescore", 16, 100, 128, True, "scalar", True, 2.0),
+    ("binary", 16, 100, 128, True, "binary", False, 1.0),
+    ("binary+rescore x2", 16, 100, 128, True, "binary", True, 2.0),
+    ("binary+rescore x4", 16, 100, 128, True, "binary", True, 4.0),
+]
+
+
+def load_corpus(scale: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """Load the normalized corpus matrix, optionally replicated with noise to emulate more books."""
+    data = EmbeddingStore(settings.embedding_store_path, settings.embedding_store_dtype).open()
+    if data is None or data['header']['count'] == 0:
+        raise SystemExit(f"No embeddings in {settings.embedding_store_path}; run the /embed endpoint first.")
+
+    corpus = np.asarray(data['vectors'], dtype=np.float32)
+    if scale > 1:
+        copies = [corpus] + [corpus + rng.normal(0, noise, corpus.shape).astype(np.float32) for _ in range(scale - 1)]
+        corpus = np.vstack(copies)
+    return corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+
+def load_queries(corpus: np.ndarray, args, rng: np.random.Generator) -> np.ndarray:
+    """Embed the questions file, or perturb random corpus vectors when no file is given."""
+    if args.questions:
+        with open(args.questions, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip()]
+        gemini_client = GeminiClient(settings.gemini_api_key)
+        queries = np.asarray(gemini_client.generate_embeddings(questions), dtype=np.float32)
+    else:
+        picks = rng.choice(corpus.shape[0], size=args.queries, replace=corpus.shape[0] < args.queries)
+        queries = corpus[picks] + rng.normal(0, args.noise, (args.queries, corpus.shape[1])).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int):
+    """Ground truth by brute force, plus the per-query latency of exact in-process search."""
+    start = time.perf_counter()
+    scores = queries @ corpus.T
+    top = np.argsort(-scores, axis=1)[:, :k]
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return [set(row.tolist()) for row in top], elapsed_ms
+
+
+def wait_until_indexed(client: QdrantClient, collection_name: str, timeout_seconds: float = 600):
+    """Wait for the optimizers to finish building the HNSW index."""
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+    raise TimeoutError(f"Collection {collection_name} was not indexed within {timeout_seconds} seconds")
+
+
+def benchmark_config(client: QdrantClient, config, corpus: np.ndarray, queries: np.ndarray, truth, k: int) -> dict:
+    """Build a temporary collection for one configuration and measure recall and latency."""
+    label, m, ef_construct, search_ef, on_disk, quantization, rescore, oversampling = config
+    collection_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(size=corpus.shape[1], distance=models.Distance.COSINE, on_disk=on_disk),
+        # Force an HNSW index even for a small corpus, as a large deployment would have
+        hnsw_config=models.HnswConfigDiff(m=m, ef_construct=ef_construct, full_scan_threshold=10),
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1),
+        quantization_config=build_quantization_config(quantization),
+    )
+    try:
+        client.upload_collection(
+            collection_name=collection_name,
+            vectors=corpus,
+            ids=list(range(corpus.shape[0])),
+            batch_size=256,
+            wait=True
+        )
+        wait_until_indexed(client, collection_name)
+
+        search_params = build_search_params(search_ef, quantization, rescore=rescore, oversampling=oversampling)
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = client.search(collection_name=collection_name, query_vector=query.tolist(), limit=k, search_params=search_params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(expected & {point.id for point in result})
+
+        return {
+            "label": label,
+            "recall": hits / (k * len(queries)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "mean_ms": float(np.mean(latencies))
+        }
+    finally:
+        client.delete_collection(collection_name)
+
+
+def main():
+    """Main function to run the benchmark and print the results table."""
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant index settings against exact search on the book corpus.")
+    parser.add_argument("--k", type=int, default=5, help="Results per query (recall@k)")
+    parser.add_argument("--queries", type=int, default=200, help="Synthetic queries when --questions is not given")
+    parser.add_argument("--questions", help="File with one question per line, embedded with Gemini")
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the corpus N times (with noise) to emulate more books")
+    parser.add_argument("--noise", type=float, default=0.02, help="Noise added to synthetic queries and corpus copies")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    corpus = load_corpus(args.scale, args.noise, rng)
+    queries = load_queries(corpus, args, rng)
+    truth, exact_ms = exact_top_k(corpus, queries, args.k)
+
+    print(f"Corpus: {corpus.shape[0]} vectors x {corpus.shape[1]} dims, {len(queries)} queries, k={args.k}")
+    print(f"Qdrant: {settings.qdrant_url}")
+    print()
+    print(f"{'configuration':<24}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    print(f"{'exact (numpy, batched)':<24}{1.0:>10.3f}{'':>10}{'':>10}{exact_ms:>10.3f}")
+
+    client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
+    for config in DEFAULT_CONFIGS:
+        result = benchmark_config(client, config, corpus, queries, truth, args.k)
+        print(f"{result['label']:<24}{result['recall']:>10.3f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['mean_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
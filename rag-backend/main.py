@@ -1,12 +1,19 @@
+import asyncio
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from src.config.settings import settings
 from src.core.qdrant_client import init_qdrant_client
 # TEMPORARILY DISABLED — RAG WILL BE RESTORED LATER
 # init_qdrant_client(settings.qdrant_url, settings.qdrant_api_key)
+from src.core import gemini_client as gc_module
 from src.core.gemini_client import init_gemini_client
+from src.core.embedding_cache import EmbeddingCache
+from src.core import postgres_client as pc_module
 from src.core.postgres_client import init_postgres_client
+from src.utils.observability import observability
+from src.utils.intent_router import intent_router
 import logging
 
 # Initialize logging
@@ -20,17 +27,78 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing clients...")
     # TEMPORARILY DISABLED — RAG WILL BE RESTORED LATER
     try:
-        init_qdrant_client(settings.qdrant_url, settings.qdrant_api_key)
+        init_qdrant_client(
+            settings.qdrant_url,
+            settings.qdrant_api_key,
+            upsert_batch_size=settings.qdrant_upsert_batch_size,
+            upsert_parallel=settings.qdrant_upsert_parallel,
+            upsert_wait=settings.qdrant_upsert_wait,
+            hnsw_m=settings.qdrant_hnsw_m,
+            hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
+            search_hnsw_ef=settings.qdrant_search_hnsw_ef,
+            on_disk_vectors=settings.qdrant_on_disk_vectors,
+            quantization=settings.qdrant_quantization,
+            quantization_always_ram=settings.qdrant_quantization_always_ram,
+            quantization_rescore=settings.qdrant_quantization_rescore,
+            quantization_oversampling=settings.qdrant_quantization_oversampling
+        )
     except Exception as e:
         logger.warning(f"Qdrant initialization failed: {e}. Running in fallback mode with local storage.")
-    init_gemini_client(settings.gemini_api_key)
-    init_postgres_client(settings.database_url)
+    init_gemini_client(
+        settings.gemini_api_key,
+        embedding_batch_size=settings.embedding_batch_size,
+        embedding_max_retries=settings.embedding_max_retries,
+        embedding_retry_backoff_seconds=settings.embedding_retry_backoff_seconds,
+        embedding_requests_per_minute=settings.embedding_requests_per_minute,
+        embedding_cache=(
+            EmbeddingCache(settings.embedding_cache_path, max_entries=settings.embedding_cache_max_entries)
+            if settings.embedding_cache_enabled else None
+        )
+    )
+    init_postgres_client(
+        settings.database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout_seconds=settings.db_pool_timeout_seconds,
+        pool_recycle_seconds=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        write_batch_size=settings.db_write_batch_size,
+        write_flush_interval_seconds=settings.db_write_flush_interval_seconds,
+        write_max_pending=settings.db_write_max_pending
+    )
     logger.info("Clients initialized successfully")
 
+    # Keep query_logs partitions ahead of time (and expired rows deleted if DB_RETENTION_HOURS is set)
+    maintenance_task = None
+    if settings.db_maintenance_interval_seconds > 0:
+        maintenance_task = asyncio.create_task(
+            retention_service.run_periodically(settings.db_maintenance_interval_seconds)
+        )
+
+    # Load indexes and open connections in the background; /ready reports when done
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(warmup_service.run(settings.warmup_retry_interval_seconds))
+    else:
+        warmup_service.disable()
+
     yield
 
-    # Cleanup when the app shuts down (if needed)
+    # Cleanup when the app shuts down: drain buffered database writes before closing the pools
     logger.info("Shutting down application...")
+    for task in (warmup_task, maintenance_task):
+        if task is None:
+            continue
+        # Wait for the task to stop so it does not use the pools while they are disposed
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Background task failed during shutdown: {str(e)}")
+    if pc_module.postgres_client is not None:
+        await pc_module.postgres_client.close()
 
 
 # Create FastAPI app with lifespan
@@ -65,6 +133,8 @@ from src.services.database_service import database_service
 from src.services.embedding_service import embedding_service
 from src.services.rag_service import rag_service
 from src.services.selected_text_service import selected_text_service
+from src.services.retention_service import retention_service
+from src.services.warmup_service import warmup_service
 
 
 @app.get("/")
@@ -77,5 +147,24 @@ async def health_check():
     return {"status": "healthy", "api": "rag-chatbot"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    # Liveness is /health; this only succeeds once the warm-up has loaded everything
+    readiness = warmup_service.status()
+    status_code = status.HTTP_200_OK if warmup_service.is_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=readiness)
+
+
+@app.get("/metrics")
+async def metrics():
+    gemini_client_instance = gc_module.gemini_client
+    return {
+        "embedding": gemini_client_instance.get_embedding_stats() if gemini_client_instance else None,
+        "database": pc_module.postgres_client.get_pool_stats() if pc_module.postgres_client else None,
+        "intents": intent_router.stats(),
+        **observability.get_stats()
+    }
+
+
 # Placeholder for routes until they are implemented
 # The actual route implementations will be added as we complete the respective tasks
\ No newline at end of file
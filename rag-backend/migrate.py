@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Database migration script for the AI-native RAG Chatbot.
+
+Creates the PostgreSQL schema. Run it once before starting the backend and
+again after upgrading; the server itself no longer touches the schema at startup.
+"""
+from src.config.settings import settings
+from src.core.postgres_client import PostgresClient
+
+
+def main():
+    """Main function to create the database schema."""
+    print("Creating database schema...")
+    postgres_client = PostgresClient(settings.database_url, pool_size=1, max_overflow=0)
+    try:
+        postgres_client.create_schema(partition_days_ahead=settings.db_partition_days_ahead)
+    finally:
+        postgres_client.engine.dispose()
+    print("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
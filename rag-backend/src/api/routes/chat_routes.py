@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import json
 from uuid import UUID
 import uuid
 from src.services.agent_service import agent_service
@@ -42,7 +44,7 @@ async def chat_endpoint(
         }
 
         # Process the request using the agent service
-        result = agent_service.process_user_request(request_data)
+        result = await agent_service.process_user_request(request_data)
 
         # Return the response with the session ID
         return ChatResponse(
@@ -53,4 +55,45 @@ async def chat_endpoint(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chat processing failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest
+):
+    """
+    Chat endpoint that streams the response as Server-Sent Events.
+
+    Emits a "sources" event first, then one "token" event per generated answer fragment,
+    and finally a "done" event carrying the session_id and mode used (or an "error" event).
+    Each event's data is JSON encoded.
+
+    Args:
+        request: ChatRequest containing the message and optional session_id
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    # Generate a new session ID if not provided
+    session_id = request.session_id or str(uuid.uuid4())
+
+    # Prepare data for the agent service
+    request_data = {
+        "question": request.message,
+        "session_id": session_id
+    }
+
+    async def event_stream():
+        async for event in agent_service.process_user_request_stream(request_data):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies (e.g. nginx) from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
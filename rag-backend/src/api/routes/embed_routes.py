@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from src.models.request_models import EmbedRequest, EmbedResponse
 from src.services.embedding_service import embedding_service
 
@@ -19,7 +20,8 @@ async def embed_book_content(
         EmbedResponse with status of the embedding process
     """
     try:
-        result = embedding_service.process_and_embed_book_content(request.book_content_path)
+        # The embedding job is long-running and synchronous; keep it off the event loop
+        result = await run_in_threadpool(embedding_service.process_and_embed_book_content, request.book_content_path)
 
         # Convert the result to EmbedResponse format
         response = EmbedResponse(
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from src.models.request_models import QueryRequest, QueryResponse
+from src.models.request_models import QueryRequest, QueryResponse, BatchQueryRequest, BatchQueryResponse
+from src.config.settings import settings
 from src.services.rag_service import rag_service
 # from src.api.middleware import get_current_user
 
@@ -22,7 +23,7 @@ async def query_book_content(
         QueryResponse with the answer and sources
     """
     try:
-        result = rag_service.answer_question_with_rag(
+        result = await rag_service.answer_question_with_rag(
             question=request.question,
             session_id=str(request.session_id)
         )
@@ -40,4 +41,40 @@ async def query_book_content(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Query process failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/batch", response_model=BatchQueryResponse)
+async def query_book_content_batch(
+    request: BatchQueryRequest,
+    # current_user: dict = Depends(get_current_user)
+):
+    """
+    Answer a batch of questions using RAG, e.g. for offline evaluation.
+    Questions are embedded and retrieved together and answered concurrently;
+    a question that fails gets an error entry instead of failing the batch.
+
+    Args:
+        request: BatchQueryRequest containing the questions and session ID
+
+    Returns:
+        BatchQueryResponse with one result per question, in request order
+    """
+    if not request.questions or len(request.questions) > settings.batch_query_max_questions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch must contain between 1 and {settings.batch_query_max_questions} questions"
+        )
+
+    try:
+        results = await rag_service.answer_questions_batch(
+            questions=request.questions,
+            session_id=str(request.session_id)
+        )
+
+        return BatchQueryResponse(results=results, session_id=request.session_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch query process failed: {str(e)}"
+        )
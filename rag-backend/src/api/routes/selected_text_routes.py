@@ -23,7 +23,7 @@ async def answer_from_selected_text(
         QueryResponse with the answer (sources will be empty in selected-text mode)
     """
     try:
-        result = selected_text_service.answer_from_selected_text(
+        result = await selected_text_service.answer_from_selected_text(
             question=request.question,
             selected_text=request.selected_text,
             session_id=str(request.session_id)
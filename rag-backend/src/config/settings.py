@@ -11,6 +11,65 @@ class Settings(BaseSettings):
     database_url: str
     debug: bool = False
     session_expiry_hours: int = 24  # Default session expiry time
+    embedding_store_path: str = "embedding_store"  # Directory of the binary embedding store
+    chapter_info_path: str = "chapter_info.json"  # Chapter catalog written by the embedding job
+    embedding_store_dtype: str = "float32"  # 'float32' or 'float16' on-disk vectors
+    embedding_batch_size: int = 100  # Texts per batch embedding call (API maximum is 100)
+    embedding_max_retries: int = 3  # Retries per embedding batch on transient errors
+    embedding_retry_backoff_seconds: float = 1.0  # Initial backoff, doubled on each retry
+    embedding_requests_per_minute: int = 1500  # Gemini embedding quota shared by all embedding threads (0: unlimited)
+    embedding_concurrency: int = 4  # Embedding batches in flight at once during book processing
+    index_summaries_enabled: bool = False  # Generate section, chapter and book summaries while processing the book
+    index_summary_concurrency: int = 4  # Summary generation calls in flight at once during book processing
+    embedding_cache_enabled: bool = True  # Consult the persistent embedding cache before calling Gemini
+    embedding_cache_path: str = "embedding_cache.sqlite3"  # SQLite file of the persistent embedding cache
+    embedding_cache_max_entries: int = 200000  # Entries kept in the persistent embedding cache before LRU pruning (0: unbounded)
+    query_embedding_cache_size: int = 1024  # Question embeddings kept in the in-process LRU cache
+    query_embedding_cache_ttl_seconds: int = 3600  # Lifetime of a cached question embedding
+    query_embedding_cache_shared: bool = False  # Also share question embeddings across workers via the persistent cache
+    answer_cache_enabled: bool = True  # Reuse answers for near-duplicate questions retrieving the same chunks
+    answer_cache_size: int = 512  # Answers kept in the semantic answer cache
+    answer_cache_similarity_threshold: float = 0.95  # Minimum question-embedding cosine similarity for a cache hit
+    text_answer_cache_ttl_seconds: int = 86400  # Lifetime of a cached book mentor answer, reused for the same normalized question
+    qdrant_upsert_batch_size: int = 256  # Points per Qdrant upload request
+    qdrant_upsert_parallel: int = 1  # Parallel upload workers (processes) for Qdrant
+    qdrant_upsert_wait: bool = False  # Wait for each batch to be applied; otherwise one barrier at the end
+    qdrant_hnsw_m: int = 16  # HNSW graph degree (higher: better recall, more memory)
+    qdrant_hnsw_ef_construct: int = 100  # HNSW candidate list size while building the index
+    qdrant_search_hnsw_ef: int = 128  # HNSW candidate list size at search time
+    qdrant_on_disk_vectors: bool = False  # Keep the original vectors on disk (memmapped) instead of RAM
+    qdrant_quantization: str = "none"  # 'none', 'scalar' (int8) or 'binary'
+    qdrant_quantization_always_ram: bool = True  # Keep quantized vectors in RAM when the originals are on disk
+    qdrant_quantization_rescore: bool = True  # Re-rank quantized candidates with the original vectors
+    qdrant_quantization_oversampling: float = 2.0  # Quantized candidates fetched per requested result before rescoring
+    retrieval_top_k: int = 5  # Chunks retrieved as context per question
+    chapter_context_max_chars: int = 16000  # Context budget of a chapter question; longer chapters are reranked against the question
+    hybrid_search_enabled: bool = True  # Fuse BM25 keyword results with vector results
+    hybrid_candidates: int = 20  # Results taken from each retriever before fusion
+    hybrid_rrf_k: int = 60  # Reciprocal rank fusion constant (higher: flatter rank weighting)
+    keyword_short_circuit_enabled: bool = True  # Retrieve short keyword questions with BM25 alone, skipping the embedding call
+    keyword_short_circuit_max_terms: int = 3  # Maximum distinctive terms of a short-circuited question
+    intent_prototypes_enabled: bool = True  # Classify questions the regexes leave to RAG by nearest intent prototype embedding
+    intent_prototype_threshold: float = 0.75  # Minimum prototype similarity for a non-RAG intent
+    intent_prototype_margin: float = 0.03  # Lead the intent needs over the closest RAG prototype
+    local_ann_threshold: int = 20000  # Local fallback index size from which searches use the IVF index (0: always exact)
+    local_ann_n_probe: int = 16  # IVF buckets scanned per local search (higher: better recall, slower)
+    batch_query_max_questions: int = 1000  # Maximum questions per /query/batch request
+    batch_query_concurrency: int = 8  # Generation calls in flight at once for a batch query
+    db_pool_size: int = 5  # Persistent connections per engine and worker process
+    db_max_overflow: int = 10  # Extra connections allowed above db_pool_size under bursts
+    db_pool_timeout_seconds: float = 30  # Maximum wait for a free connection before failing
+    db_pool_recycle_seconds: int = 1800  # Reopen connections older than this
+    db_pool_pre_ping: bool = True  # Test connections on checkout and replace dead ones
+    db_partition_days_ahead: int = 3  # Daily query_logs partitions created ahead of time
+    db_maintenance_interval_seconds: int = 3600  # Time between partition/retention runs (0 disables the job)
+    db_retention_hours: int = 0  # Age after which questions, query logs and expired sessions are deleted (0 keeps them)
+    db_write_batch_size: int = 200  # Buffered question/query-log rows that trigger a bulk insert
+    db_write_flush_interval_seconds: float = 1.0  # Maximum time a buffered row waits before being inserted
+    db_write_max_pending: int = 10000  # Buffered rows kept while the database is unreachable; more are dropped
+    warmup_enabled: bool = True  # Preload indexes and connections at startup; /ready fails until done
+    warmup_db_connections: int = 2  # Pooled connections opened per engine during warm-up
+    warmup_retry_interval_seconds: float = 10  # Time between retries of failed required warm-up steps
 
 
 settings = Settings()
\ No newline at end of file
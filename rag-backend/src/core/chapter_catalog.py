@@ -0,0 +1,259 @@
+import os
+import re
+import json
+import difflib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+FRONT_MATTER_PATTERN = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.DOTALL)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# "Chapter 5: Robot Locomotion", "Chapter 1 - Part 1"
+CHAPTER_HEADING_PATTERN = re.compile(r"^chapter\s+(\d+)\s*[:.\-–—]?\s*(.*)$", re.IGNORECASE)
+SECTION_NUMBER_PATTERN = re.compile(r"^\d+(?:\.\d+)*\.?\s+")
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+MARKDOWN_EMPHASIS_PATTERN = re.compile(r"[*_`]+")
+TERM_PATTERN = re.compile(r"[a-z0-9]+")
+
+NUMBER_WORDS = {
+    word: number
+    for number, words in enumerate([
+        ("zero",), ("one", "first"), ("two", "second"), ("three", "third"), ("four", "fourth"),
+        ("five", "fifth"), ("six", "sixth"), ("seven", "seventh"), ("eight", "eighth"), ("nine", "ninth"),
+        ("ten", "tenth"), ("eleven", "eleventh"), ("twelve", "twelfth"), ("thirteen", "thirteenth"),
+        ("fourteen", "fourteenth"), ("fifteen", "fifteenth"), ("sixteen", "sixteenth"),
+        ("seventeen", "seventeenth"), ("eighteen", "eighteenth"), ("nineteen", "nineteenth"),
+        ("twenty", "twentieth"),
+    ])
+    for word in words
+}
+
+# Words of a chapter reference that say nothing about which chapter it is
+IGNORED_TERMS = frozenset(["the", "a", "an", "on", "about", "of", "and", "in", "for", "chapter"])
+
+
+def describe_chapter(content: str, title: str, summary_sentences: int = 3) -> Dict[str, Any]:
+    """
+    Extract the catalog entry fields of a chapter from its markdown.
+
+    Args:
+        content: The chapter markdown
+        title: The chapter title (file name stem), e.g. '05-robot-locomotion'
+        summary_sentences: Maximum sentences of the extractive summary
+
+    Returns:
+        Dict with 'number' (None if the chapter is not numbered), 'heading' (the
+        chapter's display title), 'summary' (the opening sentences of its first
+        paragraph) and 'sections' (its section headings)
+    """
+    lines = FRONT_MATTER_PATTERN.sub("", content, count=1).splitlines()
+
+    heading = None
+    sections = []
+    paragraphs: List[List[str]] = []
+    current: List[str] = []
+    for line in lines:
+        stripped = line.strip()
+        match = HEADING_PATTERN.match(stripped)
+        if match or not stripped:
+            if current:
+                paragraphs.append(current)
+                current = []
+            if match:
+                text = MARKDOWN_EMPHASIS_PATTERN.sub("", match.group(2)).strip()
+                if heading is None:
+                    heading = text
+                elif text.lower() != "overview":
+                    sections.append(SECTION_NUMBER_PATTERN.sub("", text))
+            continue
+        current.append(stripped)
+    if current:
+        paragraphs.append(current)
+
+    number = None
+    heading_match = CHAPTER_HEADING_PATTERN.match(heading or "")
+    if heading_match:
+        number = int(heading_match.group(1))
+        heading = heading_match.group(2) or heading
+    else:
+        prefix = re.match(r"^(\d+)", title)
+        if prefix:
+            number = int(prefix.group(1))
+
+    summary = ""
+    for paragraph in paragraphs:
+        text = MARKDOWN_EMPHASIS_PATTERN.sub("", " ".join(paragraph))
+        if not text.startswith(("|", ">", "-", "!", "<")):
+            summary = " ".join(SENTENCE_END_PATTERN.split(text)[:summary_sentences])
+            break
+
+    return {
+        'number': number,
+        'heading': heading or title,
+        'summary': summary,
+        'sections': sections
+    }
+
+
+def split_sections(content: str) -> List[Tuple[str, str]]:
+    """
+    Split a chapter's markdown into its sections.
+
+    Args:
+        content: The chapter markdown
+
+    Returns:
+        List of (section heading, section text) in order; text before the first
+        section heading is returned under the chapter heading
+    """
+    lines = FRONT_MATTER_PATTERN.sub("", content, count=1).splitlines()
+
+    sections: List[Tuple[str, List[str]]] = []
+    chapter_heading = None
+    for line in lines:
+        match = HEADING_PATTERN.match(line.strip())
+        if match:
+            text = MARKDOWN_EMPHASIS_PATTERN.sub("", match.group(2)).strip()
+            if chapter_heading is None:
+                chapter_heading = text
+                sections.append((text, []))
+            else:
+                sections.append((SECTION_NUMBER_PATTERN.sub("", text), []))
+            continue
+        if not sections:
+            sections.append(("", []))
+        sections[-1][1].append(line)
+
+    return [(title, "\n".join(body).strip()) for title, body in sections if "".join(body).strip()]
+
+
+class ChapterCatalog:
+    """
+    Resident index of the book's chapters, built from the chapter list written by
+    the embedding job.
+
+    The list is loaded once and reloaded whenever the file changes, so a re-embed
+    is picked up without a restart. Chapters are resolved by number ("chapter 5",
+    "chapter five") through a number map, or by a fuzzy match of the reference
+    against the words of their titles ("locomotion", "locomotoin"); a title match
+    only resolves when one chapter clearly scores best.
+    """
+
+    def __init__(self, path: str, min_title_score: float = 0.8, min_title_margin: float = 0.1):
+        """
+        Initialize the catalog.
+
+        Args:
+            path: The chapter list JSON file
+            min_title_score: Minimum fuzzy title match score (0-1) for a reference to resolve
+            min_title_margin: Minimum lead of the best title match over the next chapter's
+        """
+        self.path = path
+        self.min_title_score = min_title_score
+        self.min_title_margin = min_title_margin
+        self._lock = threading.Lock()
+        # (file signature, chapters, number -> chapter, per-chapter title terms)
+        self._snapshot: Tuple[Optional[Tuple[int, int]], List[dict], Dict[int, dict], List[List[str]]] = (None, [], {}, [])
+
+    def _signature(self) -> Tuple[int, int]:
+        """Return (mtime, size) of the chapter list; raises FileNotFoundError if absent."""
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _current(self) -> Tuple[List[dict], Dict[int, dict], List[List[str]]]:
+        """Return the resident catalog, reloading it if the file changed."""
+        signature = self._signature()
+        loaded_signature, chapters, by_number, title_terms = self._snapshot
+        if signature == loaded_signature:
+            return chapters, by_number, title_terms
+
+        with self._lock:
+            signature = self._signature()
+            if signature != self._snapshot[0]:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    chapters = json.load(f)
+                by_number = {}
+                for chapter in chapters:
+                    if chapter.get('number') is not None:
+                        by_number.setdefault(chapter['number'], chapter)
+                title_terms = [
+                    [term for term in TERM_PATTERN.findall(f"{chapter['title']} {chapter.get('heading', '')}".lower())
+                     if term not in IGNORED_TERMS]
+                    for chapter in chapters
+                ]
+                self._snapshot = (signature, chapters, by_number, title_terms)
+                logger.info(f"Loaded chapter catalog with {len(chapters)} chapters")
+            return self._snapshot[1], self._snapshot[2], self._snapshot[3]
+
+    def chapters(self) -> List[dict]:
+        """
+        Get every chapter, in book order.
+
+        Raises:
+            FileNotFoundError: If the book has not been embedded yet
+        """
+        return self._current()[0]
+
+    def numbered_chapters(self) -> List[dict]:
+        """Get the numbered chapters in number order, falling back to every chapter if none is numbered."""
+        chapters, by_number, _ = self._current()
+        if not by_number:
+            return chapters
+        return [by_number[number] for number in sorted(by_number)]
+
+    def __len__(self) -> int:
+        return len(self.chapters())
+
+    def find(self, reference: str) -> Optional[dict]:
+        """
+        Resolve a chapter reference.
+
+        Args:
+            reference: A chapter number ("5"), number word ("five", "fifth"), file
+                       name ("05-robot-locomotion") or title words ("locomotion")
+
+        Returns:
+            The chapter entry, or None if nothing matches well enough or several
+            chapters match about as well ("robot")
+
+        Raises:
+            FileNotFoundError: If the book has not been embedded yet
+        """
+        chapters, by_number, title_terms = self._current()
+        normalized = reference.strip().lower()
+        if normalized.isdigit():
+            return by_number.get(int(normalized))
+        if normalized in NUMBER_WORDS:
+            return by_number.get(NUMBER_WORDS[normalized])
+
+        for chapter in chapters:
+            if normalized in (chapter['title'].lower(), chapter.get('heading', '').lower()):
+                return chapter
+
+        reference_terms = [term for term in TERM_PATTERN.findall(normalized) if term not in IGNORED_TERMS]
+        if not reference_terms:
+            return None
+
+        best_chapter, best_score, runner_up_score = None, 0.0, 0.0
+        for chapter, terms in zip(chapters, title_terms):
+            score = sum(self._term_score(term, terms) for term in reference_terms) / len(reference_terms)
+            if score > best_score:
+                best_chapter, best_score, runner_up_score = chapter, score, best_score
+            elif score > runner_up_score:
+                runner_up_score = score
+        if best_score < self.min_title_score or best_score - runner_up_score < self.min_title_margin:
+            return None
+        return best_chapter
+
+    @staticmethod
+    def _term_score(term: str, title_terms: List[str]) -> float:
+        """Score how well one reference word matches a chapter title: exact, prefix, then close spelling."""
+        if term in title_terms:
+            return 1.0
+        if len(term) >= 3 and any(title_term.startswith(term) for title_term in title_terms):
+            return 0.9
+        close = difflib.get_close_matches(term, title_terms, n=1, cutoff=0.8)
+        return difflib.SequenceMatcher(None, term, close[0]).ratio() if close else 0.0
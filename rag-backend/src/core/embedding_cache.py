@@ -0,0 +1,159 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, List
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stay well below SQLite's bound-parameter limit
+_MAX_KEYS_PER_QUERY = 500
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, on-disk embedding cache backed by SQLite.
+
+    Entries are keyed by a SHA-256 of model name + task type + text and hold the
+    vector as a float32 blob. The database runs in WAL mode so every worker
+    process on the host can read and write it concurrently.
+
+    The cache is bounded: every entry records when it was last read or written,
+    and once max_entries is exceeded the least recently used entries are deleted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: The SQLite file
+            max_entries: Entries kept before the least recently used ones are pruned (0: unbounded)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._prune_lock = threading.Lock()
+        # Entries written since the size was last checked; checked on the first write
+        self._writes_since_prune = self._prune_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+            "accessed REAL NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(embeddings)").fetchall()]
+        if "accessed" not in columns:
+            # Caches created before pruning existed; their entries are pruned first
+            connection.execute("ALTER TABLE embeddings ADD COLUMN accessed REAL NOT NULL DEFAULT 0")
+        connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)")
+
+    @property
+    def _prune_interval(self) -> int:
+        """Entries written between two size checks: a tenth of the bound."""
+        return max(1, self.max_entries // 10)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        """Build the cache key for a text embedded with the given model and task type."""
+        return hashlib.sha256(f"{model}\x00{task_type}\x00{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Look up several keys at once.
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Dictionary of the keys that were found, mapped to their vectors
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+            batch = keys[start:start + _MAX_KEYS_PER_QUERY]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+
+        if found and self.max_entries > 0:
+            hits = list(found)
+            with connection:
+                connection.execute("BEGIN")
+                for start in range(0, len(hits), _MAX_KEYS_PER_QUERY):
+                    batch = hits[start:start + _MAX_KEYS_PER_QUERY]
+                    placeholders = ",".join("?" * len(batch))
+                    connection.execute(
+                        f"UPDATE embeddings SET accessed = ? WHERE key IN ({placeholders})", [time.time(), *batch]
+                    )
+        return found
+
+    def put_many(self, entries: Dict[str, List[float]]):
+        """
+        Store several vectors at once.
+
+        Args:
+            entries: Cache keys mapped to their vectors
+        """
+        if not entries:
+            return
+        now = time.time()
+        rows = [
+            (key, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in entries.items()
+        ]
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, accessed) VALUES (?, ?, ?, ?)", rows
+            )
+
+        if self.max_entries > 0:
+            with self._prune_lock:
+                self._writes_since_prune += len(rows)
+                if self._writes_since_prune < self._prune_interval:
+                    return
+                self._writes_since_prune = 0
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Delete the least recently used entries beyond max_entries.
+
+        Returns:
+            Number of entries deleted
+        """
+        if self.max_entries <= 0:
+            return 0
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            count = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            connection.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY accessed LIMIT ?)", (excess,)
+            )
+        logger.info(f"Pruned {excess} least recently used entries from the embedding cache")
+        return excess
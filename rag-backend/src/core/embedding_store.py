@@ -0,0 +1,183 @@
+import os
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """
+    Binary on-disk store for chunk embeddings.
+
+    Layout inside the storage directory:
+        header.json          - format version, shape, dtype and the active generation
+        vectors-<gen>.npy    - (count, dim) matrix of L2-normalized embeddings
+        chunks-<gen>.json    - compact chunk metadata sidecar (no vectors), row-aligned
+
+    The matrix is opened with np.load(mmap_mode='r') so every worker process shares
+    the same page-cache pages and startup needs no parsing. Writers produce a new
+    generation and swap header.json atomically last, so readers never observe a
+    half-written store.
+    """
+
+    FORMAT_VERSION = 1
+    SUPPORTED_DTYPES = ("float32", "float16")
+
+    def __init__(self, storage_dir: str, dtype: str = "float32"):
+        if dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {dtype}. Must be one of: {self.SUPPORTED_DTYPES}")
+        self.storage_dir = storage_dir
+        self.dtype = dtype
+        self.header_path = os.path.join(storage_dir, "header.json")
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime, size) of the header, which changes on every write; None if absent."""
+        try:
+            stat = os.stat(self.header_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def exists(self) -> bool:
+        """Check whether a store has been written."""
+        return os.path.exists(self.header_path)
+
+    def read_header(self) -> Optional[Dict[str, Any]]:
+        """Read the store header, or None if the store has not been written."""
+        try:
+            with open(self.header_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write(self, chunks: List[dict]) -> Dict[str, Any]:
+        """
+        Write a new generation of the store.
+
+        Args:
+            chunks: Chunk dictionaries, each with an 'embedding_vector'
+
+        Returns:
+            The header of the written generation
+        """
+        os.makedirs(self.storage_dir, exist_ok=True)
+        previous_header = self.read_header()
+
+        if chunks:
+            vectors = np.asarray([chunk['embedding_vector'] for chunk in chunks], dtype=np.float32).reshape(len(chunks), -1)
+        else:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+        metadata = [
+            {key: value for key, value in chunk.items() if key != 'embedding_vector'}
+            for chunk in chunks
+        ]
+
+        generation = uuid.uuid4().hex[:12]
+        vectors_file = f"vectors-{generation}.npy"
+        chunks_file = f"chunks-{generation}.json"
+
+        np.save(os.path.join(self.storage_dir, vectors_file), vectors.astype(self.dtype))
+        with open(os.path.join(self.storage_dir, chunks_file), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, separators=(',', ':'), default=str)
+
+        header = {
+            'format_version': self.FORMAT_VERSION,
+            'generation': generation,
+            'count': int(vectors.shape[0]),
+            'dim': int(vectors.shape[1]) if vectors.shape[0] else 0,
+            'dtype': self.dtype,
+            'normalized': True,
+            'vectors_file': vectors_file,
+            'chunks_file': chunks_file,
+            'created_at': datetime.now().isoformat()
+        }
+        tmp_header_path = f"{self.header_path}.{generation}.tmp"
+        with open(tmp_header_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_header_path, self.header_path)
+
+        # Keep the previous generation around for readers that opened the old header
+        keep = {vectors_file, chunks_file}
+        if previous_header:
+            keep.update({previous_header.get('vectors_file'), previous_header.get('chunks_file')})
+        self._prune_generations(keep)
+
+        logger.info(f"Embedding store generation {generation} written with {header['count']} vectors")
+        return header
+
+    def _prune_generations(self, keep: set):
+        """Delete the files of superseded generations."""
+        for name in os.listdir(self.storage_dir):
+            if not (name.startswith("vectors-") or name.startswith("chunks-")) or name in keep:
+                continue
+            try:
+                os.remove(os.path.join(self.storage_dir, name))
+            except OSError:
+                # Another process may still have the old matrix mapped (e.g. on Windows)
+                logger.debug(f"Could not remove superseded embedding store file {name}")
+
+    def open(self) -> Optional[Dict[str, Any]]:
+        """
+        Open the current generation.
+
+        Returns:
+            Dictionary with 'header', 'vectors' (read-only memmap) and 'chunks',
+            or None if the store has not been written
+        """
+        header = self.read_header()
+        if header is None:
+            return None
+
+        if header.get('format_version') != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding store format version: {header.get('format_version')}")
+
+        vectors = np.load(os.path.join(self.storage_dir, header['vectors_file']), mmap_mode='r')
+        with open(os.path.join(self.storage_dir, header['chunks_file']), 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+
+        return {
+            'header': header,
+            'vectors': vectors,
+            'chunks': chunks
+        }
+
+    def migrate_from_json(self, embeddings_path: str, chunks_path: str) -> int:
+        """
+        One-shot migration from the legacy embeddings_storage.json / chunks_storage.json pair.
+
+        Args:
+            embeddings_path: Path of the legacy embeddings JSON file
+            chunks_path: Path of the legacy chunks JSON file
+
+        Returns:
+            Number of migrated chunks (0 if there was nothing to migrate)
+        """
+        if not (os.path.exists(embeddings_path) and os.path.exists(chunks_path)):
+            return 0
+
+        with open(embeddings_path, 'r', encoding='utf-8') as f:
+            embeddings_data = json.load(f)
+        with open(chunks_path, 'r', encoding='utf-8') as f:
+            chunks_data = json.load(f)
+
+        embeddings = embeddings_data.get('embeddings', [])
+        count = min(len(embeddings), len(chunks_data))
+        if count == 0:
+            return 0
+
+        chunks = []
+        for chunk, embedding in zip(chunks_data[:count], embeddings[:count]):
+            chunk = dict(chunk)
+            chunk['embedding_vector'] = embedding
+            chunks.append(chunk)
+
+        self.write(chunks)
+        logger.info(f"Migrated {count} chunks from {embeddings_path} and {chunks_path} to {self.storage_dir}")
+        return count
@@ -1,40 +1,212 @@
 import google.generativeai as genai
-from typing import List, Optional
+from google.api_core import exceptions as google_exceptions
+from typing import List, Optional, Dict, Any, AsyncIterator
+from src.utils.observability import observability
+from src.utils.rate_limiter import TokenBucket
+from src.core.embedding_cache import EmbeddingCache
+import asyncio
+import random
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The batchEmbedContents API accepts at most 100 requests per call
+MAX_EMBEDDING_BATCH_SIZE = 100
+
+# Errors signalling that the quota is exhausted (HTTP 429)
+RATE_LIMIT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+)
+
+# Errors worth retrying: quota, overload and transport failures
+RETRYABLE_EMBEDDING_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
 
 class GeminiClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        embedding_model: str = "models/text-embedding-004",
+        embedding_batch_size: int = MAX_EMBEDDING_BATCH_SIZE,
+        embedding_max_retries: int = 3,
+        embedding_retry_backoff_seconds: float = 1.0,
+        embedding_requests_per_minute: int = 1500,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
         genai.configure(api_key=api_key)
         # Use gemini-2.5-flash which has better free tier availability and performance
         self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.embedding_model = embedding_model
+        self.embedding_batch_size = max(1, min(embedding_batch_size, MAX_EMBEDDING_BATCH_SIZE))
+        self.embedding_max_retries = embedding_max_retries
+        self.embedding_retry_backoff_seconds = embedding_retry_backoff_seconds
+        self.embedding_cache = embedding_cache
+        # Shared by every thread embedding through this client so the total rate stays within quota
+        self.embedding_rate_limiter = TokenBucket(
+            rate_per_second=embedding_requests_per_minute / 60.0,
+            capacity=max(1.0, embedding_requests_per_minute / 60.0)
+        )
 
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_document",
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[List[float]]:
         """
         Generate embeddings for the provided texts using Gemini API.
 
+        Texts already in the persistent embedding cache are served from it; the rest
+        are sent in batches through the batch embedding endpoint, each batch retried
+        with exponential backoff on transient errors, and then added to the cache.
+
         Args:
             texts: List of text strings to generate embeddings for
+            task_type: Gemini embedding task type
+            batch_size: Texts per API call (defaults to the configured batch size, max 100)
+            use_cache: Read and write the persistent embedding cache; disabled for one-off
+                       texts such as user questions, which would only grow the cache
 
         Returns:
-            List of embedding vectors (each vector is a list of floats)
+            List of embedding vectors (each vector is a list of floats), in input order
         """
-        embeddings = []
-        for text in texts:
+        batch_size = max(1, min(batch_size or self.embedding_batch_size, MAX_EMBEDDING_BATCH_SIZE))
+        embedding_cache = self.embedding_cache if use_cache else None
+
+        cached = {}
+        keys = []
+        if embedding_cache is not None:
+            keys = [EmbeddingCache.make_key(self.embedding_model, task_type, text) for text in texts]
+            try:
+                cached = embedding_cache.get_many(keys)
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed, calling the API for all texts: {str(e)}")
+            observability.increment("gemini_embedding_cache_hits", sum(1 for key in keys if key in cached))
+
+        missing = [i for i in range(len(texts)) if not keys or keys[i] not in cached]
+        observability.increment("gemini_embedding_cache_misses", len(missing) if keys else 0)
+
+        fresh = []
+        for start in range(0, len(missing), batch_size):
+            fresh.extend(self._embed_batch([texts[i] for i in missing[start:start + batch_size]], task_type))
+
+        if embedding_cache is not None and fresh:
+            try:
+                embedding_cache.put_many({keys[i]: embedding for i, embedding in zip(missing, fresh)})
+            except Exception as e:
+                logger.warning(f"Failed to write embeddings to the cache: {str(e)}")
+
+        embeddings = [cached.get(keys[i]) if keys else None for i in range(len(texts))]
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = embedding
+
+        return embeddings
+
+    def _embed_batch(self, batch: List[str], task_type: str) -> List[List[float]]:
+        """Embed one batch of texts with a single API call, retrying transient failures."""
+        attempt = 0
+        while True:
+            self.embedding_rate_limiter.acquire()
+            start_time = time.time()
             try:
                 result = genai.embed_content(
-                    model="models/text-embedding-004",
-                    content=text,
-                    task_type="retrieval_document"
+                    model=self.embedding_model,
+                    content=batch,
+                    task_type=task_type
                 )
-                embeddings.append(result['embedding'])
+                embeddings = result['embedding']
+                if len(embeddings) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+
+                observability.increment("gemini_embedding_texts", len(batch))
+                observability.increment("gemini_embedding_batches")
+                observability.observe("gemini_embedding_batch_seconds", time.time() - start_time)
+                return embeddings
+            except RETRYABLE_EMBEDDING_ERRORS as e:
+                attempt += 1
+                if attempt > self.embedding_max_retries:
+                    observability.increment("gemini_embedding_failures")
+                    logger.error(f"Error generating embeddings for batch of {len(batch)} texts after {attempt} attempts: {str(e)}")
+                    raise e
+
+                delay = self.embedding_retry_backoff_seconds * (2 ** (attempt - 1)) * (1 + random.random() * 0.1)
+                observability.increment("gemini_embedding_retries")
+                if isinstance(e, RATE_LIMIT_ERRORS):
+                    # Quota exhausted: hold back every caller sharing the limiter, not just this one
+                    observability.increment("gemini_embedding_rate_limited")
+                    self.embedding_rate_limiter.pause(delay)
+                logger.warning(f"Embedding batch failed ({str(e)}), retrying in {delay:.1f}s (attempt {attempt}/{self.embedding_max_retries})")
+                time.sleep(delay)
             except Exception as e:
-                logger.error(f"Error generating embedding for text: {str(e)}")
+                observability.increment("gemini_embedding_failures")
+                logger.error(f"Error generating embeddings for batch of {len(batch)} texts: {str(e)}")
                 raise e
 
-        return embeddings
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """
+        Get embedding throughput statistics for this process.
+
+        Returns:
+            Dictionary with text, batch, retry and failure counts, total API time
+            and texts-per-second throughput
+        """
+        stats = observability.get_stats()
+        counters = stats["counters"]
+        batch_seconds = stats["summaries"].get("gemini_embedding_batch_seconds", {}).get("sum", 0.0)
+        texts = counters.get("gemini_embedding_texts", 0)
+
+        return {
+            "texts": texts,
+            "batches": counters.get("gemini_embedding_batches", 0),
+            "retries": counters.get("gemini_embedding_retries", 0),
+            "failures": counters.get("gemini_embedding_failures", 0),
+            "cache_hits": counters.get("gemini_embedding_cache_hits", 0),
+            "cache_misses": counters.get("gemini_embedding_cache_misses", 0),
+            "api_seconds": batch_seconds,
+            "texts_per_second": texts / batch_seconds if batch_seconds else 0.0
+        }
+
+    async def generate_embeddings_async(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_document",
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[List[float]]:
+        """
+        Async variant of generate_embeddings for use on the request path.
+
+        The google-generativeai SDK has no async embedding call, so the batched,
+        cached embedding path runs in a worker thread instead of blocking the event loop.
+
+        Args:
+            texts: List of text strings to generate embeddings for
+            task_type: Gemini embedding task type
+            batch_size: Texts per API call (defaults to the configured batch size, max 100)
+            use_cache: Read and write the persistent embedding cache
+
+        Returns:
+            List of embedding vectors (each vector is a list of floats), in input order
+        """
+        return await asyncio.to_thread(self.generate_embeddings, texts, task_type, batch_size, use_cache)
+
+    async def warm_up(self):
+        """
+        Make one small embedding call so the first request does not pay for the
+        client and connection setup. Bypasses the embedding cache on purpose.
+        """
+        await asyncio.to_thread(self._embed_batch, ["warm-up"], "retrieval_query")
 
     def generate_response(self, prompt: str) -> str:
         """
@@ -54,6 +226,44 @@ class GeminiClient:
             logger.error(f"Error generating response for prompt: {str(e)}")
             raise e
 
+    async def generate_response_async(self, prompt: str) -> str:
+        """
+        Generate a response to the given prompt using Gemini's async API.
+
+        Args:
+            prompt: The input text to generate a response for
+
+        Returns:
+            Generated response text
+        """
+        try:
+            response = await self.model.generate_content_async(prompt)
+            # This will raise a ValueError if the response is blocked.
+            return response.text
+        except Exception as e:
+            logger.error(f"Error generating response for prompt: {str(e)}")
+            raise e
+
+    async def generate_response_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a response to the given prompt as it is generated.
+
+        Args:
+            prompt: The input text to generate a response for
+
+        Yields:
+            Response text fragments in order
+        """
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                # Chunks without text (e.g. safety metadata only) are skipped
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Error streaming response for prompt: {str(e)}")
+            raise e
+
     def generate_response_with_context(self, question: str, context: List[str]) -> str:
         """
         Generate a response to a question using provided context.
@@ -89,7 +299,7 @@ class GeminiClient:
 gemini_client = None
 
 
-def init_gemini_client(api_key: str):
+def init_gemini_client(api_key: str, **client_options):
     """Initialize the global Gemini client instance."""
     global gemini_client
-    gemini_client = GeminiClient(api_key)
\ No newline at end of file
+    gemini_client = GeminiClient(api_key, **client_options)
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import tempfile
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from src.core.embedding_store import EmbeddingStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function words and question phrasing that carry no topical signal
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each explain few for from further had has have having he her here hers him his
+how i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out over own
+please same she should so some such tell than that the their theirs them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your yours describe
+""".split())
+
+
+class KeywordIndex:
+    """
+    BM25 inverted index over the chunk texts of the embedding store.
+
+    The index is persisted as keyword_index.json next to the embedding store
+    files, tagged with the store generation it was built from. Only the embedding
+    job writes it. A resident copy is reloaded whenever the store signature
+    changes; if the persisted index belongs to another generation, serving
+    processes build it in memory from the store's chunk texts instead.
+    """
+
+    FILE_NAME = "keyword_index.json"
+
+    def __init__(self, store: EmbeddingStore, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            store: The embedding store whose chunks are indexed
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.store = store
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        # (store signature, chunk metadata, postings, document lengths)
+        self._snapshot: Tuple[Optional[Tuple], List[dict], Dict[str, Tuple[np.ndarray, np.ndarray]], np.ndarray] = (
+            None, [], {}, np.zeros(0, dtype=np.float32)
+        )
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.store.storage_dir, self.FILE_NAME)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase alphanumeric tokens of text, without stopwords."""
+        return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+    def _build(self, chunks: List[dict]) -> Tuple[Dict[str, Tuple[List[int], List[int]]], List[int]]:
+        """Build the (postings, document lengths) of chunks, in store row order."""
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        doc_lengths = []
+        for row, chunk in enumerate(chunks):
+            tokens = self.tokenize(chunk.get('text_content') or "")
+            doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                rows, frequencies = postings.setdefault(term, ([], []))
+                rows.append(row)
+                frequencies.append(frequency)
+        return postings, doc_lengths
+
+    def write(self, chunks: List[dict], generation: str):
+        """
+        Build the index for a store generation and persist it atomically.
+
+        Args:
+            chunks: The chunks of the generation, in store row order
+            generation: The store generation the chunks were written as
+        """
+        postings, doc_lengths = self._build(chunks)
+
+        os.makedirs(self.store.storage_dir, exist_ok=True)
+        # A temporary file of its own, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{self.FILE_NAME}.", suffix=".tmp", dir=self.store.storage_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'generation': generation, 'doc_lengths': doc_lengths, 'postings': postings}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Keyword index written for generation {generation} with {len(postings)} terms")
+
+    def _load(self) -> Tuple[List[dict], Dict[str, Tuple[np.ndarray, np.ndarray]], np.ndarray]:
+        """Load the persisted index for the current store generation, building it in memory if stale."""
+        data = self.store.open()
+        if data is None:
+            return [], {}, np.zeros(0, dtype=np.float32)
+        generation = data['header']['generation']
+
+        persisted = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                persisted = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if persisted is None or persisted.get('generation') != generation:
+            # The embedding job writes the index for each generation; until it has, do not touch the file
+            logger.info(f"Keyword index is not current for generation {generation}, building it in memory")
+            postings, doc_lengths = self._build(data['chunks'])
+            persisted = {'postings': postings, 'doc_lengths': doc_lengths}
+
+        postings = {
+            term: (np.asarray(rows, dtype=np.int64), np.asarray(frequencies, dtype=np.float32))
+            for term, (rows, frequencies) in persisted['postings'].items()
+        }
+        return data['chunks'], postings, np.asarray(persisted['doc_lengths'], dtype=np.float32)
+
+    def _current(self) -> Tuple[List[dict], Dict[str, Tuple[np.ndarray, np.ndarray]], np.ndarray]:
+        """Return the resident index, reloading it if the store changed."""
+        signature = self.store.signature()
+        loaded_signature, chunks, postings, doc_lengths = self._snapshot
+        if signature is not None and signature == loaded_signature:
+            return chunks, postings, doc_lengths
+
+        with self._lock:
+            signature = self.store.signature()
+            if signature is None or signature != self._snapshot[0]:
+                try:
+                    chunks, postings, doc_lengths = self._load()
+                except Exception as e:
+                    # Not cached, so the next call retries
+                    logger.error(f"Could not load keyword index: {str(e)}")
+                    return [], {}, np.zeros(0, dtype=np.float32)
+                self._snapshot = (signature, chunks, postings, doc_lengths)
+            return self._snapshot[1], self._snapshot[2], self._snapshot[3]
+
+    def __len__(self) -> int:
+        """Number of indexed chunks."""
+        return len(self._current()[0])
+
+    def query_terms(self, question: str) -> List[str]:
+        """Distinct index terms of a question, in order of appearance."""
+        return list(dict.fromkeys(self.tokenize(question)))
+
+    def is_keyword_query(self, question: str, max_terms: int = 3, max_document_frequency: float = 0.1) -> bool:
+        """
+        Check whether lexical matching alone is reliable for a question.
+
+        True for short questions made only of distinctive terms that occur in the
+        book, e.g. "What is ZMP?" or "PID tuning".
+
+        Args:
+            question: The question text
+            max_terms: Maximum number of query terms
+            max_document_frequency: Maximum share of chunks a term may occur in
+
+        Returns:
+            True if the question is keyword-heavy
+        """
+        terms = self.query_terms(question)
+        if not terms or len(terms) > max_terms:
+            return False
+        chunks, postings, _ = self._current()
+        if not chunks:
+            return False
+        return all(term in postings and len(postings[term][0]) <= max_document_frequency * len(chunks) for term in terms)
+
+    def search(self, question: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Find the chunks with the highest BM25 score for a question.
+
+        Args:
+            question: The question text
+            top_k: Number of chunks to return
+            filters: Optional metadata values the chunks must match, e.g. {'source_file': 'intro.md'}
+
+        Returns:
+            List of chunk dictionaries ordered by descending BM25 'score'; chunks
+            sharing no term with the question are never returned
+        """
+        chunks, postings, doc_lengths = self._current()
+        terms = [term for term in self.query_terms(question) if term in postings]
+        if not terms or top_k <= 0:
+            return []
+
+        count = len(chunks)
+        average_length = float(doc_lengths.mean()) or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / average_length)
+        scores = np.zeros(count, dtype=np.float32)
+        for term in terms:
+            rows, frequencies = postings[term]
+            idf = np.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + length_norm[rows])
+
+        if filters:
+            for row in np.flatnonzero(scores):
+                if not all(chunks[row].get(field) == value for field, value in filters.items()):
+                    scores[row] = 0
+
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        k = min(top_k, matched.size)
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            chunk = dict(chunks[row])
+            chunk['score'] = float(scores[row])
+            results.append(chunk)
+        return results
@@ -1,9 +1,17 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, JSON, LargeBinary, ForeignKey
+from sqlalchemy import create_engine, event, inspect, text, Column, Index, Integer, String, DateTime, Text, JSON, LargeBinary, ForeignKey, Uuid
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy.sql import func
-from datetime import datetime
+from src.core.write_behind import WriteBehindBuffer
+from src.utils.observability import observability
+from contextlib import AsyncExitStack, ExitStack
+from datetime import datetime, date, timedelta
 from uuid import UUID, uuid4
+import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,19 +22,24 @@ Base = declarative_base()
 
 class QuestionDB(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_session_id_timestamp", "session_id", "timestamp"),
+        Index("ix_questions_timestamp", "timestamp"),
+        Index("ix_questions_mode", "mode"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
     text = Column(Text, nullable=False)
     mode = Column(String(20), nullable=False)  # 'RAG' or 'SELECTED_TEXT'
-    session_id = Column(String, nullable=False)  # Foreign key to ChatSession
-    timestamp = Column(DateTime, server_default=func.now())
+    session_id = Column(Uuid(as_uuid=False), nullable=False)  # Chat session UUID (anonymous sessions have no chat_sessions row)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False)
     source_metadata = Column(JSON)
 
 
 class DocumentChunkDB(Base):
     __tablename__ = "document_chunks"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
     text_content = Column(Text, nullable=False)
     chapter_title = Column(String(255), nullable=False)
     source_file = Column(String(255), nullable=False)
@@ -37,8 +50,11 @@ class DocumentChunkDB(Base):
 
 class ChatSessionDB(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_session_expiry", "session_expiry"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
     user_id = Column(String)  # Can be null for anonymous sessions
     session_start = Column(DateTime, server_default=func.now())
     session_end = Column(DateTime)
@@ -48,35 +64,272 @@ class ChatSessionDB(Base):
 
 class QueryLogDB(Base):
     __tablename__ = "query_logs"
+    __table_args__ = (
+        Index("ix_query_logs_question_id", "question_id"),
+        Index("ix_query_logs_timestamp", "timestamp"),
+        Index("ix_query_logs_mode_used", "mode_used"),
+        # One partition per day (see PostgresClient.ensure_query_log_partitions)
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    question_id = Column(String, nullable=False)  # Foreign key to Question
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    question_id = Column(Uuid(as_uuid=False), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     response_text = Column(Text, nullable=False)
     mode_used = Column(String(20), nullable=False)  # 'RAG' or 'SELECTED_TEXT'
     retrieved_chunks = Column(JSON)  # Store as JSON array of UUIDs
     response_time_ms = Column(Integer, nullable=False)
-    timestamp = Column(DateTime, server_default=func.now())
+    timestamp = Column(DateTime, server_default=func.now(), primary_key=True)  # Partition key, so part of the primary key
     user_satisfaction = Column(Integer)  # Optional rating, 1-5 scale
     quality_metrics = Column(JSON)  # Metrics about the quality of the response
 
 
+# Daily query_logs partitions are named query_logs_pYYYYMMDD; rows outside them land in the default partition
+QUERY_LOG_PARTITION_PREFIX = "query_logs_p"
+QUERY_LOG_DEFAULT_PARTITION = "query_logs_default"
+# Key of the advisory lock that keeps workers from running maintenance concurrently
+MAINTENANCE_LOCK_KEY = 724311
+
+UUID_PATTERN = "^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+
+
+class _InstrumentedPoolMixin:
+    """Records how long each connection checkout waits for a free (or new) connection."""
+
+    metrics_prefix = "db_pool"
+
+    def _do_get(self):
+        start_time = observability.start_timer()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            observability.increment(f"{self.metrics_prefix}_checkout_timeouts")
+            raise
+        finally:
+            observability.observe(f"{self.metrics_prefix}_checkout_wait_seconds", observability.stop_timer(start_time))
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics_prefix = "db_pool_sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_prefix = "db_pool_async"
+
+
+def _track_pool_usage(pool, metrics_prefix: str):
+    """Keep the in-use connection gauge of a pool up to date."""
+    # The checkin event fires before the connection is back in the pool, so count explicitly
+    lock = threading.Lock()
+    in_use = [0]
+
+    def on_checkout(*args):
+        with lock:
+            in_use[0] += 1
+            observability.set_gauge(f"{metrics_prefix}_in_use", in_use[0])
+
+    def on_checkin(*args):
+        with lock:
+            in_use[0] -= 1
+            observability.set_gauge(f"{metrics_prefix}_in_use", in_use[0])
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+
+
 class PostgresClient:
-    def __init__(self, database_url: str):
+    def __init__(
+        self,
+        database_url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout_seconds: float = 30,
+        pool_recycle_seconds: int = 1800,
+        pool_pre_ping: bool = True,
+        write_batch_size: int = 200,
+        write_flush_interval_seconds: float = 1.0,
+        write_max_pending: int = 10000
+    ):
         # Ensure we're using the psycopg driver for PostgreSQL
         if database_url.startswith("postgresql://"):
             # Replace with psycopg driver if needed
             if "+psycopg" not in database_url:
                 database_url = database_url.replace("postgresql://", "postgresql+psycopg://")
 
-        self.engine = create_engine(database_url)
+        # Bounded pools: pre-ping drops connections the server closed while idle and
+        # recycling retires them before managed Postgres / proxies time them out
+        pool_options = {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout_seconds,
+            'pool_recycle': pool_recycle_seconds,
+            'pool_pre_ping': pool_pre_ping
+        }
+        self.engine = create_engine(database_url, poolclass=InstrumentedQueuePool, **pool_options)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        self._create_tables()
+        # psycopg 3 serves both engines; the async one carries the write-behind inserts
+        self.async_engine = create_async_engine(database_url, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+        _track_pool_usage(self.engine.pool, InstrumentedQueuePool.metrics_prefix)
+        _track_pool_usage(self.async_engine.sync_engine.pool, InstrumentedAsyncQueuePool.metrics_prefix)
+        # Question and query-log rows are written off the request path, in bulk
+        self.write_behind = WriteBehindBuffer(
+            self.async_engine,
+            [QuestionDB.__table__, QueryLogDB.__table__],
+            batch_size=write_batch_size,
+            flush_interval_seconds=write_flush_interval_seconds,
+            max_pending=write_max_pending
+        )
+
+    def create_schema(self, partition_days_ahead: int = 3):
+        """
+        Create all tables in the database. Run by the migrate.py step, not at startup.
 
-    def _create_tables(self):
-        """Create all tables in the database."""
-        Base.metadata.create_all(bind=self.engine)
+        Databases created before query_logs was partitioned are upgraded in place: the old
+        questions/query_logs tables are renamed to *_legacy, recreated, and their rows copied
+        over (rows with non-UUID ids or session IDs are skipped). The legacy tables are kept
+        for inspection and can be dropped afterwards.
+
+        Args:
+            partition_days_ahead: Daily query_logs partitions to create beyond today
+        """
+        with self.engine.begin() as connection:
+            upgrading = self._rename_legacy_tables(connection)
+            self._convert_legacy_id_columns(connection)
+            Base.metadata.create_all(bind=connection)
+            self._create_query_log_partitions(connection, partition_days_ahead)
+            if upgrading:
+                self._copy_legacy_rows(connection)
         logger.info("PostgreSQL tables created successfully")
 
+    @staticmethod
+    def _rename_legacy_tables(connection) -> bool:
+        """Move an unpartitioned query_logs table (and its questions) out of the way."""
+        relkind = connection.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass('query_logs')")
+        ).scalar()
+        if relkind is None or relkind == 'p':
+            return False
+
+        for table_name in ("query_logs", "questions"):
+            connection.execute(text(f"ALTER TABLE {table_name} RENAME TO {table_name}_legacy"))
+            connection.execute(text(
+                f"ALTER TABLE {table_name}_legacy RENAME CONSTRAINT {table_name}_pkey TO {table_name}_legacy_pkey"
+            ))
+        logger.info("Renamed unpartitioned questions/query_logs tables to *_legacy")
+        return True
+
+    @staticmethod
+    def _convert_legacy_id_columns(connection):
+        """Switch the string id columns of older tables to native UUIDs."""
+        inspector = inspect(connection)
+        for table_name in ("chat_sessions", "document_chunks"):
+            if not inspector.has_table(table_name):
+                continue
+            id_column = next(column for column in inspector.get_columns(table_name) if column['name'] == 'id')
+            if isinstance(id_column['type'], String):
+                connection.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN id TYPE uuid USING id::uuid"))
+                logger.info(f"Converted {table_name}.id to uuid")
+
+    @staticmethod
+    def _copy_legacy_rows(connection):
+        """Copy rows from the *_legacy tables into the new schema."""
+        questions = connection.execute(text("""
+            INSERT INTO questions (id, text, mode, session_id, timestamp, source_metadata)
+            SELECT id::uuid, text, mode, session_id::uuid, COALESCE(timestamp, now()), source_metadata
+            FROM questions_legacy
+            WHERE id ~ :pattern AND session_id ~ :pattern
+        """), {"pattern": UUID_PATTERN}).rowcount
+        query_logs = connection.execute(text("""
+            INSERT INTO query_logs (id, question_id, response_text, mode_used, retrieved_chunks,
+                                    response_time_ms, timestamp, user_satisfaction, quality_metrics)
+            SELECT l.id::uuid, l.question_id::uuid, l.response_text, l.mode_used, l.retrieved_chunks,
+                   l.response_time_ms, COALESCE(l.timestamp, now()), l.user_satisfaction, l.quality_metrics
+            FROM query_logs_legacy l
+            JOIN questions q ON l.question_id ~ :pattern AND q.id = l.question_id::uuid
+            WHERE l.id ~ :pattern
+        """), {"pattern": UUID_PATTERN}).rowcount
+        logger.info(f"Copied {questions} questions and {query_logs} query logs from the legacy tables")
+
+    @staticmethod
+    def _create_query_log_partitions(connection, days_ahead: int):
+        """Create the default partition and the daily partitions from today to days_ahead."""
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {QUERY_LOG_DEFAULT_PARTITION} PARTITION OF query_logs DEFAULT"
+        ))
+        today = date.today()
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            try:
+                with connection.begin_nested():
+                    connection.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {QUERY_LOG_PARTITION_PREFIX}{day:%Y%m%d} PARTITION OF query_logs "
+                        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                    ))
+            except Exception as e:
+                # The default partition already holds rows for that day; they stay there
+                logger.warning(f"Could not create query_logs partition for {day.isoformat()}: {str(e)}")
+
+    def run_maintenance(self, retention_hours: int, partition_days_ahead: int = 3) -> dict:
+        """
+        Create upcoming query_logs partitions and delete data older than the retention window.
+
+        Whole daily partitions older than the window are dropped; remaining expired questions
+        are deleted (their query logs go with them through ON DELETE CASCADE), as are chat
+        sessions past their expiry. Only one worker runs this at a time; the others skip.
+
+        Args:
+            retention_hours: Age in hours after which questions, query logs and sessions are
+                             deleted; 0 deletes nothing and only creates partitions
+            partition_days_ahead: Daily query_logs partitions to keep created beyond today
+
+        Returns:
+            Dictionary with the dropped partitions and deleted row counts, or {'skipped': True}
+        """
+        cutoff = datetime.now() - timedelta(hours=retention_hours)
+
+        with self.engine.begin() as connection:
+            if not connection.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}).scalar():
+                return {'skipped': True}
+
+            self._create_query_log_partitions(connection, partition_days_ahead)
+            if retention_hours <= 0:
+                return {'dropped_partitions': [], 'deleted_questions': 0, 'deleted_sessions': 0}
+
+            partition_names = connection.execute(text("""
+                SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'query_logs'::regclass
+            """)).scalars().all()
+            dropped_partitions = []
+            for name in sorted(partition_names):
+                if not name.startswith(QUERY_LOG_PARTITION_PREFIX):
+                    continue
+                try:
+                    partition_end = datetime.strptime(name[len(QUERY_LOG_PARTITION_PREFIX):], "%Y%m%d") + timedelta(days=1)
+                except ValueError:
+                    continue
+                if partition_end <= cutoff:
+                    connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    dropped_partitions.append(name)
+
+            deleted_questions = connection.execute(
+                text("DELETE FROM questions WHERE timestamp < :cutoff"), {"cutoff": cutoff}
+            ).rowcount
+            deleted_sessions = connection.execute(
+                text("DELETE FROM chat_sessions WHERE session_expiry < :now"), {"now": datetime.now()}
+            ).rowcount
+
+        return {
+            'dropped_partitions': dropped_partitions,
+            'deleted_questions': deleted_questions,
+            'deleted_sessions': deleted_sessions
+        }
+
+    def get_pool_stats(self) -> dict:
+        """Get the current state of both connection pools."""
+        return {
+            "sync": self.engine.pool.status(),
+            "async": self.async_engine.sync_engine.pool.status()
+        }
+
     def get_session(self):
         """Get a new database session."""
         return self.SessionLocal()
@@ -150,6 +403,71 @@ class PostgresClient:
         finally:
             self.close_session(db_session)
 
+    def queue_question(self, question_data: dict) -> str:
+        """Queue a question for a bulk insert and return its client-generated id."""
+        # A row the database rejects would fail every batch it is flushed with
+        UUID(question_data['session_id'])
+        question_id = str(uuid4())
+        self.write_behind.add(QuestionDB.__table__, {
+            'id': question_id,
+            'text': question_data['text'],
+            'mode': question_data['mode'],
+            'session_id': question_data['session_id'],
+            'timestamp': datetime.now(),
+            'source_metadata': question_data.get('source_metadata')
+        })
+        return question_id
+
+    def queue_query_log(self, log_data: dict) -> str:
+        """Queue a query log for a bulk insert and return its client-generated id."""
+        log_id = str(uuid4())
+        self.write_behind.add(QueryLogDB.__table__, {
+            'id': log_id,
+            'question_id': log_data['question_id'],
+            'response_text': log_data['response_text'],
+            'mode_used': log_data['mode_used'],
+            'retrieved_chunks': log_data.get('retrieved_chunks', []),
+            'response_time_ms': log_data['response_time_ms'],
+            'timestamp': datetime.now(),
+            'user_satisfaction': log_data.get('user_satisfaction'),
+            'quality_metrics': log_data.get('quality_metrics')
+        })
+        return log_id
+
+    async def warm_up(self, connections: int = 1) -> int:
+        """
+        Open pooled connections ahead of the first requests.
+
+        The connections are held at the same time, so each pool keeps that many
+        distinct, already-connected connections when they are returned.
+
+        Args:
+            connections: Connections to open per engine (capped at the pool size)
+
+        Returns:
+            Number of connections opened per engine
+        """
+        connections = max(1, min(connections, self.engine.pool.size()))
+        async with AsyncExitStack() as stack:
+            for _ in range(connections):
+                connection = await stack.enter_async_context(self.async_engine.connect())
+                await connection.execute(text("SELECT 1"))
+        await asyncio.to_thread(self._warm_up_sync_pool, connections)
+        return connections
+
+    def _warm_up_sync_pool(self, connections: int):
+        """Open connections on the sync engine (see warm_up)."""
+        with ExitStack() as stack:
+            for _ in range(connections):
+                connection = stack.enter_context(self.engine.connect())
+                connection.execute(text("SELECT 1"))
+
+    async def close(self):
+        """Drain the write-behind buffer and dispose of both connection pools."""
+        await self.write_behind.close()
+        await self.async_engine.dispose()
+        self.engine.dispose()
+
     def update_chat_session(self, session_id: str, session_end: datetime):
         """Update a chat session with the end time."""
         db_session = self.get_session()
@@ -170,7 +488,7 @@ class PostgresClient:
 postgres_client = None
 
 
-def init_postgres_client(database_url: str):
+def init_postgres_client(database_url: str, **client_options):
     """Initialize the global Postgres client instance."""
     global postgres_client
-    postgres_client = PostgresClient(database_url)
\ No newline at end of file
+    postgres_client = PostgresClient(database_url, **client_options)
\ No newline at end of file
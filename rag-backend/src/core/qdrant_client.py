@@ -1,23 +1,98 @@
 # TEMPORARILY DISABLED — RAG WILL BE RESTORED LATER
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
 from qdrant_client.models import VectorParams, Distance
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Payload fields searches are filtered on; each gets a keyword index
+INDEXED_PAYLOAD_FIELDS = ("chapter_title", "source_file", "book_version")
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def build_quantization_config(quantization: str, always_ram: bool = True):
+    """
+    Build the collection quantization config for a quantization mode.
+
+    Args:
+        quantization: 'none', 'scalar' (int8, 4x smaller) or 'binary' (1 bit per dimension, 32x smaller)
+        always_ram: Keep the quantized vectors in RAM even when the originals are on disk
+
+    Returns:
+        The quantization config, or None for 'none'
+    """
+    if quantization == "none":
+        return None
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=always_ram)
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=always_ram))
+    raise ValueError(f"Unsupported quantization: {quantization}. Must be one of: {QUANTIZATION_MODES}")
+
+
+def build_search_params(hnsw_ef: int, quantization: str, rescore: bool = True, oversampling: float = 2.0) -> models.SearchParams:
+    """
+    Build the search-time parameters for a collection.
+
+    Args:
+        hnsw_ef: Size of the HNSW candidate list at search time (higher: better recall, slower)
+        quantization: Quantization mode of the collection
+        rescore: Re-rank the quantized candidates with the original vectors
+        oversampling: Fetch oversampling * limit quantized candidates before rescoring
+
+    Returns:
+        Search parameters to pass with every search request
+    """
+    quantization_params = None
+    if quantization != "none":
+        quantization_params = models.QuantizationSearchParams(ignore=False, rescore=rescore, oversampling=oversampling)
+    return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization_params)
+
+
 class QdrantChatbotClient:
-    def __init__(self, url: str, api_key: str):
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        upsert_batch_size: int = 256,
+        upsert_parallel: int = 1,
+        upsert_wait: bool = False,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 100,
+        search_hnsw_ef: int = 128,
+        on_disk_vectors: bool = False,
+        quantization: str = "none",
+        quantization_always_ram: bool = True,
+        quantization_rescore: bool = True,
+        quantization_oversampling: float = 2.0
+    ):
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_parallel = upsert_parallel
+        self.upsert_wait = upsert_wait
+        self.hnsw_config = models.HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+        self.on_disk_vectors = on_disk_vectors
+        self.quantization = quantization
+        self.quantization_config = build_quantization_config(quantization, always_ram=quantization_always_ram)
+        self.search_params = build_search_params(
+            search_hnsw_ef, quantization, rescore=quantization_rescore, oversampling=quantization_oversampling
+        )
         try:
             self.client = QdrantClient(url=url, api_key=api_key)
+            # Used on the request path so searches do not block the event loop
+            self.async_client = AsyncQdrantClient(url=url, api_key=api_key)
             self.collection_name = "document_chunks"
             self.embedding_dim = 768   # Gemini embeddings size
             self.is_available = True
             self._initialize_collection()
+            self._create_payload_indexes()
         except Exception as e:
             logger.error(f"Qdrant initialization failed: {e}")
             self.is_available = False
@@ -33,19 +108,79 @@ class QdrantChatbotClient:
                 vectors_config=VectorParams(
                     size=self.embedding_dim,
                     distance=Distance.COSINE,
+                    on_disk=self.on_disk_vectors,
                 ),
+                hnsw_config=self.hnsw_config,
+                quantization_config=self.quantization_config,
             )
             print(f"Qdrant collection '{self.collection_name}' created.")
         except UnexpectedResponse as e:
             if "already exists" in str(e):
                 print(f"Qdrant collection '{self.collection_name}' already exists. Skipping creation.")
+                self._update_index_config()
             else:
                 raise
 
+    def _update_index_config(self):
+        """Apply changed HNSW, on-disk and quantization settings to an existing collection."""
+        config = self.client.get_collection(self.collection_name).config
+        current_hnsw = config.hnsw_config
+        current_on_disk = bool(getattr(config.params.vectors, 'on_disk', False))
+        current_quantization = type(config.quantization_config).__name__ if config.quantization_config else None
+        wanted_quantization = type(self.quantization_config).__name__ if self.quantization_config else None
+
+        if (current_hnsw.m == self.hnsw_config.m
+                and current_hnsw.ef_construct == self.hnsw_config.ef_construct
+                and current_on_disk == self.on_disk_vectors
+                and current_quantization == wanted_quantization):
+            return
+
+        # Changing these makes Qdrant rebuild the index in the background; searches keep working
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            hnsw_config=self.hnsw_config,
+            vectors_config={"": models.VectorParamsDiff(on_disk=self.on_disk_vectors)},
+            quantization_config=self.quantization_config or models.Disabled.DISABLED
+        )
+        logger.info(
+            f"Updated Qdrant collection '{self.collection_name}' index config: "
+            f"m={self.hnsw_config.m}, ef_construct={self.hnsw_config.ef_construct}, "
+            f"on_disk={self.on_disk_vectors}, quantization={self.quantization}"
+        )
+
+    def _create_payload_indexes(self):
+        """Create keyword indexes on the filtered payload fields (a no-op if they exist)."""
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field_name in INDEXED_PAYLOAD_FIELDS:
+            if field_name in existing:
+                continue
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=models.PayloadSchemaType.KEYWORD,
+                wait=True
+            )
+            logger.info(f"Created Qdrant payload index on '{field_name}'")
+
+    @staticmethod
+    def _build_filter(filters: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+        """Turn {field: value} exact-match filters into a Qdrant filter."""
+        if not filters:
+            return None
+        return models.Filter(must=[
+            models.FieldCondition(key=field_name, match=models.MatchValue(value=value))
+            for field_name, value in filters.items()
+        ])
+
     def store_document_chunks(self, chunks: List[dict]):
         """
         Store document chunks in Qdrant.
 
+        Points are built lazily and uploaded in batches of upsert_batch_size by
+        upsert_parallel workers, so memory use does not grow with the corpus. Unless
+        upsert_wait is set, batches do not wait for the server to apply them; a final
+        waited write acts as a barrier, so every point is searchable on return.
+
         Args:
             chunks: List of dictionaries containing chunk data
                    Each dict should have: id, text_content, chapter_title, source_file, chunk_order, embedding_vector, book_version
@@ -53,36 +188,55 @@ class QdrantChatbotClient:
         if not self.is_available:
             logger.warning("Qdrant is not available. Skipping storage.")
             return
+        if not chunks:
+            return
 
-        points = []
-        for chunk in chunks:
-            point = models.PointStruct(
-                id=str(chunk['id']),
-                vector=chunk['embedding_vector'],
-                payload={
-                    "text_content": chunk['text_content'],
-                    "chapter_title": chunk['chapter_title'],
-                    "source_file": chunk['source_file'],
-                    "chunk_order": chunk['chunk_order'],
-                    "book_version": chunk['book_version']
-                }
-            )
-            points.append(point)
-
-        # Upload all points at once
-        self.client.upsert(
+        self.client.upload_records(
             collection_name=self.collection_name,
-            points=points
+            records=(self._chunk_to_record(chunk) for chunk in chunks),
+            batch_size=self.upsert_batch_size,
+            parallel=self.upsert_parallel,
+            wait=self.upsert_wait
         )
+
+        if not self.upsert_wait:
+            # Updates are applied in order, so once this waited write is applied all the batches before it are too
+            first = self._chunk_to_record(chunks[0])
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[models.PointStruct(id=first.id, vector=first.vector, payload=first.payload)],
+                wait=True
+            )
         logger.info(f"Stored {len(chunks)} document chunks in Qdrant")
 
-    def search_similar_chunks(self, query_vector: List[float], limit: int = 5) -> List[dict]:
+    @staticmethod
+    def _chunk_to_record(chunk: dict) -> models.Record:
+        """Convert a chunk dictionary to a Qdrant record."""
+        return models.Record(
+            id=str(chunk['id']),
+            vector=list(chunk['embedding_vector']),
+            payload={
+                "text_content": chunk['text_content'],
+                "chapter_title": chunk['chapter_title'],
+                "source_file": chunk['source_file'],
+                "chunk_order": chunk['chunk_order'],
+                "book_version": chunk['book_version']
+            }
+        )
+
+    async def search_similar_chunks(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[dict]:
         """
         Search for similar document chunks to the query vector.
 
         Args:
             query_vector: The embedding vector to search for similarity
             limit: Maximum number of results to return
+            filters: Optional payload values the chunks must match, e.g. {'book_version': '1.0'}
 
         Returns:
             List of dictionaries containing the similar chunks and their metadata
@@ -91,26 +245,162 @@ class QdrantChatbotClient:
             logger.warning("Qdrant is not available. Returning empty results.")
             return []
 
-        search_result = self.client.search(
+        search_result = await self.async_client.search(
             collection_name=self.collection_name,
             query_vector=query_vector,
+            query_filter=self._build_filter(filters),
+            search_params=self.search_params,
             limit=limit
         )
 
-        results = []
-        for hit in search_result:
-            chunk_data = {
-                "id": hit.id,
-                "text_content": hit.payload.get("text_content"),
-                "chapter_title": hit.payload.get("chapter_title"),
-                "source_file": hit.payload.get("source_file"),
-                "chunk_order": hit.payload.get("chunk_order"),
-                "book_version": hit.payload.get("book_version"),
-                "score": hit.score
-            }
-            results.append(chunk_data)
+        return [self._hit_to_chunk(hit) for hit in search_result]
+
+    async def search_similar_chunks_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[dict]]:
+        """
+        Search for the chunks similar to several query vectors in one request.
 
-        return results
+        Args:
+            query_vectors: The embedding vectors to search for similarity
+            limit: Maximum number of results to return per query
+            filters: Optional payload values the chunks must match (see search_similar_chunks)
+
+        Returns:
+            One result list per query vector, as returned by search_similar_chunks
+        """
+        if not self.is_available:
+            logger.warning("Qdrant is not available. Returning empty results.")
+            return [[] for _ in query_vectors]
+
+        query_filter = self._build_filter(filters)
+        search_results = await self.async_client.search_batch(
+            collection_name=self.collection_name,
+            requests=[
+                models.SearchRequest(
+                    vector=query_vector, filter=query_filter, params=self.search_params, limit=limit, with_payload=True
+                )
+                for query_vector in query_vectors
+            ]
+        )
+
+        return [[self._hit_to_chunk(hit) for hit in hits] for hits in search_results]
+
+    async def scroll_chunks(self, filters: Dict[str, Any], batch_size: int = 256) -> List[dict]:
+        """
+        Fetch every chunk matching payload filters, with its vector, without a similarity search.
+
+        Args:
+            filters: Payload values the chunks must match, e.g. {'source_file': 'intro.md'}
+            batch_size: Points fetched per scroll request
+
+        Returns:
+            List of chunk dictionaries (as returned by search_similar_chunks, without a
+            score) with their 'embedding_vector', in point id order
+        """
+        if not self.is_available:
+            logger.warning("Qdrant is not available. Returning empty results.")
+            return []
+
+        chunks = []
+        offset = None
+        scroll_filter = self._build_filter(filters)
+        while True:
+            records, offset = await self.async_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for record in records:
+                chunk = self._hit_to_chunk(record)
+                del chunk['score']
+                chunk['embedding_vector'] = record.vector
+                chunks.append(chunk)
+            if offset is None:
+                return chunks
+
+    def list_chunk_ids(self, filters: Dict[str, Any], batch_size: int = 1024) -> List[str]:
+        """
+        List the ids of every point matching payload filters, without payloads or vectors.
+
+        Args:
+            filters: Payload values the points must match, e.g. {'book_version': '1.0'}
+            batch_size: Points fetched per scroll request
+
+        Returns:
+            List of point ids as strings
+        """
+        if not self.is_available:
+            logger.warning("Qdrant is not available. Returning no chunk ids.")
+            return []
+
+        chunk_ids = []
+        offset = None
+        scroll_filter = self._build_filter(filters)
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            chunk_ids.extend(str(record.id) for record in records)
+            if offset is None:
+                return chunk_ids
+
+    @staticmethod
+    def _hit_to_chunk(hit) -> dict:
+        """Convert a Qdrant search hit (or scrolled record, which has no score) to a chunk dictionary."""
+        return {
+            "id": hit.id,
+            "text_content": hit.payload.get("text_content"),
+            "chapter_title": hit.payload.get("chapter_title"),
+            "source_file": hit.payload.get("source_file"),
+            "chunk_order": hit.payload.get("chunk_order"),
+            "book_version": hit.payload.get("book_version"),
+            "score": getattr(hit, 'score', None)
+        }
+
+    def delete_document_chunks(self, chunk_ids: List[str]):
+        """
+        Delete document chunks from Qdrant by id.
+
+        Ids are sent in requests of upsert_batch_size, so a large reindex stays within
+        the request size limits. Only the last request waits; updates are applied in
+        order, so every point is deleted on return.
+
+        Args:
+            chunk_ids: Ids of the chunks to delete
+        """
+        if not self.is_available:
+            logger.warning("Qdrant is not available. Skipping deletion.")
+            return
+
+        if not chunk_ids:
+            return
+
+        point_ids = [str(chunk_id) for chunk_id in chunk_ids]
+        for start in range(0, len(point_ids), self.upsert_batch_size):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=point_ids[start:start + self.upsert_batch_size]),
+                wait=start + self.upsert_batch_size >= len(point_ids)
+            )
+        logger.info(f"Deleted {len(chunk_ids)} document chunks from Qdrant")
+
+    async def warm_up(self):
+        """Open the async client's connection by fetching the collection info."""
+        if not self.is_available:
+            return
+        await self.async_client.get_collection(self.collection_name)
 
     def delete_collection(self):
         """Delete the entire collection (useful for testing/refreshing data)."""
@@ -122,7 +412,7 @@ class QdrantChatbotClient:
 qdrant_client = None
 
 
-def init_qdrant_client(url: str, api_key: str):
+def init_qdrant_client(url: str, api_key: str, **client_options):
     """Initialize the global Qdrant client instance."""
     global qdrant_client
-    qdrant_client = QdrantChatbotClient(url, api_key)
\ No newline at end of file
+    qdrant_client = QdrantChatbotClient(url, api_key, **client_options)
\ No newline at end of file
@@ -0,0 +1,221 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.core.embedding_store import EmbeddingStore
+from src.core.chapter_catalog import split_sections
+from src.utils.observability import observability
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+SECTION_SUMMARY_PROMPT = """
+Summarize the section "{title}" of {chapter} from the book "Physical AI and Robotics"
+in 2-3 sentences. Keep the key concepts and terms; do not add information that is not in the text.
+
+{text}
+"""
+
+CHAPTER_SUMMARY_PROMPT = """
+Write a one-paragraph summary (4-6 sentences) of {title} from the book "Physical AI and Robotics",
+based on the summaries of its sections below. Do not add information that is not in them.
+
+{text}
+"""
+
+BOOK_SUMMARY_PROMPT = """
+Write a one-paragraph overview (5-8 sentences) of the book "Physical AI and Robotics",
+based on the summaries of its chapters below. Do not add information that is not in them.
+
+{text}
+"""
+
+
+def content_hash(*parts: str) -> str:
+    """Hash identifying the content a summary was generated from."""
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+class SummaryIndex:
+    """
+    Hierarchical summaries of the book (section -> chapter -> book), persisted as
+    summaries.json next to the embedding store files.
+
+    Every summary is stored under the content hash of what it summarizes: a
+    section under its text, a chapter under its section hashes and the book under
+    its chapter hashes. A rebuild only generates summaries for changed content;
+    the resident copy is reloaded whenever the file changes.
+
+    Every chapter also records the SHA-256 of the file it was built from, and
+    lookups take the current hashes from the chapter catalog: when the book was
+    re-indexed without rebuilding the summaries (disabled, or the build failed),
+    the outdated summaries are not served.
+    """
+
+    FILE_NAME = "summaries.json"
+
+    def __init__(self, store: EmbeddingStore):
+        self.store = store
+        self._lock = threading.Lock()
+        # (file signature, persisted data)
+        self._snapshot: Tuple[Optional[Tuple[int, int]], Dict[str, Any]] = (None, {})
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.store.storage_dir, self.FILE_NAME)
+
+    def _read(self) -> Dict[str, Any]:
+        """Read the persisted summaries, or empty data if there are none."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _current(self) -> Dict[str, Any]:
+        """Return the resident summaries, reloading them if the file changed."""
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return {}
+        if signature == self._snapshot[0]:
+            return self._snapshot[1]
+
+        with self._lock:
+            if signature != self._snapshot[0]:
+                self._snapshot = (signature, self._read())
+            return self._snapshot[1]
+
+    def chapter_summary(self, path: str, source_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get the generated summaries of a chapter.
+
+        Args:
+            path: The chapter's source file, relative to the book content directory
+            source_hash: SHA-256 of the chapter's current content (its 'sha256' in the chapter catalog)
+
+        Returns:
+            Dict with 'summary' and 'sections' (list of {'title', 'summary'}), or None
+            if no summary was generated for the current content of the chapter
+        """
+        data = self._current()
+        chapter = data.get('chapters', {}).get(path)
+        summaries = data.get('summaries', {})
+        if chapter is None or chapter['hash'] not in summaries:
+            return None
+        if source_hash is None or chapter.get('source_hash') != source_hash:
+            observability.increment("summary_index_stale_lookups")
+            return None
+        return {
+            'summary': summaries[chapter['hash']],
+            'sections': [
+                {'title': section['title'], 'summary': summaries[section['hash']]}
+                for section in chapter['sections'] if section['hash'] in summaries
+            ]
+        }
+
+    def book_summary(self, source_hashes: Dict[str, Optional[str]]) -> Optional[str]:
+        """
+        Get the generated overview of the whole book.
+
+        Args:
+            source_hashes: Source file -> SHA-256 of the current content of every chapter
+
+        Returns:
+            The overview, or None if none was generated for the current chapters
+        """
+        data = self._current()
+        built_hashes = {path: chapter.get('source_hash') for path, chapter in data.get('chapters', {}).items()}
+        if built_hashes != source_hashes:
+            observability.increment("summary_index_stale_lookups")
+            return None
+        return data.get('summaries', {}).get(data.get('book'))
+
+    def build(
+        self,
+        chapters: List[Tuple[str, str, str]],
+        summarize: Callable[[str], str],
+        concurrency: int = 4
+    ) -> Dict[str, int]:
+        """
+        Generate the missing summaries and persist the summaries of the current book atomically.
+
+        Sections are summarized from their text, chapters from their section
+        summaries and the book from its chapter summaries. Summaries whose content
+        hash is unchanged are reused; a failed summary leaves its chapter (and the
+        book) without a summary until the next build.
+
+        Args:
+            chapters: (source file, display title, markdown) of every chapter, in book order
+            summarize: Generates the text for a prompt
+            concurrency: Generation calls in flight at once
+
+        Returns:
+            Dict with the number of 'generated', 'reused' and 'failed' summaries
+        """
+        previous = self._read().get('summaries', {})
+        summaries: Dict[str, str] = {}
+        stats = {'generated': 0, 'reused': 0, 'failed': 0}
+
+        def generate_level(prompts: Dict[str, str]):
+            """Fill summaries for {hash: prompt}, reusing previous ones and generating the rest in parallel."""
+            missing = {}
+            for key, prompt in prompts.items():
+                if key in previous:
+                    summaries[key] = previous[key]
+                    stats['reused'] += 1
+                else:
+                    missing[key] = prompt
+
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                futures = {key: executor.submit(summarize, prompt) for key, prompt in missing.items()}
+                for key, future in futures.items():
+                    try:
+                        summaries[key] = future.result().strip()
+                        stats['generated'] += 1
+                    except Exception as e:
+                        stats['failed'] += 1
+                        logger.warning(f"Summary generation failed: {str(e)}")
+
+        # Sections
+        tree = {}
+        section_prompts = {}
+        for path, title, content in chapters:
+            sections = []
+            for section_title, text in split_sections(content):
+                key = content_hash("section", title, section_title, text)
+                sections.append({'title': section_title, 'hash': key})
+                section_prompts[key] = SECTION_SUMMARY_PROMPT.format(title=section_title, chapter=title, text=text)
+            tree[path] = {
+                'title': title,
+                'hash': content_hash("chapter", title, *(s['hash'] for s in sections)),
+                'source_hash': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+                'sections': sections
+            }
+        generate_level(section_prompts)
+
+        # Chapters, once all their sections are summarized
+        chapter_prompts = {}
+        for chapter in tree.values():
+            if chapter['sections'] and all(section['hash'] in summaries for section in chapter['sections']):
+                section_summaries = "\n\n".join(f"{section['title']}: {summaries[section['hash']]}" for section in chapter['sections'])
+                chapter_prompts[chapter['hash']] = CHAPTER_SUMMARY_PROMPT.format(title=chapter['title'], text=section_summaries)
+        generate_level(chapter_prompts)
+
+        # The book, once every chapter is summarized
+        book_key = content_hash("book", *(chapter['hash'] for chapter in tree.values()))
+        if tree and all(chapter['hash'] in summaries for chapter in tree.values()):
+            chapter_summaries = "\n\n".join(f"{chapter['title']}: {summaries[chapter['hash']]}" for chapter in tree.values())
+            generate_level({book_key: BOOK_SUMMARY_PROMPT.format(text=chapter_summaries)})
+
+        os.makedirs(self.store.storage_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'book': book_key, 'chapters': tree, 'summaries': summaries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Summaries written: {stats}")
+        return stats
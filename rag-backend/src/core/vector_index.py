@@ -0,0 +1,366 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from src.utils.observability import observability
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate index over a normalized matrix.
+
+    Rows are bucketed by their nearest spherical k-means centroid; a query only
+    scores the rows of its n_probe nearest buckets, so the work per query is about
+    n_probe / n_lists of an exact scan.
+    """
+
+    def __init__(self, matrix: np.ndarray, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Train the centroids and build the inverted lists.
+
+        Args:
+            matrix: (count, dim) matrix of L2-normalized vectors
+            n_lists: Number of buckets; defaults to sqrt(count)
+            iterations: k-means iterations
+            seed: Seed of the training sample and initial centroids
+        """
+        count = matrix.shape[0]
+        self.n_lists = max(1, min(count, n_lists or int(np.sqrt(count))))
+        rng = np.random.default_rng(seed)
+
+        # Train on a sample; a few dozen rows per centroid is plenty
+        sample_size = min(count, 64 * self.n_lists)
+        sample = np.asarray(matrix[np.sort(rng.choice(count, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            centroids = self._update_centroids(sample, np.argmax(sample @ centroids.T, axis=1), centroids)
+        self.centroids = centroids
+
+        assignment = self._assign(matrix)
+        # Rows grouped by bucket; bucket l is rows[offsets[l]:offsets[l + 1]]
+        self.rows = np.argsort(assignment, kind='stable')
+        self.offsets = np.searchsorted(assignment[self.rows], np.arange(self.n_lists + 1))
+
+    @staticmethod
+    def _update_centroids(sample: np.ndarray, assignment: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Move each centroid to the normalized mean of its rows; empty buckets keep their centroid."""
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=len(centroids))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+
+        sums = centroids.copy()
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        np.divide(sums, norms, out=sums, where=norms > 0)
+        return sums
+
+    def _assign(self, matrix: np.ndarray, block_size: int = 8192) -> np.ndarray:
+        """Nearest centroid of every row, computed in blocks to bound memory."""
+        assignment = np.empty(matrix.shape[0], dtype=np.int64)
+        for start in range(0, matrix.shape[0], block_size):
+            block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+            assignment[start:start + block_size] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignment
+
+    def candidates(self, queries: np.ndarray, n_probe: int) -> List[np.ndarray]:
+        """
+        Rows of the n_probe buckets nearest to each query.
+
+        Args:
+            queries: (n, dim) matrix of normalized queries
+            n_probe: Buckets scanned per query
+
+        Returns:
+            One array of row numbers per query
+        """
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        return [
+            np.concatenate([self.rows[self.offsets[bucket]:self.offsets[bucket + 1]] for bucket in query_probes])
+            for query_probes in probes
+        ]
+
+
+class VectorIndex:
+    """
+    Resident cosine-similarity index over the locally stored chunk embeddings.
+
+    The embeddings are held as a pre-normalized matrix (the memory-mapped store
+    matrix itself when it is already normalized) so a query is scored with a
+    single matrix-vector product (a matrix-matrix product for a batch of queries). The index is reloaded only when the storage
+    signature changes.
+
+    Small corpora are always searched exactly. From ann_threshold chunks on, an
+    IVF index is built at load time and queries only score the rows of the
+    ann_n_probe nearest buckets.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, Any]],
+        signature: Callable[[], Optional[Tuple]],
+        ann_threshold: int = 20000,
+        ann_n_probe: int = 16
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            loader: Callable returning a dict with 'embeddings', 'normalized' and 'chunks'
+            signature: Callable returning a value that changes whenever the storage is rewritten,
+                       or None if nothing has been stored yet
+            ann_threshold: Chunk count from which searches use the IVF index (0 disables it)
+            ann_n_probe: IVF buckets scanned per query
+        """
+        self.loader = loader
+        self.signature = signature
+        self.ann_threshold = ann_threshold
+        self.ann_n_probe = ann_n_probe
+        self._lock = threading.Lock()
+        # (storage signature, normalized matrix, chunk metadata, IVF index), swapped atomically on reload
+        self._snapshot: Tuple[Optional[Tuple], Optional[np.ndarray], List[dict], Optional[IVFIndex]] = (None, None, [], None)
+        # Row numbers matching a payload filter, for the chunks of the current snapshot
+        self._filter_rows: Dict[Tuple, Tuple[List[dict], np.ndarray]] = {}
+        # Row numbers of every source file's chunks in chunk_order, for the chunks of the current snapshot
+        self._chapter_rows: Optional[Tuple[List[dict], Dict[str, np.ndarray]]] = None
+
+    def _build(self, data: Dict[str, Any]) -> Tuple[Optional[np.ndarray], List[dict]]:
+        """Build the normalized matrix and the matching chunk metadata."""
+        embeddings, chunks = data['embeddings'], data['chunks']
+        count = min(len(embeddings), len(chunks))
+        if count == 0:
+            return None, []
+
+        if data.get('normalized'):
+            # Use the stored matrix as-is; a memmap stays shared between workers
+            matrix = embeddings[:count]
+        else:
+            matrix = np.array(embeddings[:count], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+        # The vectors live in the matrix, so drop them from the resident metadata
+        metadata = [
+            {key: value for key, value in chunk.items() if key != 'embedding_vector'}
+            for chunk in chunks[:count]
+        ]
+        return matrix, metadata
+
+    def _build_ann(self, matrix: Optional[np.ndarray]) -> Optional[IVFIndex]:
+        """Build the IVF index when the corpus is at or above the ANN threshold."""
+        if matrix is None or self.ann_threshold <= 0 or matrix.shape[0] < self.ann_threshold:
+            return None
+        start_time = observability.start_timer()
+        ann = IVFIndex(matrix)
+        elapsed_time = observability.stop_timer(start_time)
+        observability.observe("vector_index_ann_build_seconds", elapsed_time)
+        logger.info(f"IVF index built over {matrix.shape[0]} chunks with {ann.n_lists} lists in {elapsed_time:.2f}s")
+        return ann
+
+    def _current(self) -> Tuple[Optional[np.ndarray], List[dict], Optional[IVFIndex]]:
+        """Return the current matrix, metadata and IVF index, reloading if the storage changed."""
+        signature = self.signature()
+        loaded_signature, matrix, chunks, ann = self._snapshot
+        if signature is not None and signature == loaded_signature:
+            return matrix, chunks, ann
+
+        with self._lock:
+            signature = self.signature()
+            if signature is None or signature != self._snapshot[0]:
+                # Record the signature read before loading so a concurrent rewrite triggers another reload
+                data = self.loader()
+                matrix, chunks = self._build(data)
+                self._snapshot = (signature, matrix, chunks, self._build_ann(matrix))
+                if chunks:
+                    logger.info(f"Vector index loaded with {len(chunks)} chunks")
+            return self._snapshot[1], self._snapshot[2], self._snapshot[3]
+
+    def invalidate(self):
+        """Force a reload on the next search."""
+        with self._lock:
+            self._snapshot = (None, None, [], None)
+            self._filter_rows = {}
+            self._chapter_rows = None
+
+    def __len__(self) -> int:
+        """Number of chunks in the current snapshot."""
+        return len(self._current()[1])
+
+    def _rows_matching(self, chunks: List[dict], filters: Dict[str, Any]) -> np.ndarray:
+        """Return the row numbers of the chunks whose metadata matches every filter value."""
+        key = tuple(sorted(filters.items()))
+        cached = self._filter_rows.get(key)
+        # The cache entry belongs to the chunk list it was computed from
+        if cached is not None and cached[0] is chunks:
+            return cached[1]
+
+        rows = np.fromiter(
+            (row for row, chunk in enumerate(chunks) if all(chunk.get(field) == value for field, value in filters.items())),
+            dtype=np.int64
+        )
+        if len(self._filter_rows) >= 256:
+            self._filter_rows = {}
+        self._filter_rows[key] = (chunks, rows)
+        return rows
+
+    def _rows_by_source_file(self, chunks: List[dict]) -> Dict[str, np.ndarray]:
+        """Return the row numbers of every source file's chunks, ordered by chunk_order."""
+        cached = self._chapter_rows
+        if cached is not None and cached[0] is chunks:
+            return cached[1]
+
+        grouped: Dict[str, List[int]] = {}
+        for row, chunk in enumerate(chunks):
+            grouped.setdefault(chunk.get('source_file'), []).append(row)
+        rows_by_file = {
+            source_file: np.asarray(sorted(rows, key=lambda row: chunks[row].get('chunk_order') or 0), dtype=np.int64)
+            for source_file, rows in grouped.items()
+        }
+        self._chapter_rows = (chunks, rows_by_file)
+        return rows_by_file
+
+    def chapter_chunks(self, source_file: str) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """
+        Get every chunk of a source file in reading order, without a similarity search.
+
+        Args:
+            source_file: The source file of the chunks, e.g. '05-robot-locomotion.md'
+
+        Returns:
+            Tuple of (chunk dictionaries ordered by chunk_order, their normalized
+            vectors as a row-aligned matrix, or None if the file has no chunks)
+        """
+        matrix, chunks, _ = self._current()
+        if matrix is None:
+            return [], None
+        rows = self._rows_by_source_file(chunks).get(source_file)
+        if rows is None:
+            return [], None
+        return [chunks[row].copy() for row in rows], np.asarray(matrix[rows], dtype=np.float32)
+
+    def search(self, query_embedding: List[float], top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Find the chunks most similar to the query embedding.
+
+        Args:
+            query_embedding: The embedding of the query
+            top_k: Number of top similar chunks to return
+            filters: Optional metadata values the chunks must match, e.g. {'source_file': 'intro.md'}
+
+        Returns:
+            List of chunk dictionaries ordered by descending similarity,
+            each with a 'score' key (cosine similarity, as returned by Qdrant)
+        """
+        return self.search_batch([query_embedding], top_k=top_k, filters=filters)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Find the most similar chunks for several queries with one matrix-matrix product.
+
+        Args:
+            query_embeddings: The embeddings of the queries
+            top_k: Number of top similar chunks to return per query
+            filters: Optional metadata values the chunks must match (see search)
+
+        Returns:
+            One result list per query, as returned by search
+        """
+        results: List[List[Dict]] = [[] for _ in query_embeddings]
+        matrix, chunks, ann = self._current()
+        if matrix is None or top_k <= 0 or not query_embeddings:
+            return results
+
+        # Restrict scoring to the matching rows instead of post-filtering the top k
+        rows = None
+        if filters:
+            rows = self._rows_matching(chunks, filters)
+            if rows.size == 0:
+                return results
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != matrix.shape[1]:
+            logger.warning(f"Query dimension {queries.shape[-1]} does not match index dimension {matrix.shape[1]}")
+            return results
+
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        valid = query_norms[:, 0] > 0
+        np.divide(queries, query_norms, out=queries, where=query_norms > 0)
+
+        # A filter matching few rows is cheaper to scan exactly than through the buckets
+        if ann is not None and (rows is None or rows.size >= self.ann_threshold):
+            observability.increment("vector_index_ann_searches", len(queries))
+            ranked = self._search_ann(ann, matrix, queries, top_k, rows)
+        else:
+            observability.increment("vector_index_exact_searches", len(queries))
+            ranked = self._search_exact(matrix, queries, top_k, rows)
+
+        for query_position in np.flatnonzero(valid):
+            for row, score in zip(*ranked[query_position]):
+                chunk = chunks[row].copy()
+                chunk['score'] = float(score)
+                results[query_position].append(chunk)
+
+        return results
+
+    @staticmethod
+    def _search_exact(
+        matrix: np.ndarray,
+        queries: np.ndarray,
+        top_k: int,
+        rows: Optional[np.ndarray]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score every (matching) row; returns (row numbers, scores) per query, best first."""
+        if rows is not None:
+            matrix = matrix[rows]
+
+        # (chunks, queries) score matrix
+        scores = matrix @ queries.T
+
+        k = min(top_k, scores.shape[0])
+        top_indices = np.argpartition(-scores, k - 1, axis=0)[:k]
+        ranked = []
+        for query_position in range(queries.shape[0]):
+            column = scores[:, query_position]
+            candidates = top_indices[:, query_position]
+            candidates = candidates[np.argsort(-column[candidates])]
+            ranked.append((candidates if rows is None else rows[candidates], column[candidates]))
+        return ranked
+
+    def _search_ann(
+        self,
+        ann: IVFIndex,
+        matrix: np.ndarray,
+        queries: np.ndarray,
+        top_k: int,
+        rows: Optional[np.ndarray]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score the rows of the nearest IVF buckets; returns (row numbers, scores) per query, best first."""
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(matrix.shape[0], dtype=bool)
+            allowed[rows] = True
+
+        ranked = []
+        for query, candidates in zip(queries, ann.candidates(queries, self.ann_n_probe)):
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            if candidates.size == 0:
+                ranked.append((candidates, np.zeros(0, dtype=np.float32)))
+                continue
+            # Gather in row order, which keeps memory-mapped reads sequential
+            candidates = np.sort(candidates)
+            scores = matrix[candidates] @ query
+            k = min(top_k, scores.shape[0])
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            ranked.append((candidates[top], scores[top]))
+        return ranked
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+from src.core.embedding_store import EmbeddingStore
+from src.core.vector_index import VectorIndex
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore(ABC):
+    """
+    Storage and similarity search of chunk embeddings.
+
+    Every backend takes chunk dictionaries with an 'embedding_vector' on upsert and
+    returns chunk dictionaries (id, text_content, chapter_title, source_file,
+    chunk_order, book_version) with a cosine 'score' from search, best first.
+    """
+
+    name = "vector_store"
+
+    @property
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether the backend can serve requests right now."""
+
+    @abstractmethod
+    def upsert(self, chunks: List[dict]):
+        """
+        Insert or replace chunks by id.
+
+        Args:
+            chunks: Chunk dictionaries, each with an 'id' and an 'embedding_vector'
+        """
+
+    @abstractmethod
+    def delete(self, chunk_ids: List[str]):
+        """
+        Delete chunks by id; unknown ids are ignored.
+
+        Args:
+            chunk_ids: Ids of the chunks to delete
+        """
+
+    @abstractmethod
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[dict]]:
+        """
+        Find the most similar chunks for several query vectors.
+
+        Args:
+            query_vectors: The embedding vectors to search for
+            limit: Maximum number of results per query
+            filters: Optional metadata values the chunks must match, e.g. {'source_file': 'intro.md'}
+
+        Returns:
+            One result list per query vector, ordered by descending 'score'
+        """
+
+    async def search(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[dict]:
+        """Find the most similar chunks for one query vector (see search_batch)."""
+        return (await self.search_batch([query_vector], limit=limit, filters=filters))[0]
+
+    @abstractmethod
+    async def chapter_chunks(self, source_file: str) -> List[dict]:
+        """
+        Get every chunk of a source file in reading order, without a similarity search.
+
+        Args:
+            source_file: The source file of the chunks, e.g. '05-robot-locomotion.md'
+
+        Returns:
+            Chunk dictionaries ordered by chunk_order, each with its 'embedding_vector'
+        """
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    Vector store backed by the Qdrant collection.
+
+    The collection may hold several book versions, so searches are restricted to
+    the current BOOK_VERSION.
+    """
+
+    name = "qdrant"
+
+    def __init__(self, client_getter: Callable[[], Any]):
+        """
+        Args:
+            client_getter: Callable returning the current QdrantChatbotClient, or None before
+                           it is initialized (the client is created in the application lifespan)
+        """
+        self.client_getter = client_getter
+
+    @property
+    def is_available(self) -> bool:
+        client = self.client_getter()
+        return client is not None and getattr(client, 'is_available', False)
+
+    def upsert(self, chunks: List[dict]):
+        if chunks:
+            self.client_getter().store_document_chunks(chunks)
+
+    def delete(self, chunk_ids: List[str]):
+        if chunk_ids:
+            self.client_getter().delete_document_chunks(chunk_ids)
+
+    def chunk_ids(self) -> List[str]:
+        """List the ids of every point of the current book version in the collection."""
+        return self.client_getter().list_chunk_ids({'book_version': os.getenv("BOOK_VERSION", "1.0")})
+
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[dict]]:
+        client = self.client_getter()
+        qdrant_filters = {'book_version': os.getenv("BOOK_VERSION", "1.0"), **(filters or {})}
+        if len(query_vectors) == 1:
+            return [await client.search_similar_chunks(query_vector=query_vectors[0], limit=limit, filters=qdrant_filters)]
+        return await client.search_similar_chunks_batch(query_vectors, limit=limit, filters=qdrant_filters)
+
+    async def chapter_chunks(self, source_file: str) -> List[dict]:
+        chunks = await self.client_getter().scroll_chunks(
+            {'book_version': os.getenv("BOOK_VERSION", "1.0"), 'source_file': source_file}
+        )
+        return sorted(chunks, key=lambda chunk: chunk.get('chunk_order') or 0)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store over the binary embedding store.
+
+    Searches go through a resident VectorIndex: exact for small corpora, IVF from
+    ann_threshold chunks on. The embedding store only ever holds the current book
+    version. Upserts and deletes write a new store generation, which every
+    worker's index picks up on its next search.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        loader: Callable[[], Dict[str, Any]],
+        ann_threshold: int = 20000,
+        ann_n_probe: int = 16
+    ):
+        """
+        Args:
+            store: The embedding store written by the embedding service
+            loader: Callable returning the store contents as a dict with 'embeddings', 'normalized'
+                    and 'chunks' (migrating legacy storage if needed)
+            ann_threshold: Chunk count from which searches use the IVF index (0 disables it)
+            ann_n_probe: IVF buckets scanned per query
+        """
+        self.store = store
+        self.index = VectorIndex(
+            loader=loader,
+            signature=store.signature,
+            ann_threshold=ann_threshold,
+            ann_n_probe=ann_n_probe
+        )
+        self._write_lock = threading.Lock()
+
+    @property
+    def is_available(self) -> bool:
+        return True
+
+    def _rewrite(self, update: Callable[[Dict[str, dict]], None]):
+        """Apply update to the {id: chunk} contents of the store and write a new generation."""
+        with self._write_lock:
+            data = self.store.open()
+            contents: Dict[str, dict] = {}
+            if data is not None:
+                for row, chunk in enumerate(data['chunks']):
+                    contents[chunk['id']] = {**chunk, 'embedding_vector': data['vectors'][row]}
+            update(contents)
+            self.store.write(list(contents.values()))
+        self.index.invalidate()
+
+    def upsert(self, chunks: List[dict]):
+        if chunks:
+            self._rewrite(lambda contents: contents.update({chunk['id']: chunk for chunk in chunks}))
+
+    def delete(self, chunk_ids: List[str]):
+        if not chunk_ids:
+            return
+
+        def remove(contents: Dict[str, dict]):
+            for chunk_id in chunk_ids:
+                contents.pop(chunk_id, None)
+
+        self._rewrite(remove)
+
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[dict]]:
+        # Book version filters are meaningless here: the store holds a single version
+        filters = {field: value for field, value in (filters or {}).items() if field != 'book_version'}
+        # The matrix product (and the first load or IVF build) runs off the event loop
+        return await asyncio.to_thread(self.index.search_batch, query_vectors, top_k=limit, filters=filters or None)
+
+    async def chapter_chunks(self, source_file: str) -> List[dict]:
+        chunks, vectors = await asyncio.to_thread(self.index.chapter_chunks, source_file)
+        for chunk, vector in zip(chunks, vectors if vectors is not None else []):
+            chunk['embedding_vector'] = vector
+        return chunks
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.utils.observability import observability
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Buffers rows in memory and inserts them in bulk from a background task.
+
+    Rows are flushed with multi-row INSERT ... VALUES statements of at most
+    batch_size rows, all tables in a single transaction and in the order given at
+    construction (so parent rows land before the rows referencing them). A flush
+    happens when batch_size rows are pending or every flush_interval_seconds,
+    whichever comes first. Adding a row never waits on the database: when
+    max_pending rows are already buffered (e.g. the database is down), new rows are
+    dropped and counted instead.
+
+    If the database rejects the data of a flush (e.g. a NUL byte in a text column
+    or a foreign key violation), the rows are retried in halving groups until the
+    rejected rows are isolated; those are dropped and counted so they cannot block
+    later flushes. Only connection-level failures put rows back in the buffer.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        tables: List[Table],
+        batch_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_pending: int = 10000
+    ):
+        self.engine = engine
+        self.tables = tables
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[str, List[Dict[str, Any]]] = {table.name: [] for table in tables}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+    def add(self, table: Table, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for insertion.
+
+        Args:
+            table: Table the row belongs to (one of the tables given at construction)
+            row: Column values; rows of the same table must have the same keys
+
+        Returns:
+            True if the row was queued, False if it was dropped because the buffer is full
+        """
+        with self._lock:
+            if self._closed or self._pending_count >= self.max_pending:
+                observability.increment("db_write_behind_rows_dropped")
+                return False
+            self._pending[table.name].append(row)
+            self._pending_count += 1
+            pending_count = self._pending_count
+
+        observability.set_gauge("db_write_behind_pending", pending_count)
+        self._ensure_started()
+        if pending_count >= self.batch_size and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def _ensure_started(self):
+        """Start the background flush task on the running event loop, if not started yet."""
+        if self._task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Rows added outside an event loop are flushed by the next flush() or close()
+            return
+        self._loop = loop
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        """Flush on the size threshold or the time interval until closed."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Failed rows were re-queued by flush(); try again on the next round
+                logger.error(f"Write-behind flush failed: {str(e)}")
+
+    @staticmethod
+    def _is_rejected_data(error: BaseException) -> bool:
+        """Whether an insert failed because of the rows themselves rather than the connection."""
+        return isinstance(error, (DataError, IntegrityError)) and not error.connection_invalidated
+
+    async def flush(self) -> int:
+        """
+        Insert every pending row.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            Exception: If the database cannot be reached; the unwritten rows are put back in the buffer first
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                row_count = self._pending_count
+                self._pending = {table.name: [] for table in self.tables}
+                self._pending_count = 0
+            if row_count == 0:
+                return 0
+
+            start_time = observability.start_timer()
+            try:
+                async with self.engine.begin() as connection:
+                    for table in self.tables:
+                        rows = batch[table.name]
+                        # Bounded statements stay far below the bind parameter limit
+                        for start in range(0, len(rows), self.batch_size):
+                            await connection.execute(insert(table).values(rows[start:start + self.batch_size]))
+                written = row_count
+            except BaseException as e:
+                if not self._is_rejected_data(e):
+                    # Includes cancellation mid-insert, so no rows are lost on shutdown
+                    observability.increment("db_write_behind_flush_errors")
+                    self._requeue(batch, row_count)
+                    raise
+                logger.warning(f"Write-behind flush rejected by the database, isolating the bad rows: {str(e)}")
+                written = await self._flush_isolating(batch)
+
+            observability.observe("db_write_behind_flush_seconds", observability.stop_timer(start_time))
+            observability.increment("db_write_behind_rows_written", written)
+            with self._lock:
+                observability.set_gauge("db_write_behind_pending", self._pending_count)
+            return written
+
+    async def _flush_isolating(self, batch: Dict[str, List[Dict[str, Any]]]) -> int:
+        """
+        Insert a batch the database rejected, committing groups that succeed and
+        splitting failing groups in half until single rejected rows are dropped.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            Exception: On a connection-level failure; the unwritten rows are put back in the buffer first
+        """
+        written = 0
+        remaining = {table.name: list(batch[table.name]) for table in self.tables}
+        for table in self.tables:
+            # Groups still to insert, in order
+            groups = [
+                remaining[table.name][start:start + self.batch_size]
+                for start in range(0, len(remaining[table.name]), self.batch_size)
+            ]
+            while groups:
+                group = groups.pop(0)
+                try:
+                    async with self.engine.begin() as connection:
+                        await connection.execute(insert(table).values(group))
+                except BaseException as e:
+                    if not self._is_rejected_data(e):
+                        observability.increment("db_write_behind_flush_errors")
+                        remaining[table.name] = group + [row for rest in groups for row in rest]
+                        self._requeue(remaining, sum(len(rows) for rows in remaining.values()))
+                        raise
+                    if len(group) == 1:
+                        observability.increment("db_write_behind_rows_rejected")
+                        logger.error(f"Dropping a {table.name} row rejected by the database: {str(e.orig)}")
+                    else:
+                        middle = len(group) // 2
+                        groups[:0] = [group[:middle], group[middle:]]
+                    continue
+                written += len(group)
+            remaining[table.name] = []
+        return written
+
+    def _requeue(self, batch: Dict[str, List[Dict[str, Any]]], row_count: int):
+        """Put the rows of a failed flush back in front of the buffer, within max_pending."""
+        with self._lock:
+            room = self.max_pending - self._pending_count
+            if room < row_count:
+                observability.increment("db_write_behind_rows_dropped", row_count - max(room, 0))
+            for table in self.tables:
+                # Keep parents before children: trim the last tables first
+                rows = batch[table.name][:max(room, 0)]
+                room -= len(rows)
+                self._pending[table.name][:0] = rows
+                self._pending_count += len(rows)
+
+    async def close(self):
+        """Stop the background task and write whatever is still buffered."""
+        with self._lock:
+            self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            written = await self.flush()
+            if written:
+                logger.info(f"Write-behind buffer drained {written} rows on shutdown")
+        except Exception as e:
+            logger.error(f"Could not drain write-behind buffer on shutdown: {str(e)}")
@@ -19,6 +19,11 @@ class QueryRequest(BaseModel):
     session_id: UUID
 
 
+class BatchQueryRequest(BaseModel):
+    questions: List[str]
+    session_id: UUID
+
+
 class SelectedTextRequest(BaseModel):
     question: str
     selected_text: str
@@ -36,4 +41,17 @@ class QueryResponse(BaseModel):
     answer: str
     sources: List[Source]  # List of sources with chapter_title, source_file, text_preview
     session_id: UUID
-    mode_used: str  # Enum [RAG, SELECTED_TEXT]
\ No newline at end of file
+    mode_used: str  # Enum [RAG, SELECTED_TEXT]
+
+
+class BatchQueryResult(BaseModel):
+    question: str
+    answer: Optional[str]  # None if answering this question failed
+    sources: List[Source]
+    mode_used: str
+    error: Optional[str] = None
+
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryResult]  # One result per question, in request order
+    session_id: UUID
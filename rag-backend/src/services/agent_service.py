@@ -1,7 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Optional
 from src.core import gemini_client as gc_module
 from src.services.rag_service import rag_service
+from src.services.intent_service import intent_service
 from src.utils.observability import observability
+from src.utils.intent_router import GREETING, BOOK_MENTOR
 from src.utils.validation import ValidationUtils
 import logging
 from uuid import uuid4
@@ -14,12 +16,23 @@ def get_gemini_client():
 
 logger = logging.getLogger(__name__)
 
+GREETING_RESPONSE = (
+    "Hello! Welcome to the Digital Book Assistant! I'm here to help you explore and understand the content of your Physical AI and Robotics book. "
+    "Feel free to ask me anything about the book's content, chapters, or specific topics. Here are some examples of what you can ask:\n\n"
+    "• \"What is Physical AI?\"\n"
+    "• \"How many chapters are there in this book?\"\n"
+    "• \"Summarize chapter 5\"\n"
+    "• \"Explain robot locomotion\"\n"
+    "• \"What does the book say about human-robot interaction?\"\n\n"
+    "Just type your question and I'll do my best to find the relevant information from the book for you!"
+)
+
 
 class AgentService:
     def __init__(self):
         pass
 
-    def process_user_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process_user_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a user request using agent-oriented logic.
 
@@ -41,30 +54,26 @@ class AgentService:
             if not is_valid:
                 raise ValueError(f"Invalid question: {error_msg}")
 
-            # Check if this is a greeting or conversational starter
-            greeting_response = self._handle_greeting(question)
-            if greeting_response:
+            # One classification decides between greeting, book mentor and RAG; the
+            # embedding it may compute is reused by retrieval, so at most one call is made
+            intent, question_embedding = await intent_service.route(question)
+
+            if intent == GREETING:
                 # Generate a friendly greeting response
-                if session_id and not ValidationUtils.validate_session_id(session_id):
-                    session_id = str(uuid4())
-                elif not session_id:
-                    session_id = str(uuid4())
+                session_id = self._resolve_session_id(session_id)
 
                 return {
-                    "answer": greeting_response,
+                    "answer": GREETING_RESPONSE,
                     "sources": [],
                     "session_id": session_id,
                     "mode_used": "GREETING"
                 }
 
-            # Check if this is a book-related query that requires special handling
-            enhanced_response = self._handle_book_related_query(question)
+            # Questions about the book itself get a mentor answer without retrieval
+            enhanced_response = await self._handle_book_related_query(question) if intent == BOOK_MENTOR else None
             if enhanced_response:
                 # Generate a book-related response
-                if session_id and not ValidationUtils.validate_session_id(session_id):
-                    session_id = str(uuid4())
-                elif not session_id:
-                    session_id = str(uuid4())
+                session_id = self._resolve_session_id(session_id)
 
                 return {
                     "answer": enhanced_response,
@@ -73,15 +82,14 @@ class AgentService:
                     "mode_used": "BOOK_MENTOR"
                 }
 
-            if session_id and not ValidationUtils.validate_session_id(session_id):
-                session_id = str(uuid4())
-            elif not session_id:
-                session_id = str(uuid4())
+            session_id = self._resolve_session_id(session_id)
 
             # For now, route to RAG service which will use Gemini with the understanding that
             # full RAG functionality (with Qdrant) is not available
             # In a full implementation, we would route to different services based on request type
-            result = rag_service.answer_question_with_rag(question, session_id)
+            result = await rag_service.answer_question_with_rag(
+                question, session_id, intent=intent, question_embedding=question_embedding
+            )
 
             elapsed_time = observability.stop_timer(start_time)
             observability.log_info(
@@ -112,132 +120,167 @@ class AgentService:
                 "mode_used": "ERROR"
             }
 
-    def _handle_book_related_query(self, message: str) -> str:
+    async def process_user_request_stream(self, request_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """
-        Check if the message is a book-related query and return an appropriate response.
+        Process a user request like process_user_request, but stream the answer as it is generated.
 
         Args:
-            message: The user's message
+            request_data: Dictionary containing request information
+                         Expected keys: question || message, session_id
+
+        Yields:
+            Events as {"event": name, "data": payload}, in order: one "sources" event,
+            "token" events with answer fragments, then "done" with the session ID and mode;
+            an "error" event replaces the remaining events if processing fails
+        """
+        start_time = observability.start_timer()
+        session_id = request_data.get('session_id', '')
+
+        try:
+            question = request_data.get('question') or request_data.get('message', '')
+
+            # Validate required inputs first
+            is_valid, error_msg = ValidationUtils.validate_question_text(question)
+            if not is_valid:
+                raise ValueError(f"Invalid question: {error_msg}")
+
+            session_id = self._resolve_session_id(session_id)
+
+            intent, question_embedding = await intent_service.route(question)
+            if intent == GREETING:
+                mode_used = "GREETING"
+                plan = rag_service.make_answer_plan([], answer=GREETING_RESPONSE)
+            else:
+                mode_used = "BOOK_MENTOR"
+                plan = await self._prepare_book_related_query(question) if intent == BOOK_MENTOR else None
+                if plan is None:
+                    mode_used = "RAG"
+                    plan = await rag_service.prepare_answer(
+                        question, session_id, intent=intent, question_embedding=question_embedding
+                    )
+
+            stream = rag_service.stream_answer(plan)
+            first_parts = []
+            if mode_used == "BOOK_MENTOR":
+                # As in process_user_request, a mentor answer that fails before anything was sent falls back to RAG
+                try:
+                    first_parts.append(await stream.__anext__())
+                except Exception as e:
+                    if not isinstance(e, StopAsyncIteration):
+                        logger.warning(f"Book mentor answer failed, answering with RAG: {str(e)}")
+                    mode_used = "RAG"
+                    plan = await rag_service.prepare_answer(
+                        question, session_id, intent=intent, question_embedding=question_embedding
+                    )
+                    stream = rag_service.stream_answer(plan)
+
+            # Sources are known before generation starts, so the client can render them first
+            yield {"event": "sources", "data": plan['sources']}
+
+            answer_parts = []
+            for text in first_parts:
+                answer_parts.append(text)
+                yield {"event": "token", "data": text}
+            async for text in stream:
+                answer_parts.append(text)
+                yield {"event": "token", "data": text}
+
+            if mode_used == "RAG":
+                rag_service.log_query(question, session_id, "".join(answer_parts), plan['sources'], start_time)
+
+            elapsed_time = observability.stop_timer(start_time)
+            observability.log_info(
+                "Agent streamed request successfully",
+                {"duration_seconds": elapsed_time, "session_id": session_id, "mode_used": mode_used}
+            )
+
+            yield {"event": "done", "data": {"session_id": session_id, "mode_used": mode_used}}
+
+        except Exception as e:
+            elapsed_time = observability.stop_timer(start_time)
+            observability.log_error(
+                f"Error streaming user request in agent: {str(e)}",
+                {"duration_seconds": elapsed_time, "session_id": session_id or 'unknown'},
+                exc_info=True
+            )
+
+            yield {
+                "event": "error",
+                "data": {
+                    "message": "An error occurred while processing your request.",
+                    "session_id": session_id
+                }
+            }
+
+    @staticmethod
+    def _resolve_session_id(session_id: str) -> str:
+        """Return the given session ID if it is valid, otherwise a new one."""
+        if session_id and ValidationUtils.validate_session_id(session_id):
+            return session_id
+        return str(uuid4())
+
+    async def _handle_book_related_query(self, message: str) -> str:
+        """
+        Answer a question about the book itself (its purpose, how to study it) as a mentor.
+
+        Args:
+            message: The user's message, classified as a book mentor question
 
         Returns:
-            Enhanced response if it's a book-related query, None otherwise
+            The mentor response, or None to let regular RAG handle the message
         """
-        if not message:
+        plan = await self._prepare_book_related_query(message)
+        if plan is None:
+            return None
+
+        try:
+            return await rag_service.generate_answer(plan)
+        except Exception:
+            # If Gemini fails, return None to let regular RAG handle it
             return None
 
-        # Normalize the message for comparison
-        normalized_message = message.strip().lower()
-
-        # Check for book-specific queries
-        book_related_keywords = [
-            'read', 'study', 'learning', 'importance', 'value', 'benefit', 'how to',
-            'tips', 'advice', 'strategy', 'approach', 'method', 'technique', 'understand',
-            'comprehend', 'master', 'grasp', 'apply', 'use', 'practical', 'real-world',
-            'application', 'examples', 'practice', 'exercises', 'chapters', 'topics',
-            'content', 'material', 'concepts', 'principles', 'theory', 'implementation',
-            'suggestions', 'recommend', 'advise', 'guide', 'path', 'journey', 'progress',
-            'difficulty', 'challenging', 'easy', 'beginner', 'intermediate', 'advanced',
-            'prerequisites', 'background', 'foundation', 'building', 'foundation',
-            'structure', 'organization', 'outline', 'syllabus', 'curriculum', 'plan',
-            'schedule', 'pace', 'time', 'duration', 'effort', 'dedication', 'commitment',
-            'artificial intelligence', 'ai', 'robotics', 'physical ai', 'humanoid',
-            'robot', 'automation', 'machine learning', 'deep learning', 'neural',
-            'computer vision', 'nlp', 'natural language', 'motion planning', 'kinematics',
-            'dynamics', 'actuators', 'sensors', 'control', 'locomotion', 'grasping',
-            'manipulation', 'perception', 'planning', 'decision making', 'hri',
-            'human robot interaction', 'ethics', 'autonomous', 'embodied', 'embodiment'
-        ]
-
-        # Check if the message contains book-related keywords
-        has_book_keyword = any(keyword in normalized_message for keyword in book_related_keywords)
-
-        # Also check for specific phrases that indicate book purpose/value questions
-        purpose_indicators = [
-            'why is this book', 'why was this book', 'purpose of this book',
-            'intended for', 'who is this book for', 'aim of the book',
-            'goal of the book', 'target audience', 'who should read',
-            'what is this book about', 'book objective', 'book goal',
-            'what is the purpose', 'why book written', 'book written for'
-        ]
-
-        has_purpose_indicator = any(indicator in normalized_message for indicator in purpose_indicators)
-
-        if has_book_keyword or has_purpose_indicator:
-            gemini_client_instance = get_gemini_client()
-            if gemini_client_instance is None:
-                return None  # Let regular RAG handle this if Gemini isn't available
-
-            # Create a professional book mentor response
-            book_mentor_prompt = f"""
-            You are acting as a professional mentor for the book "Physical AI and Robotics".
-            The user has asked: "{message}"
-
-            Provide a thoughtful, professional response as if you are an expert in this field.
-            If the question is about how to read or approach the book, give specific advice based on the book's content.
-            If the question is about the importance or value of the book, highlight its key contributions.
-            If the question is about concepts related to AI, robotics, or physical AI, connect it to the book's content.
-            If the question is about study strategies, give professional advice tailored to the book's subject matter.
-            If the question is about the purpose of the book, explain its intended audience and goals.
-
-            Keep your response informative, professional, and helpful.
-            """
-
-            try:
-                response = gemini_client_instance.generate_response(book_mentor_prompt)
-                return response
-            except Exception:
-                # If Gemini fails, return None to let regular RAG handle it
-                return None
-
-        return None  # Not a book-related query that needs special handling
-
-    def _handle_greeting(self, message: str) -> str:
+    async def _prepare_book_related_query(self, message: str) -> Optional[Dict[str, Any]]:
         """
-        Check if the message is a greeting and return an appropriate response.
+        Build the answer plan for a question about the book itself.
 
         Args:
-            message: The user's message
+            message: The user's message, classified as a book mentor question
 
         Returns:
-            Greeting response if it's a greeting, None otherwise
+            Answer plan (see RagService.make_answer_plan), or None to let regular RAG handle the message
         """
         if not message:
             return None
 
-        # Normalize the message for comparison
-        normalized_message = message.strip().lower()
-
-        # Common greetings - only match exact phrases or very short messages that are clearly greetings
-        greetings = [
-            'hi', 'hello', 'hey', 'greetings', 'good morning', 'good afternoon',
-            'good evening', 'what\'s up', 'whats up', 'howdy', 'hi there',
-            'hello there', 'hey there', 'good day', 'how are you', 'how do you do',
-            'yo', 'sup', 'what\'s good', 'what\'s happening', 'what\'s new',
-            'hiya', 'hola', 'bonjour', 'ciao', 'gday', 'morning', 'afternoon',
-            'evening', 'salutations', 'top of the morning', 'ahoy', 'howdy do',
-            'how are you doing', 'how\'s it going', 'how goes it', 'howdy partner',
-            'what\'s cracking', 'what\'s shaking', 'in the neighborhood', 'yello'
-        ]
-
-        # Check if the message is a greeting - only match exact phrases
-        if normalized_message in greetings:
-            return (
-                "Hello! Welcome to the Digital Book Assistant! I'm here to help you explore and understand the content of your Physical AI and Robotics book. "
-                "Feel free to ask me anything about the book's content, chapters, or specific topics. Here are some examples of what you can ask:\n\n"
-                "• \"What is Physical AI?\"\n"
-                "• \"How many chapters are there in this book?\"\n"
-                "• \"Summarize chapter 5\"\n"
-                "• \"Explain robot locomotion\"\n"
-                "• \"What does the book say about human-robot interaction?\"\n\n"
-                "Just type your question and I'll do my best to find the relevant information from the book for you!"
-            )
+        gemini_client_instance = get_gemini_client()
+        if gemini_client_instance is None:
+            return None  # Let regular RAG handle this if Gemini isn't available
+
+        # Create a professional book mentor response
+        book_mentor_prompt = f"""
+        You are acting as a professional mentor for the book "Physical AI and Robotics".
+        The user has asked: "{message}"
+
+        Provide a thoughtful, professional response as if you are an expert in this field.
+        If the question is about how to read or approach the book, give specific advice based on the book's content.
+        If the question is about the importance or value of the book, highlight its key contributions.
+        If the question is about concepts related to AI, robotics, or physical AI, connect it to the book's content.
+        If the question is about study strategies, give professional advice tailored to the book's subject matter.
+        If the question is about the purpose of the book, explain its intended audience and goals.
+
+        Keep your response informative, professional, and helpful.
+        """
 
-        # Check for simple affirmatives that might be greetings
-        simple_affirmatives = ['yes', 'no', 'ok', 'okay', 'sure', 'thanks', 'thank you', 'please']
-        if normalized_message in simple_affirmatives:
-            return None  # These are not greetings that need special handling
+        # Repeated mentor questions reuse the cached answer. With no retrieved chunks to
+        # compare, only the same normalized question counts as a repeat, so no embedding is needed
+        text_cache_key = None
+        if rag_service.text_answer_cache is not None:
+            text_cache_key = rag_service.text_cache_key("book_mentor", message)
+            cached = rag_service.text_answer_cache.get(text_cache_key)
+            if cached is not None:
+                return rag_service.make_answer_plan([], answer=cached)
 
-        return None  # Not a greeting
+        return rag_service.make_answer_plan([], prompt=book_mentor_prompt, text_cache_key=text_cache_key)
 
 
 # Global instance
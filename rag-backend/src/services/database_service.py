@@ -71,6 +71,37 @@ class DatabaseService:
             raise RuntimeError("Postgres client not initialized. Please ensure the application lifespan has run.")
         return postgres_client_instance.store_query_log(log_data)
 
+    def queue_question(self, question_data: Dict[str, Any]) -> str:
+        """
+        Queue a question for a batched background insert; returns without touching the database.
+
+        Args:
+            question_data: Dictionary containing question information
+                         Expected keys: text, mode, session_id, source_metadata (optional)
+
+        Returns:
+            The client-generated ID of the question
+        """
+        postgres_client_instance = get_postgres_client()
+        if postgres_client_instance is None:
+            raise RuntimeError("Postgres client not initialized. Please ensure the application lifespan has run.")
+        return postgres_client_instance.queue_question(question_data)
+
+    def queue_query_log(self, log_data: Dict[str, Any]) -> str:
+        """
+        Queue a query log for a batched background insert; returns without touching the database.
+
+        Args:
+            log_data: Dictionary containing log information (see store_query_log)
+
+        Returns:
+            The client-generated ID of the query log
+        """
+        postgres_client_instance = get_postgres_client()
+        if postgres_client_instance is None:
+            raise RuntimeError("Postgres client not initialized. Please ensure the application lifespan has run.")
+        return postgres_client_instance.queue_query_log(log_data)
+
     def update_chat_session(self, session_id: str, session_end: datetime = None) -> bool:
         """
         Update a chat session, for example to set the end time.
@@ -1,14 +1,21 @@
 import os
 import json
-import pickle
-from typing import List, Dict, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+import numpy as np
 from src.core import gemini_client as gc_module
 from src.core import qdrant_client as qc_module  # Now enabled
-from src.utils.text_processor import get_text_processor
+from src.core.embedding_store import EmbeddingStore
+from src.core.keyword_index import KeywordIndex
+from src.core.chapter_catalog import describe_chapter
+from src.core.summary_index import SummaryIndex
+from src.core.vector_store import QdrantVectorStore
+from src.config.settings import settings
+from src.utils.text_processor import get_text_processor, make_chunk_id
 from src.utils.observability import observability
 import logging
-import uuid
 
 
 def get_gemini_client():
@@ -27,8 +34,15 @@ logger = logging.getLogger(__name__)
 class EmbeddingService:
     def __init__(self):
         self.text_processor = get_text_processor()
-        self.embeddings_storage_path = "embeddings_storage.json"  # Store embeddings in a JSON file
-        self.chunk_storage_path = "chunks_storage.json"  # Store chunk information separately
+        # Legacy JSON storage, only read to migrate it into the binary store
+        self.embeddings_storage_path = "embeddings_storage.json"
+        self.chunk_storage_path = "chunks_storage.json"
+        self.store = EmbeddingStore(settings.embedding_store_path, dtype=settings.embedding_store_dtype)
+        self.qdrant_store = QdrantVectorStore(get_qdrant_client)
+        # BM25 index over the chunk texts, persisted next to the store files
+        self.keyword_index = KeywordIndex(self.store)
+        # Section, chapter and book summaries generated at index time (INDEX_SUMMARIES_ENABLED)
+        self.summary_index = SummaryIndex(self.store)
 
     def process_and_embed_book_content(self, book_content_path: str) -> Dict[str, Any]:
         """
@@ -52,7 +66,7 @@ class EmbeddingService:
                     "message": f"Book content path does not exist: {book_content_path}"
                 }
 
-            markdown_files = list(content_dir.rglob("*.md"))
+            markdown_files = sorted(content_dir.rglob("*.md"))
 
             if not markdown_files:
                 return {
@@ -61,31 +75,90 @@ class EmbeddingService:
                     "message": f"No markdown files found in: {book_content_path}"
                 }
 
+            book_version = os.getenv("BOOK_VERSION", "1.0")
+
+            # A different chunker configuration or book version invalidates every file's chunks
+            manifest = self._load_manifest()
+            index_config = {
+                'chunk_size': self.text_processor.chunk_size,
+                'overlap': self.text_processor.overlap,
+                'book_version': book_version
+            }
+            full_rebuild = manifest.get('config') != index_config
+            # The previous version's points stay in Qdrant for deployments still serving it
+            previous_version = manifest.get('config', {}).get('book_version')
+            version_changed = previous_version is not None and previous_version != book_version
+            previous_files = {} if full_rebuild else manifest.get('files', {})
+
+            # Chunks already in the local store, reusable by their deterministic id
+            stored_chunks = self._load_stored_chunks()
+
             all_chunks = []
+            changed_chunks = []  # Chunks of new or modified files, to be upserted
             chapter_info = []  # Track all chapters for structural queries
+            manifest_files = {}
+            changed_files = 0
 
             for file_path in markdown_files:
                 chapter_title = file_path.stem  # Use filename as chapter title
                 relative_path = str(file_path.relative_to(content_dir))
-
-                # Read the content of the markdown file
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+                file_stat = file_path.stat()
+                previous = previous_files.get(relative_path)
+
+                chunks = None
+                if (previous and previous['mtime_ns'] == file_stat.st_mtime_ns and previous['size'] == file_stat.st_size
+                        and 'chapter' in previous):
+                    # Unchanged on disk: skip reading and chunking entirely
+                    file_hash = previous['sha256']
+                    content_preview = previous['content_preview']
+                    chapter = previous['chapter']
+                    chunks = self._reuse_chunks(previous['chunk_ids'], stored_chunks)
+
+                if chunks is None:
+                    # Read the content of the markdown file
+                    with open(file_path, 'r', encoding='utf-8') as file:
+                        content = file.read()
+                    file_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+                    content_preview = content[:200]  # First 200 chars as preview
+                    # Number, display title, summary and sections for the chapter catalog
+                    chapter = describe_chapter(content, chapter_title)
+
+                    if previous and previous['sha256'] == file_hash:
+                        # Touched but not modified
+                        chunks = self._reuse_chunks(previous['chunk_ids'], stored_chunks)
+
+                    if chunks is None:
+                        # Chunk the text using the text processor
+                        chunks = self.text_processor.chunk_text(
+                            text=content,
+                            source_file=relative_path,
+                            chapter_title=chapter_title,
+                            book_version=book_version
+                        )
+                        # Chunks whose text did not change keep their id, so their embedding is reused
+                        for chunk in chunks:
+                            if chunk['id'] in stored_chunks:
+                                chunk['embedding_vector'] = stored_chunks[chunk['id']][1].tolist()
+                        changed_chunks.extend(chunks)
+                        changed_files += 1
 
                 # Store chapter info for structural queries
                 chapter_info.append({
                     'title': chapter_title,
                     'path': relative_path,
-                    'content_preview': content[:200]  # First 200 chars as preview
+                    'content_preview': content_preview,
+                    'sha256': file_hash,
+                    **chapter
                 })
 
-                # Chunk the text using the text processor
-                chunks = self.text_processor.chunk_text(
-                    text=content,
-                    source_file=relative_path,
-                    chapter_title=chapter_title,
-                    book_version=os.getenv("BOOK_VERSION", "1.0")
-                )
+                manifest_files[relative_path] = {
+                    'mtime_ns': file_stat.st_mtime_ns,
+                    'size': file_stat.st_size,
+                    'sha256': file_hash,
+                    'content_preview': content_preview,
+                    'chapter': chapter,
+                    'chunk_ids': [chunk['id'] for chunk in chunks]
+                }
 
                 all_chunks.extend(chunks)
 
@@ -95,27 +168,38 @@ class EmbeddingService:
             book_index_content = f"This book contains the following chapters: {', '.join(all_chapter_titles)}. Total chapters: {len(all_chapter_titles)}."
 
             book_index_chunk = {
-                'id': str(uuid.uuid4()),
+                'id': make_chunk_id('BOOK_INDEX', book_index_content, book_version),
                 'text_content': book_index_content,
                 'chapter_title': 'BOOK_INDEX',
                 'source_file': 'BOOK_INDEX',
                 'chunk_order': 0,
-                'book_version': os.getenv("BOOK_VERSION", "1.0"),
+                'book_version': book_version,
                 'embedding_vector': None  # Will be set after generating embedding
             }
+            if book_index_chunk['id'] in stored_chunks and not full_rebuild:
+                book_index_chunk['embedding_vector'] = stored_chunks[book_index_chunk['id']][1].tolist()
+            else:
+                changed_chunks.append(book_index_chunk)
 
             # Add the book index to chunks
             all_chunks.append(book_index_chunk)
 
-            # Extract text content from chunks for embedding generation
-            texts_for_embedding = [chunk['text_content'] for chunk in all_chunks]
-
-            # Generate embeddings using the Gemini client
+            # Identical passages within a file share an id; keep the first occurrence
+            unique_chunks = {}
+            for chunk in all_chunks:
+                unique_chunks.setdefault(chunk['id'], chunk)
+            all_chunks = list(unique_chunks.values())
+            changed_chunks = [unique_chunks[chunk_id] for chunk_id in dict.fromkeys(chunk['id'] for chunk in changed_chunks)]
+            stale_ids = [chunk_id for chunk_id in stored_chunks if chunk_id not in unique_chunks]
+
+            # Generate embeddings concurrently for chunks without one; finished batches are
+            # checkpointed so a partial failure can be resumed by re-running the job
+            chunks_to_embed = sum(1 for chunk in all_chunks if chunk.get('embedding_vector') is None)
             try:
                 gemini_client_instance = get_gemini_client()
-                if gemini_client_instance is None:
+                if gemini_client_instance is None and chunks_to_embed:
                     raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
-                embeddings = gemini_client_instance.generate_embeddings(texts_for_embedding)
+                embedded_count, failed_batches = self._embed_chunks_concurrently(gemini_client_instance, all_chunks)
             except Exception as e:
                 observability.log_error(
                     f"Gemini embedding failed during book processing, using fallback: {str(e)}",
@@ -129,23 +213,39 @@ class EmbeddingService:
                     "message": f"Gemini embedding service unavailable: {str(e)}"
                 }
 
-            # Add embeddings to chunks
-            for i, chunk in enumerate(all_chunks):
-                chunk['embedding_vector'] = embeddings[i]
+            if failed_batches:
+                return {
+                    "status": "error",
+                    "chunks_processed": embedded_count,
+                    "message": (
+                        f"Embedded {embedded_count} of {len(all_chunks)} chunks; {len(failed_batches)} batches failed "
+                        f"(first error: {failed_batches[0]}). Progress is checkpointed, re-run the embedding job to resume."
+                    )
+                }
 
-            # Try to store the chunks in Qdrant first
-            qdrant_success = False
+            # Sync Qdrant: upsert new and modified chunks (everything if the last sync did not
+            # reach Qdrant) and delete chunks that no longer exist
+            qdrant_synced = False
             try:
-                qdrant_client_instance = get_qdrant_client()
-                if qdrant_client_instance is None:
-                    logger.warning("Qdrant client not initialized, using local storage fallback")
+                if not self.qdrant_store.is_available:
+                    logger.warning("Qdrant client not available, using local storage fallback")
                 else:
-                    qdrant_client_instance.store_document_chunks(all_chunks)
+                    chunks_to_upsert = changed_chunks if manifest.get('qdrant_synced') and not full_rebuild else all_chunks
+                    self.qdrant_store.upsert(chunks_to_upsert)
+                    stale_qdrant_ids = [] if version_changed else stale_ids
+                    if not manifest.get('qdrant_synced') or full_rebuild:
+                        # Without a record of the last sync the collection may hold points this index
+                        # never tracked (e.g. random ids written by an older indexer): delete every
+                        # point of the current version that is not in the new index
+                        stale_qdrant_ids = [
+                            chunk_id for chunk_id in self.qdrant_store.chunk_ids() if chunk_id not in unique_chunks
+                        ]
+                    self.qdrant_store.delete(stale_qdrant_ids)
                     observability.log_info(
-                        f"Successfully stored {len(all_chunks)} chunks in Qdrant",
-                        {"chunk_count": len(all_chunks)}
+                        f"Synced Qdrant: upserted {len(chunks_to_upsert)} chunks, deleted {len(stale_qdrant_ids)} stale chunks",
+                        {"upserted": len(chunks_to_upsert), "deleted": len(stale_qdrant_ids)}
                     )
-                    qdrant_success = True
+                    qdrant_synced = True
             except Exception as e:
                 observability.log_error(
                     f"Qdrant storage failed, using local storage fallback: {str(e)}",
@@ -154,36 +254,37 @@ class EmbeddingService:
                 )
                 logger.warning("Qdrant unavailable, using local storage")
 
-            # If Qdrant failed or is not available, store in local files
-            if not qdrant_success:
-                try:
-                    # Save embeddings to file
-                    with open(self.embeddings_storage_path, 'w', encoding='utf-8') as f:
-                        # Extract embeddings from chunks
-                        embeddings = [chunk['embedding_vector'] for chunk in all_chunks]
-                        json.dump({
-                            'embeddings': embeddings,
-                            'chunk_ids': [chunk['id'] for chunk in all_chunks]
-                        }, f)
-
-                    # Save chunk information to file
-                    with open(self.chunk_storage_path, 'w', encoding='utf-8') as f:
-                        json.dump(all_chunks, f, indent=2, default=str)
-
-                    # Also save chapter info for quick structural queries
-                    with open("chapter_info.json", 'w', encoding='utf-8') as f:
-                        json.dump(chapter_info, f, indent=2)
+            # The local store is always kept current: it is the fallback search index
+            # and the source of reusable embeddings for the next incremental run
+            try:
+                if changed_chunks or stale_ids or len(stored_chunks) != len(all_chunks):
+                    header = self.store.write(all_chunks)
+                    self.keyword_index.write(all_chunks, header['generation'])
+
+                # Also save chapter info for quick structural queries; replaced atomically
+                # because serving workers reload it as soon as it changes
+                tmp_path = f"{settings.chapter_info_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(chapter_info, f, indent=2)
+                os.replace(tmp_path, settings.chapter_info_path)
+
+                self._save_manifest({
+                    'config': index_config,
+                    'qdrant_synced': qdrant_synced,
+                    'files': manifest_files
+                })
 
-                    observability.log_info(
-                        f"Successfully stored {len(all_chunks)} chunks in local storage",
-                        {"chunk_count": len(all_chunks)}
-                    )
-                except Exception as e:
-                    observability.log_error(
-                        f"Failed to store embeddings in local storage: {str(e)}",
-                        {"chunk_count": len(all_chunks)},
-                        exc_info=True
-                    )
+                observability.log_info(
+                    f"Successfully stored {len(all_chunks)} chunks in local storage",
+                    {"chunk_count": len(all_chunks)}
+                )
+            except Exception as e:
+                observability.log_error(
+                    f"Failed to store embeddings in local storage: {str(e)}",
+                    {"chunk_count": len(all_chunks)},
+                    exc_info=True
+                )
+                if not qdrant_synced:
                     # If both Qdrant and local storage fail, return an error
                     return {
                         "status": "error",
@@ -191,16 +292,37 @@ class EmbeddingService:
                         "message": f"Failed to store embeddings in both Qdrant and local storage: {str(e)}"
                     }
 
+            self._clear_checkpoint()
+
+            summary_message = ""
+            if settings.index_summaries_enabled:
+                summary_stats = self._build_summaries(content_dir, chapter_info)
+                if summary_stats is not None:
+                    summary_message = (
+                        f" Summaries: {summary_stats['generated']} generated, {summary_stats['reused']} reused, "
+                        f"{summary_stats['failed']} failed."
+                    )
+
             elapsed_time = observability.stop_timer(start_time)
             observability.log_info(
                 f"Successfully processed and embedded {len(all_chunks)} chunks",
-                {"duration_seconds": elapsed_time, "chunk_count": len(all_chunks)}
+                {
+                    "duration_seconds": elapsed_time,
+                    "chunk_count": len(all_chunks),
+                    "changed_files": changed_files,
+                    "embedded_chunks": chunks_to_embed,
+                    "stale_chunks": len(stale_ids)
+                }
             )
 
             return {
                 "status": "success",
                 "chunks_processed": len(all_chunks),
-                "message": f"Successfully embedded {len(all_chunks)} document chunks and stored in local storage. Total chapters indexed: {len(all_chapter_titles)}"
+                "message": (
+                    f"Indexed {len(all_chunks)} document chunks from {len(markdown_files)} files "
+                    f"({changed_files} changed): embedded {chunks_to_embed} new chunks, removed {len(stale_ids)} stale chunks. "
+                    f"Total chapters indexed: {len(all_chapter_titles)}.{summary_message}"
+                )
             }
 
         except Exception as e:
@@ -217,39 +339,235 @@ class EmbeddingService:
                 "message": f"Error processing book content: {str(e)}"
             }
 
-    def load_embeddings(self) -> Dict[str, Any]:
+    def _build_summaries(self, content_dir: Path, chapter_info: List[dict]) -> Optional[Dict[str, int]]:
         """
-        Load stored embeddings from local storage.
+        Generate the summaries of changed sections, chapters and the book.
+
+        Failures are logged and do not fail book processing; answers fall back to
+        the extractive chapter summaries.
+
+        Args:
+            content_dir: The book content directory
+            chapter_info: The chapter list being written for this run
 
         Returns:
-            Dictionary containing embeddings and chunk information
+            Summary counts (see SummaryIndex.build), or None if summaries could not be built
         """
+        gemini_client_instance = get_gemini_client()
+        if gemini_client_instance is None:
+            logger.warning("Gemini client not available, skipping summary generation")
+            return None
+
         try:
-            with open(self.embeddings_storage_path, 'r', encoding='utf-8') as f:
-                embeddings_data = json.load(f)
+            chapters = []
+            for info in chapter_info:
+                with open(content_dir / info['path'], 'r', encoding='utf-8') as file:
+                    content = file.read()
+                title = f"Chapter {info['number']}: {info['heading']}" if info.get('number') is not None else info['heading']
+                chapters.append((info['path'], title, content))
+
+            summary_stats = self.summary_index.build(
+                chapters,
+                gemini_client_instance.generate_response,
+                concurrency=settings.index_summary_concurrency
+            )
+            observability.log_info("Built book summaries", summary_stats)
+            return summary_stats
+        except Exception as e:
+            observability.log_error(f"Summary generation failed: {str(e)}", {"chapters": len(chapter_info)}, exc_info=True)
+            return None
 
-            with open(self.chunk_storage_path, 'r', encoding='utf-8') as f:
-                chunks_data = json.load(f)
+    def _embed_chunks_concurrently(self, gemini_client_instance, chunks: List[dict]) -> Tuple[int, List[str]]:
+        """
+        Set 'embedding_vector' on every chunk that lacks one, embedding batches in parallel.
 
-            return {
-                'embeddings': embeddings_data['embeddings'],
-                'chunk_ids': embeddings_data['chunk_ids'],
-                'chunks': chunks_data
+        Embeddings already present in the checkpoint are reused. Each finished batch
+        is appended to the checkpoint, and a failed batch does not stop the others.
+
+        Args:
+            gemini_client_instance: Client used to generate the embeddings
+            chunks: Chunks to embed
+
+        Returns:
+            Tuple of (number of embedded chunks, error messages of failed batches)
+        """
+        pending = [chunk for chunk in chunks if chunk.get('embedding_vector') is None]
+        if not pending:
+            return len(chunks), []
+
+        checkpoint = self._load_checkpoint()
+        candidates, pending = pending, []
+        for chunk in candidates:
+            embedding = checkpoint.get(self._text_key(chunk['text_content']))
+            if embedding is not None:
+                chunk['embedding_vector'] = embedding
+            else:
+                pending.append(chunk)
+
+        if checkpoint:
+            observability.log_info(
+                "Resuming embedding from checkpoint",
+                {"checkpointed": len(candidates) - len(pending), "pending": len(pending)}
+            )
+
+        batch_size = gemini_client_instance.embedding_batch_size
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        failed_batches = []
+
+        with ThreadPoolExecutor(max_workers=max(1, settings.embedding_concurrency)) as executor:
+            futures = {
+                executor.submit(
+                    gemini_client_instance.generate_embeddings,
+                    [chunk['text_content'] for chunk in batch]
+                ): batch
+                for batch in batches
             }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    embeddings = future.result()
+                except Exception as e:
+                    failed_batches.append(str(e))
+                    observability.log_error(
+                        f"Embedding batch of {len(batch)} chunks failed: {str(e)}",
+                        {"first_chunk_source": batch[0].get('source_file')}
+                    )
+                    continue
+
+                for chunk, embedding in zip(batch, embeddings):
+                    chunk['embedding_vector'] = embedding
+                self._append_checkpoint(batch)
+
+        embedded_count = sum(1 for chunk in chunks if chunk.get('embedding_vector') is not None)
+        observability.log_info(
+            f"Embedded {embedded_count} of {len(chunks)} chunks",
+            gemini_client_instance.get_embedding_stats()
+        )
+        return embedded_count, failed_batches
+
+    @staticmethod
+    def _text_key(text: str) -> str:
+        """Content hash identifying a chunk text in the checkpoint."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.store.storage_dir, "embedding_checkpoint.jsonl")
+
+    def _load_checkpoint(self) -> Dict[str, List[float]]:
+        """Load checkpointed embeddings keyed by text hash, skipping a torn last line."""
+        checkpoint = {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    checkpoint[entry['key']] = entry['embedding']
         except FileNotFoundError:
-            observability.log_warning("Embeddings storage files not found. Run embedding process first.")
+            pass
+        return checkpoint
+
+    def _append_checkpoint(self, chunks: List[dict]):
+        """Append the embeddings of a finished batch to the checkpoint."""
+        os.makedirs(self.store.storage_dir, exist_ok=True)
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(json.dumps({'key': self._text_key(chunk['text_content']), 'embedding': chunk['embedding_vector']}) + "\n")
+
+    def _clear_checkpoint(self):
+        """Remove the checkpoint once the whole job has been stored."""
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.store.storage_dir, "manifest.json")
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the index manifest (per-file mtimes, hashes and chunk ids)."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        """Atomically replace the index manifest."""
+        os.makedirs(self.store.storage_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_stored_chunks(self) -> Dict[str, Tuple[dict, np.ndarray]]:
+        """Map chunk id to (metadata, stored vector) for the current local store."""
+        try:
+            data = self.store.open()
+        except Exception as e:
+            observability.log_warning(f"Could not open embedding store for incremental indexing: {str(e)}")
+            return {}
+        if data is None:
+            return {}
+        return {chunk['id']: (chunk, data['vectors'][i]) for i, chunk in enumerate(data['chunks'])}
+
+    @staticmethod
+    def _reuse_chunks(chunk_ids: List[str], stored_chunks: Dict[str, Tuple[dict, np.ndarray]]) -> Optional[List[dict]]:
+        """Rebuild a file's chunks from the store, or None if any of them is missing."""
+        if not all(chunk_id in stored_chunks for chunk_id in chunk_ids):
+            return None
+        chunks = []
+        for chunk_id in chunk_ids:
+            metadata, vector = stored_chunks[chunk_id]
+            chunk = dict(metadata)
+            chunk['embedding_vector'] = vector.tolist()
+            chunks.append(chunk)
+        return chunks
+
+    def load_embeddings(self) -> Dict[str, Any]:
+        """
+        Load stored embeddings from the binary embedding store.
+
+        Legacy JSON storage files are migrated into the store the first time
+        they are found without one.
+
+        Returns:
+            Dictionary containing the embeddings matrix (read-only memmap),
+            whether its rows are normalized, and the chunk information
+        """
+        empty = {
+            'embeddings': np.zeros((0, 0), dtype=np.float32),
+            'normalized': True,
+            'chunk_ids': [],
+            'chunks': []
+        }
+
+        try:
+            if not self.store.exists():
+                migrated = self.store.migrate_from_json(self.embeddings_storage_path, self.chunk_storage_path)
+                if migrated:
+                    observability.log_info(
+                        "Migrated legacy JSON embeddings to the binary store",
+                        {"chunk_count": migrated, "storage_dir": self.store.storage_dir}
+                    )
+
+            data = self.store.open()
+            if data is None:
+                observability.log_warning("Embeddings storage files not found. Run embedding process first.")
+                return empty
+
             return {
-                'embeddings': [],
-                'chunk_ids': [],
-                'chunks': []
+                'embeddings': data['vectors'],
+                'normalized': data['header'].get('normalized', False),
+                'chunk_ids': [chunk['id'] for chunk in data['chunks']],
+                'chunks': data['chunks']
             }
         except Exception as e:
             observability.log_error(f"Error loading embeddings: {str(e)}")
-            return {
-                'embeddings': [],
-                'chunk_ids': [],
-                'chunks': []
-            }
+            return empty
 
 
 # Global instance
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.core import gemini_client as gc_module
+from src.services.rag_service import rag_service
+from src.utils.observability import observability
+from src.utils.intent_router import intent_router, GREETING, STRUCTURAL, CHAPTER, BOOK_MENTOR, RAG
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Example messages per intent; a message takes the intent of its most similar example
+PROTOTYPES: Dict[str, List[str]] = {
+    GREETING: [
+        "Hello, nice to meet you",
+        "Hey, how is it going today?",
+        "Good morning assistant",
+    ],
+    STRUCTURAL: [
+        "How is the book organized?",
+        "What topics does the book cover, chapter by chapter?",
+        "Give me an overview of the book's outline",
+        "How long is the book and how is it divided?",
+    ],
+    CHAPTER: [
+        "Summarize chapter 5",
+        "What is chapter 3 about?",
+        "Give me the key points of chapter two",
+        "What does the chapter on locomotion cover?",
+    ],
+    BOOK_MENTOR: [
+        "Is this book a good fit for someone new to robotics?",
+        "What do I need to know before reading this book?",
+        "How much time should I spend on each part of the book?",
+        "Why should I read this book?",
+    ],
+    RAG: [
+        "What is Physical AI?",
+        "How do humanoid robots keep their balance while walking?",
+        "Explain how reinforcement learning is used to train robots",
+        "What sensors do robots use to perceive their environment?",
+        "How does a PID controller work?",
+        "What are the challenges of human-robot interaction?",
+    ],
+}
+
+# Time before loading the prototypes is retried after a failure
+PROTOTYPE_RETRY_SECONDS = 60
+
+
+class IntentService:
+    """
+    Decides how to answer a message with at most one embedding call.
+
+    The precompiled intent router runs first. Greetings, structural, chapter and
+    book mentor questions are not embedded up front (mentor answers are cached by
+    question text), nor are keyword questions retrieval answers from BM25 alone.
+    Every other message is embedded once; when the regexes found no intent, the
+    embedding is compared with the cached prototype embeddings of every intent,
+    which catches paraphrases the regexes miss ("what do I need to know before
+    reading this?"). The embedding is returned so retrieval reuses it.
+    """
+
+    def __init__(self):
+        # (row-normalized prototype matrix, intent of every row)
+        self._prototypes: Optional[Tuple[np.ndarray, List[str]]] = None
+        self._lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    async def load_prototypes(self) -> int:
+        """
+        Embed the intent prototypes, once per process.
+
+        The embeddings go through the Gemini client's persistent embedding cache,
+        so after the first run they are loaded without an API call.
+
+        Returns:
+            Number of prototypes loaded
+        """
+        if self._prototypes is not None:
+            return len(self._prototypes[1])
+
+        async with self._lock:
+            if self._prototypes is None:
+                gemini_client_instance = gc_module.gemini_client
+                if gemini_client_instance is None:
+                    raise RuntimeError("Gemini client not initialized")
+
+                labels = [intent for intent, examples in PROTOTYPES.items() for _ in examples]
+                texts = [example for examples in PROTOTYPES.values() for example in examples]
+                embeddings = await gemini_client_instance.generate_embeddings_async(texts)
+
+                matrix = np.asarray(embeddings, dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._prototypes = (matrix / np.where(norms == 0, 1, norms), labels)
+                logger.info(f"Loaded {len(labels)} intent prototypes")
+        return len(self._prototypes[1])
+
+    async def _loaded_prototypes(self) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """Get the prototypes, loading them if needed; None while they cannot be loaded."""
+        if self._prototypes is None:
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                await self.load_prototypes()
+            except Exception as e:
+                logger.warning(f"Could not load intent prototypes, using the intent regexes only: {str(e)}")
+                self._retry_at = time.monotonic() + PROTOTYPE_RETRY_SECONDS
+                return None
+        return self._prototypes
+
+    async def classify_embedding(self, embedding: List[float]) -> Optional[str]:
+        """
+        Find the intent of a message from its embedding.
+
+        Args:
+            embedding: The message embedding
+
+        Returns:
+            The intent of the most similar prototype if it is not RAG, at least
+            INTENT_PROTOTYPE_THRESHOLD similar and INTENT_PROTOTYPE_MARGIN closer than
+            the best RAG prototype; otherwise None
+        """
+        prototypes = await self._loaded_prototypes()
+        if prototypes is None:
+            return None
+        matrix, labels = prototypes
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector_norm = np.linalg.norm(vector)
+        if vector_norm == 0 or vector.shape[0] != matrix.shape[1]:
+            return None
+        similarities = matrix @ (vector / vector_norm)
+
+        best_scores: Dict[str, float] = {}
+        for label, similarity in zip(labels, similarities.tolist()):
+            best_scores[label] = max(best_scores.get(label, -1.0), similarity)
+
+        intent = max(best_scores, key=best_scores.get)
+        if (intent == RAG or best_scores[intent] < settings.intent_prototype_threshold
+                or best_scores[intent] - best_scores.get(RAG, -1.0) < settings.intent_prototype_margin):
+            return None
+        observability.increment(f"intent_prototype_{intent}_hits")
+        return intent
+
+    async def route(self, question: str) -> Tuple[str, Optional[List[float]]]:
+        """
+        Classify a message and compute the embedding its answer needs.
+
+        Args:
+            question: The user's message
+
+        Returns:
+            Tuple of (intent, question embedding or None if the message was not embedded)
+        """
+        intent = intent_router.classify(question)
+        if intent in (GREETING, STRUCTURAL, CHAPTER, BOOK_MENTOR):
+            # Answered from the chapter catalog or the mentor prompt; retrieval embeds the question only if it needs to
+            return intent, None
+        if rag_service.answers_from_keywords(question):
+            return intent, None
+
+        # Embedded once for both the prototype classification and retrieval
+        question_embedding = await rag_service.embed_question(question)
+        if settings.intent_prototypes_enabled:
+            prototype_intent = await self.classify_embedding(question_embedding)
+            if prototype_intent == CHAPTER and not intent_router.chapter_reference(question):
+                # Chapter questions are answered from the named chapter; without one, retrieve from the whole book
+                prototype_intent = None
+            intent = prototype_intent or intent
+        return intent, question_embedding
+
+
+# Global instance
+intent_service = IntentService()
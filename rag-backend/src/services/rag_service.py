@@ -1,12 +1,22 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from src.core import gemini_client as gc_module
 from src.core import qdrant_client as qc_module  # Now enabled
 from src.core.postgres_client import postgres_client
+from src.core.vector_store import VectorStore, LocalVectorStore, QdrantVectorStore
+from src.core.embedding_cache import EmbeddingCache
+from src.core.chapter_catalog import ChapterCatalog, NUMBER_WORDS
+from src.config.settings import settings
 from src.services.database_service import database_service
 from src.services.embedding_service import embedding_service  # Now needed for local storage fallback
 from src.utils.observability import observability
+from src.utils.cache import TTLCache
+from src.utils.semantic_cache import SemanticAnswerCache
+from src.utils.intent_router import intent_router, STRUCTURAL, CHAPTER
 from src.utils.validation import ValidationUtils
 from src.models.data_models import QueryLog
+import os
+import re
+import asyncio
 import uuid
 from datetime import datetime
 import numpy as np
@@ -26,10 +36,111 @@ def get_qdrant_client():
 
 logger = logging.getLogger(__name__)
 
+# Structural questions answered from the chapter catalog alone, without generation.
+# They must match the whole (normalized) question, so a question with a topical
+# remainder ("how many chapters talk about ethics?") goes to retrieval or generation.
+BOOK_REFERENCE = r"(?: (?:in|of) (?:the|this) book)?"
+CHAPTER_REFERENCE = r"(?:the )?chapter (?:(?:on|about) (?:the )?[a-z0-9 ]+?|[a-z0-9]+)"
+POLITE_PREFIX = r"(?:(?:can|could|would) you |please )?"
+TABLE_OF_CONTENTS_PATTERN = re.compile(
+    r"how many chapters(?: are there| does (?:the|this) book (?:have|contain)| does it have| are in (?:the|this) book)?"
+    r"|what is the number of chapters" + BOOK_REFERENCE +
+    r"|" + POLITE_PREFIX + r"(?:list|show|name|give|tell)(?: me)?(?: all)?(?: of)? the chapters" + BOOK_REFERENCE +
+    r"|(?:what|which) are (?:all )?the chapters" + BOOK_REFERENCE +
+    r"|what chapters (?:are there|are in (?:the|this) book|does (?:the|this) book (?:have|contain))"
+    r"|(?:what is |show me |give me )?(?:the )?table of contents" + BOOK_REFERENCE
+)
+BOOK_SUMMARY_PATTERN = re.compile(
+    POLITE_PREFIX + r"(?:summari[sz]e (?:the|this) book"
+    r"|(?:give me |what is )?(?:a |an |the )?(?:short |brief )?(?:summary|overview) of (?:the|this) book"
+    r"|(?:the )?book (?:summary|overview))"
+)
+CHAPTER_TITLE_PATTERN = re.compile(
+    r"(?:what is |tell me |give me )?the (?:name|title) of " + CHAPTER_REFERENCE +
+    r"|what is " + CHAPTER_REFERENCE + r" (?:called|named|titled)"
+)
+CHAPTER_SUMMARY_PATTERN = re.compile(
+    POLITE_PREFIX + r"(?:summari[sz]e|outline) " + CHAPTER_REFERENCE +
+    r"|" + POLITE_PREFIX + r"(?:give me |show me |what is |what are )?(?:a |an |the )?(?:short |brief |quick )?"
+    r"(?:summary|overview|outline|gist|key points|main points|main ideas) of " + CHAPTER_REFERENCE +
+    r"|what is (?:in )?" + CHAPTER_REFERENCE + r" about"
+    r"|what does " + CHAPTER_REFERENCE + r" cover"
+    r"|tell me about " + CHAPTER_REFERENCE +
+    r"|" + CHAPTER_REFERENCE + r" (?:summary|overview)"
+)
+
+
+def is_whole_question(pattern: "re.Pattern", question: str) -> bool:
+    """
+    Check whether a pattern matches an entire question.
+
+    The question is lowercased, stripped of punctuation and of a trailing "please"
+    first, and "what's" is read as "what is".
+    """
+    normalized = question.lower().replace("what's", "what is")
+    normalized = " ".join(re.sub(r"[^a-z0-9 ]+", " ", normalized).split())
+    normalized = re.sub(r"(?: please)+$", "", normalized)
+    return pattern.fullmatch(normalized) is not None
+
 
 class RagService:
     def __init__(self):
-        pass
+        # Qdrant when it is reachable, otherwise the resident index over the local
+        # storage files (rebuilt only when they change); both return the same shape
+        self.qdrant_store = QdrantVectorStore(get_qdrant_client)
+        self.local_store = LocalVectorStore(
+            embedding_service.store,
+            loader=embedding_service.load_embeddings,
+            ann_threshold=settings.local_ann_threshold,
+            ann_n_probe=settings.local_ann_n_probe
+        )
+        # Query embeddings keyed on normalized question text, so repeated questions skip the API
+        self.query_embedding_cache = TTLCache(
+            name="query_embedding",
+            max_size=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds
+        )
+        # Answers reused for near-duplicate questions that retrieve the same chunks
+        self.answer_cache = SemanticAnswerCache(
+            name="answer",
+            max_size=settings.answer_cache_size,
+            similarity_threshold=settings.answer_cache_similarity_threshold
+        ) if settings.answer_cache_enabled else None
+        # Answers reused for repeats of the same normalized question on paths without
+        # retrieval (book mentor), where there are no chunks to compare
+        self.text_answer_cache = TTLCache(
+            name="text_answer",
+            max_size=settings.answer_cache_size,
+            ttl_seconds=settings.text_answer_cache_ttl_seconds
+        ) if settings.answer_cache_enabled else None
+        # Chapter numbers, titles and summaries, reloaded when the embedding job rewrites them
+        self.chapter_catalog = ChapterCatalog(settings.chapter_info_path)
+        # Summaries generated when the book was processed, if enabled
+        self.summary_index = embedding_service.summary_index
+
+    def index_version(self) -> tuple:
+        """
+        Identify the current state of the indexed book.
+
+        Changes whenever the book is re-embedded (the embedding store is rewritten on
+        every run that changes it), in this or any other worker.
+        """
+        return os.getenv("BOOK_VERSION", "1.0"), embedding_service.store.signature()
+
+    def load_chapter_info(self) -> List[dict]:
+        """
+        Get the chapter list written by the embedding job.
+
+        The list is kept resident in the chapter catalog and re-read only when the file changes.
+
+        Returns:
+            List of dicts with 'title', 'path', 'content_preview', 'number', 'heading',
+            'summary' and 'sections', in book order
+
+        Raises:
+            FileNotFoundError: If the book has not been embedded yet
+        """
+        return self.chapter_catalog.chapters()
 
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -49,50 +160,122 @@ class RagService:
 
         return dot_product / (norm_v1 * norm_v2)
 
-    def find_similar_chunks(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Normalize question text for cache lookups (case, whitespace, trailing punctuation)."""
+        return " ".join(question.lower().split()).rstrip("?!. ")
+
+    def text_cache_key(self, scope: str, question: str) -> tuple:
+        """Key of a question in the exact-text answer cache: scope, normalized text and index version."""
+        return scope, self._normalize_question(question), self.index_version()
+
+    async def embed_question(self, question: str) -> List[float]:
         """
-        Find the most similar chunks to the query using cosine similarity.
+        Embed a question, serving repeated questions from the query embedding cache.
+
+        The in-process LRU cache is consulted first; when QUERY_EMBEDDING_CACHE_SHARED is
+        enabled, the persistent embedding cache shared by all workers is tried next.
 
         Args:
-            query_embedding: The embedding of the query
-            top_k: Number of top similar chunks to return
+            question: The question to embed
 
         Returns:
-            List of similar chunks
+            The question embedding
         """
-        # Load stored embeddings
-        embeddings_data = embedding_service.load_embeddings()
+        return (await self.embed_questions([question]))[0]
 
-        if not embeddings_data['embeddings'] or not embeddings_data['chunks']:
-            return []  # No embeddings available
+    async def embed_questions(self, questions: List[str]) -> List[List[float]]:
+        """
+        Embed several questions, with one batched embedding call for the cache misses.
 
-        # Calculate similarity scores
-        similarities = []
-        for i, stored_embedding in enumerate(embeddings_data['embeddings']):
-            similarity = self.cosine_similarity(query_embedding, stored_embedding)
-            similarities.append((similarity, i))
+        Args:
+            questions: The questions to embed
 
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[0], reverse=True)
+        Returns:
+            The question embeddings, in the same order
+        """
+        normalized_questions = [self._normalize_question(question) for question in questions]
+        embeddings: Dict[str, List[float]] = {}
+        for normalized_question in normalized_questions:
+            if normalized_question not in embeddings:
+                embedding = self.query_embedding_cache.get(normalized_question)
+                if embedding is not None:
+                    embeddings[normalized_question] = embedding
+
+        # One question text per normalized form still missing
+        missing = {}
+        for question, normalized_question in zip(questions, normalized_questions):
+            if normalized_question not in embeddings:
+                missing.setdefault(normalized_question, question)
+
+        if missing:
+            gemini_client_instance = get_gemini_client()
+            if gemini_client_instance is None:
+                raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
+
+            shared_cache = gemini_client_instance.embedding_cache if settings.query_embedding_cache_shared else None
+            shared_keys = {}
+            if shared_cache is not None:
+                shared_keys = {
+                    normalized_question: EmbeddingCache.make_key(gemini_client_instance.embedding_model, "normalized_query", normalized_question)
+                    for normalized_question in missing
+                }
+                try:
+                    shared_hits = shared_cache.get_many(shared_keys.values())
+                except Exception as e:
+                    logger.warning(f"Shared query embedding cache lookup failed, embedding the questions: {str(e)}")
+                    shared_hits = {}
+                for normalized_question in list(missing):
+                    embedding = shared_hits.get(shared_keys[normalized_question])
+                    if embedding is not None:
+                        observability.increment("query_embedding_shared_cache_hits")
+                        embeddings[normalized_question] = embedding
+                        self.query_embedding_cache.set(normalized_question, embedding)
+                        del missing[normalized_question]
+
+            if missing:
+                # Questions stay out of the persistent cache unless it is shared on purpose (above)
+                new_embeddings = await gemini_client_instance.generate_embeddings_async(list(missing.values()), use_cache=False)
+                for normalized_question, embedding in zip(missing, new_embeddings):
+                    embeddings[normalized_question] = embedding
+                    self.query_embedding_cache.set(normalized_question, embedding)
+                if shared_cache is not None:
+                    try:
+                        shared_cache.put_many({shared_keys[normalized_question]: embeddings[normalized_question] for normalized_question in missing})
+                    except Exception as e:
+                        logger.warning(f"Failed to write question embeddings to the shared cache: {str(e)}")
+
+        return [embeddings[normalized_question] for normalized_question in normalized_questions]
 
-        # Get top-k similar chunks
-        top_chunks = []
-        for _, idx in similarities[:top_k]:
-            if idx < len(embeddings_data['chunks']):
-                chunk = embeddings_data['chunks'][idx].copy()
-                # Add similarity score for reference
-                chunk['similarity'] = similarities[idx][0]
-                top_chunks.append(chunk)
+    def find_similar_chunks(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
+        """
+        Find the most similar chunks to the query using cosine similarity
+        against the resident local vector index.
 
-        return top_chunks
+        Args:
+            query_embedding: The embedding of the query
+            top_k: Number of top similar chunks to return
 
-    def answer_question_with_rag(self, question: str, session_id: str) -> Dict[str, Any]:
+        Returns:
+            List of similar chunks
+        """
+        return self.local_store.index.search(query_embedding, top_k=top_k)
+
+    async def answer_question_with_rag(
+        self,
+        question: str,
+        session_id: str,
+        intent: Optional[str] = None,
+        question_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """
         Answer a question using the RAG (Retrieval-Augmented Generation) approach.
 
         Args:
             question: The question to answer
             session_id: The session ID for tracking
+            intent: The question's intent if already classified (see prepare_answer)
+            question_embedding: The question's embedding if already computed (see prepare_answer)
 
         Returns:
             Dictionary containing the answer and sources
@@ -108,30 +291,12 @@ class RagService:
             if not ValidationUtils.validate_session_id(session_id):
                 raise ValueError("Invalid session ID format")
 
-            # Check if this is a structural question (about book organization)
-            is_structural_question = self._is_structural_question(question)
-
-            if is_structural_question:
-                # Handle structural questions specially
-                answer, sources = self._handle_structural_question(question, session_id)
-            else:
-                # Handle regular questions using RAG
-                answer, sources = self._handle_regular_question(question, session_id)
+            plan = await self.prepare_answer(question, session_id, intent=intent, question_embedding=question_embedding)
+            answer = await self.generate_answer(plan)
+            sources = plan['sources']
 
             # Store the query and response in the database
-            query_id = database_service.store_question({
-                'text': question,
-                'mode': 'RAG',
-                'session_id': session_id
-            })
-
-            database_service.store_query_log({
-                'question_id': query_id,
-                'response_text': answer,
-                'mode_used': 'RAG',
-                'retrieved_chunks': [s.get('id', '') for s in sources],
-                'response_time_ms': int(observability.stop_timer(start_time) * 1000)
-            })
+            self.log_query(question, session_id, answer, sources, start_time)
 
             elapsed_time = observability.stop_timer(start_time)
             observability.log_info(
@@ -157,63 +322,292 @@ class RagService:
             # Re-raise the exception to be handled by the API layer
             raise e
 
-    def _is_structural_question(self, question: str) -> bool:
+    async def answer_questions_batch(
+        self,
+        questions: List[str],
+        session_id: str,
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Check if the question is about book structure (chapters, sections, etc.)
+        Answer many questions at once, e.g. an offline evaluation set.
+
+        All regular questions are embedded with one batched call and retrieved with one
+        matrix-matrix product (or one Qdrant search_batch), fused with their keyword
+        results; the generation calls then run
+        concurrently. A failing question does not fail the batch.
+
+        Args:
+            questions: The questions to answer
+            session_id: The session ID the questions are logged under
+            concurrency: Maximum generation calls in flight (defaults to BATCH_QUERY_CONCURRENCY)
+
+        Returns:
+            One dictionary per question, in order, with question, answer, sources,
+            mode_used and error (None on success, answer is None on failure)
         """
-        question_lower = question.lower()
-        structural_keywords = [
-            'how many chapters', 'how many sections', 'how many parts',
-            'list all chapters', 'list all sections', 'list all parts',
-            'chapter', 'section', 'part', 'contents', 'table of contents',
-            'what chapters', 'which chapters', 'all chapters', 'chapters',
-            'book structure', 'organization', 'number of chapters'
-        ]
+        start_time = observability.start_timer()
 
-        # Check if it's asking about specific chapters like "chapter 13" or "chapter 13 summary"
-        import re
-        chapter_pattern = r'chapter\s+\d+|chapter\s+\w+'
-        specific_chapter_match = re.search(chapter_pattern, question_lower)
+        if not ValidationUtils.validate_session_id(session_id):
+            raise ValueError("Invalid session ID format")
 
-        return any(keyword in question_lower for keyword in structural_keywords) or bool(specific_chapter_match)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(questions)
+        plans: List[Optional[Dict[str, Any]]] = [None] * len(questions)
+        regular_positions = []
+        structural_positions = []
+        for position, question in enumerate(questions):
+            is_valid, error_msg = ValidationUtils.validate_question_text(question)
+            if not is_valid:
+                results[position] = self._batch_result(question, error=error_msg)
+            elif self._is_structural_question(question):
+                structural_positions.append(position)
+            else:
+                regular_positions.append(position)
+
+        # Regular questions: one embedding call and one retrieval for the whole batch
+        if regular_positions:
+            try:
+                question_embeddings, similar_chunk_lists = await self._retrieve_questions([questions[position] for position in regular_positions])
+                for position, question_embedding, similar_chunks in zip(regular_positions, question_embeddings, similar_chunk_lists):
+                    plans[position] = self._plan_from_chunks(questions[position], question_embedding, similar_chunks)
+            except Exception as e:
+                # Retry the questions one by one, so only the ones that fail on their own are reported
+                logger.warning(f"Batch retrieval failed, retrieving {len(regular_positions)} questions individually: {str(e)}")
+                for position in regular_positions:
+                    try:
+                        plans[position] = await self._handle_regular_question(questions[position], session_id)
+                    except Exception as question_error:
+                        results[position] = self._batch_result(questions[position], error=str(question_error))
+
+        # Structural questions are rare and go through their dedicated handler
+        for position in structural_positions:
+            try:
+                plans[position] = await self._handle_structural_question(questions[position], session_id)
+            except Exception as e:
+                results[position] = self._batch_result(questions[position], error=str(e))
+
+        semaphore = asyncio.Semaphore(concurrency or settings.batch_query_concurrency)
+
+        async def answer(position: int):
+            question, plan = questions[position], plans[position]
+            async with semaphore:
+                try:
+                    answer_text = await self.generate_answer(plan)
+                except Exception as e:
+                    results[position] = self._batch_result(question, error=str(e))
+                    return
+            self.log_query(question, session_id, answer_text, plan['sources'], start_time)
+            results[position] = self._batch_result(question, answer=answer_text, sources=plan['sources'])
+
+        await asyncio.gather(*(answer(position) for position, plan in enumerate(plans) if plan is not None))
+
+        elapsed_time = observability.stop_timer(start_time)
+        failed = sum(1 for result in results if result['error'] is not None)
+        observability.log_info(
+            "RAG batch answered",
+            {"duration_seconds": elapsed_time, "session_id": session_id, "questions": len(questions), "failed": failed}
+        )
+        return results
+
+    @staticmethod
+    def _batch_result(question: str, answer: Optional[str] = None, sources: Optional[list] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        """Build the result entry of one question of a batch."""
+        return {
+            "question": question,
+            "answer": answer,
+            "sources": sources or [],
+            "mode_used": "RAG",
+            "error": error
+        }
+
+    async def prepare_answer(
+        self,
+        question: str,
+        session_id: str,
+        intent: Optional[str] = None,
+        question_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the context for a question and decide how to answer it, without generating.
 
-    def _handle_structural_question(self, question: str, session_id: str) -> tuple[str, list]:
+        Args:
+            question: The question to answer
+            session_id: The session ID for tracking
+            intent: The question's intent if already classified (see IntentService.route);
+                    classified with the intent router otherwise
+            question_embedding: The question's embedding if already computed; retrieval
+                                then reuses it instead of embedding the question again
+
+        Returns:
+            Answer plan (see make_answer_plan) to pass to generate_answer or stream_answer
         """
-        Handle questions about book structure specially.
+        # Check if this is a structural question (about book organization)
+        is_structural = intent in (STRUCTURAL, CHAPTER) if intent is not None else self._is_structural_question(question)
+        if is_structural:
+            # Handle structural questions specially
+            return await self._handle_structural_question(question, session_id, question_embedding=question_embedding)
+
+        # Handle regular questions using RAG
+        return await self._handle_regular_question(question, session_id, question_embedding=question_embedding)
+
+    @staticmethod
+    def make_answer_plan(
+        sources: list,
+        prompt: Optional[str] = None,
+        answer: Optional[str] = None,
+        cache_entry: Optional[tuple] = None,
+        text_cache_key: Optional[tuple] = None
+    ) -> Dict[str, Any]:
+        """
+        Describe how to answer a question once retrieval is done.
+
+        Either prompt (the answer still has to be generated from it) or answer (already known)
+        is set. cache_entry holds (embedding, chunk_ids, index_version, scope) under which a
+        generated answer is stored in the answer cache; text_cache_key (see text_cache_key)
+        stores it in the exact-text answer cache instead.
         """
+        return {
+            'prompt': prompt, 'answer': answer, 'sources': sources,
+            'cache_entry': cache_entry, 'text_cache_key': text_cache_key
+        }
+
+    async def generate_answer(self, plan: Dict[str, Any]) -> str:
+        """
+        Produce the full answer for an answer plan.
+
+        Args:
+            plan: Plan returned by prepare_answer
+
+        Returns:
+            The answer text
+        """
+        if plan['answer'] is not None:
+            return plan['answer']
+
         gemini_client_instance = get_gemini_client()
         if gemini_client_instance is None:
             raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
 
+        answer = await gemini_client_instance.generate_response_async(plan['prompt'])
+        self._cache_answer(plan, answer)
+        return answer
+
+    async def stream_answer(self, plan: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream the answer for an answer plan as text fragments.
+
+        Args:
+            plan: Plan returned by prepare_answer
+
+        Yields:
+            Answer text fragments in order
+        """
+        if plan['answer'] is not None:
+            yield plan['answer']
+            return
+
+        gemini_client_instance = get_gemini_client()
+        if gemini_client_instance is None:
+            raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
+
+        parts = []
+        async for text in gemini_client_instance.generate_response_stream(plan['prompt']):
+            parts.append(text)
+            yield text
+        self._cache_answer(plan, "".join(parts))
+
+    def _cache_answer(self, plan: Dict[str, Any], answer: str):
+        """Store a freshly generated answer in the answer cache if the plan allows it."""
+        if self.text_answer_cache is not None and plan.get('text_cache_key') is not None:
+            self.text_answer_cache.set(plan['text_cache_key'], answer)
+        if self.answer_cache is None or plan.get('cache_entry') is None:
+            return
+        embedding, chunk_ids, index_version, scope = plan['cache_entry']
+        self.answer_cache.set(embedding, chunk_ids, index_version, answer, plan['sources'], scope=scope)
+
+    def log_query(self, question: str, session_id: str, answer: str, sources: list, start_time: float):
+        """
+        Queue an answered RAG question and its query log for a background bulk insert.
+
+        Args:
+            question: The question that was answered
+            session_id: The session ID for tracking
+            answer: The answer returned to the user
+            sources: The sources returned with the answer
+            start_time: Timer value from when the request started
+        """
+        query_id = database_service.queue_question({
+            'text': question,
+            'mode': 'RAG',
+            'session_id': session_id
+        })
+
+        database_service.queue_query_log({
+            'question_id': query_id,
+            'response_text': answer,
+            'mode_used': 'RAG',
+            'retrieved_chunks': [s.get('id', '') for s in sources],
+            'response_time_ms': int(observability.stop_timer(start_time) * 1000)
+        })
+
+    def _is_structural_question(self, question: str) -> bool:
+        """
+        Check if the question is about book structure (chapters, sections, etc.)
+        """
+        return intent_router.is_structural(question)
+
+    async def _handle_structural_question(
+        self,
+        question: str,
+        session_id: str,
+        question_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Handle questions about book structure specially.
+        """
         # Check if this is a specific chapter query (e.g., "chapter 13", "chapter on robotics")
-        import re
-        chapter_pattern = r'chapter\s+(\d+|\w+)'
-        chapter_match = re.search(chapter_pattern, question.lower())
+        chapter_identifier = intent_router.chapter_reference(question)
 
-        if chapter_match:
+        if chapter_identifier:
             # This is a query about a specific chapter
-            chapter_identifier = chapter_match.group(1).lower()
-            return self._handle_specific_chapter_query(question, chapter_identifier, session_id)
+            return await self._handle_specific_chapter_query(question, chapter_identifier, session_id, question_embedding)
 
         # Otherwise, handle general structural questions
         try:
-            import json
-            with open("chapter_info.json", 'r', encoding='utf-8') as f:
-                chapter_info = json.load(f)
-
-            # Create a context with all chapter information
-            all_chapter_titles = [info['title'] for info in chapter_info]
-            book_structure_context = f"""
-            The book contains the following {len(all_chapter_titles)} chapters:
-            {', '.join(all_chapter_titles)}
-            """
+            chapters = self.chapter_catalog.numbered_chapters()
+            table_of_contents = self._format_table_of_contents(chapters)
+
+            # Create source for book structure
+            sources = [{
+                "chapter_title": "BOOK_STRUCTURE_INDEX",
+                "source_file": os.path.basename(settings.chapter_info_path),
+                "text_preview": table_of_contents[:200] + "..."
+            }]
+
+            if is_whole_question(TABLE_OF_CONTENTS_PATTERN, question):
+                # Counting or listing the chapters needs no generation
+                observability.increment("structural_answers_without_llm")
+                return self.make_answer_plan(sources, answer=table_of_contents)
+
+            book_summary = None
+            if is_whole_question(BOOK_SUMMARY_PATTERN, question):
+                book_summary = self.summary_index.book_summary(
+                    {chapter['path']: chapter.get('sha256') for chapter in self.chapter_catalog.chapters()}
+                )
+            if book_summary:
+                observability.increment("structural_answers_without_llm")
+                return self.make_answer_plan(sources, answer=f"{book_summary}\n\n{table_of_contents}")
+
+            # Create a context with every chapter's title and summary
+            book_structure_context = "\n".join(
+                f"- {self._chapter_label(chapter)}: {chapter.get('summary', '')}" for chapter in chapters
+            )
 
             # Generate response using the book structure context with professional mentor approach
             enhanced_prompt = f"""
             You are acting as a professional mentor for the book on Physical AI and Robotics.
             The user has asked: "{question}"
 
-            Based on the following information about the book's structure, provide a comprehensive,
+            Based on the following information about the book's {len(chapters)} chapters, provide a comprehensive,
             professional response:
 
             {book_structure_context}
@@ -226,161 +620,350 @@ class RagService:
 
             Answer:
             """
-            answer = gemini_client_instance.generate_response(enhanced_prompt)
-
-            # Create source for book structure
-            sources = [{
-                "chapter_title": "BOOK_STRUCTURE_INDEX",
-                "source_file": "chapter_info.json",
-                "text_preview": book_structure_context[:200] + "..."
-            }]
-
-            return answer, sources
+            return self.make_answer_plan(sources, prompt=enhanced_prompt)
 
         except FileNotFoundError:
             # If chapter info file doesn't exist, fall back to regular RAG
-            return self._handle_regular_question(question, session_id)
+            return await self._handle_regular_question(question, session_id, question_embedding)
         except Exception as e:
             logger.error(f"Error handling structural question: {e}")
             # Fall back to regular RAG if there's an issue
-            return self._handle_regular_question(question, session_id)
+            return await self._handle_regular_question(question, session_id, question_embedding)
+
+    @staticmethod
+    def _chapter_label(chapter: dict) -> str:
+        """Display name of a chapter, e.g. 'Chapter 5: Robot Locomotion'."""
+        heading = chapter.get('heading') or chapter['title']
+        return f"Chapter {chapter['number']}: {heading}" if chapter.get('number') is not None else heading
+
+    def _format_table_of_contents(self, chapters: List[dict]) -> str:
+        """Answer listing the chapters of the book."""
+        lines = [f"- {self._chapter_label(chapter)}" for chapter in chapters]
+        return f"The book contains {len(chapters)} chapters:\n\n" + "\n".join(lines)
+
+    @staticmethod
+    def _chapter_source(chapter: dict) -> Dict[str, str]:
+        """Source entry pointing at a whole chapter."""
+        return {
+            "chapter_title": chapter['title'],
+            "source_file": chapter['path'],
+            "text_preview": chapter['content_preview'] + "..."
+        }
+
+    def _chapter_summary_answer(self, chapter: dict, label: str) -> Optional[str]:
+        """
+        Answer a chapter summary request from the precomputed summaries.
+
+        Uses the generated chapter and section summaries when the book was processed
+        with INDEX_SUMMARIES_ENABLED, the extractive catalog summary otherwise.
 
-    def _handle_specific_chapter_query(self, question: str, chapter_identifier: str, session_id: str) -> tuple[str, list]:
+        Returns:
+            The answer, or None if the chapter has no summary
         """
-        Handle queries about a specific chapter.
+        generated = self.summary_index.chapter_summary(chapter['path'], chapter.get('sha256'))
+        if generated is not None:
+            answer = f"{label}\n\n{generated['summary']}"
+            if generated['sections']:
+                answer += "\n\nThe chapter covers:\n" + "\n".join(
+                    f"- {section['title']}: {section['summary']}" for section in generated['sections']
+                )
+            return answer
+
+        if not chapter.get('summary'):
+            return None
+        answer = f"{label}\n\n{chapter['summary']}"
+        if chapter.get('sections'):
+            answer += "\n\nThe chapter covers:\n" + "\n".join(f"- {section}" for section in chapter['sections'])
+        return answer
+
+    async def _handle_specific_chapter_query(
+        self,
+        question: str,
+        chapter_identifier: str,
+        session_id: str,
+        question_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """
-        gemini_client_instance = get_gemini_client()
-        if gemini_client_instance is None:
-            raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
+        Handle queries about a specific chapter.
 
+        Title and summary requests are answered from the chapter catalog; other
+        questions are answered from the chapter's own chunks (see _retrieve_chapter).
+        """
         try:
-            import json
-            with open("chapter_info.json", 'r', encoding='utf-8') as f:
-                chapter_info = json.load(f)
-
-            # Find the matching chapter
-            matching_chapter = None
-            for info in chapter_info:
-                # Check if the identifier matches the chapter title or part of it
-                if (chapter_identifier == info['title'].lower() or
-                    chapter_identifier in info['title'].lower() or
-                    info['title'].lower().startswith(chapter_identifier)):
-                    matching_chapter = info
-                    break
-
-            if matching_chapter:
-                # We found the specific chapter, now we need to get its full content
-                # For this, we'll use the regular RAG search but with a more targeted query
-                # First, let's try to find content related to this specific chapter
-                targeted_question = f"What is the content of chapter {matching_chapter['title']}?"
-
-                # Generate embedding for the targeted question
-                question_embeddings = gemini_client_instance.generate_embeddings([targeted_question])
-                question_embedding = question_embeddings[0]
-
-                # Use the find_similar_chunks method to find content related to this chapter
-                similar_chunks = self.find_similar_chunks(question_embedding, top_k=5)
-
-                if similar_chunks:
-                    # Use the content of the matching chunks to generate the response
-                    context = [chunk['text_content'] for chunk in similar_chunks if chunk.get('text_content')]
-                    if context:
-                        # Enhance the prompt to make responses more professional and mentor-like
-                        enhanced_prompt = f"""
-                        You are acting as a professional mentor for the book on Physical AI and Robotics.
-                        The user has asked: "{question}"
-
-                        Based on the following context about chapter {matching_chapter['title']}, provide a comprehensive,
-                        professional response that demonstrates expertise in the field:
-
-                        {context}
-
-                        Your response should be:
-                        - Authoritative and based on the book's content
-                        - Professional and educational
-                        - Detailed enough to be helpful
-                        - Connected to the broader concepts in Physical AI and Robotics
-                        - If the context doesn't fully answer the question, acknowledge the limitations
-                          but provide relevant information from what is available
-
-                        Answer:
-                        """
-                        answer = gemini_client_instance.generate_response(enhanced_prompt)
-
-                        # Prepare sources
-                        sources = []
-                        for chunk in similar_chunks:
-                            sources.append({
-                                "chapter_title": chunk.get("chapter_title", ""),
-                                "source_file": chunk.get("source_file", ""),
-                                "text_preview": chunk.get("text_content", "")[:200] + "..." if chunk.get("text_content") else ""
-                            })
-
-                        return answer, sources
-                    else:
-                        # If we have the chapter but no content, return a basic response
-                        answer = f"The name of chapter is \"{matching_chapter['title']}\". Unfortunately, I don't have detailed content for this specific chapter available."
-                        sources = [{
-                            "chapter_title": matching_chapter['title'],
-                            "source_file": matching_chapter['path'],
-                            "text_preview": matching_chapter['content_preview'] + "..."
-                        }]
-                        return answer, sources
-                else:
-                    # If no specific content found, at least return the chapter name
-                    answer = f"The name of chapter is \"{matching_chapter['title']}\". Unfortunately, I couldn't find detailed content for this specific chapter in the available information."
-                    sources = [{
-                        "chapter_title": matching_chapter['title'],
-                        "source_file": matching_chapter['path'],
-                        "text_preview": matching_chapter['content_preview'] + "..."
-                    }]
-                    return answer, sources
-            else:
+            # Resolve the chapter by number ("chapter 5", "chapter five") or title words ("chapter on locomotion")
+            matching_chapter = self.chapter_catalog.find(chapter_identifier)
+
+            if matching_chapter is None and not chapter_identifier.isdigit() and chapter_identifier not in NUMBER_WORDS:
+                # No single chapter matches the topic; retrieve from the whole book instead
+                return await self._handle_regular_question(question, session_id, question_embedding)
+
+            if matching_chapter is None:
                 # Chapter not found
-                answer = f"I couldn't find a chapter matching '{chapter_identifier}' in the book. The book contains the following chapters: {[info['title'] for info in chapter_info][:10]} (showing first 10)."
-                sources = []
-                return answer, sources
+                chapter_labels = [self._chapter_label(chapter) for chapter in self.chapter_catalog.numbered_chapters()]
+                answer = f"I couldn't find a chapter matching '{chapter_identifier}' in the book. The book contains the following chapters: {chapter_labels[:10]} (showing first 10)."
+                return self.make_answer_plan([], answer=answer)
+
+            label = self._chapter_label(matching_chapter)
+            if is_whole_question(CHAPTER_TITLE_PATTERN, question):
+                observability.increment("structural_answers_without_llm")
+                return self.make_answer_plan([self._chapter_source(matching_chapter)], answer=f"{label}.")
+
+            if is_whole_question(CHAPTER_SUMMARY_PATTERN, question):
+                # Summaries are generated or extracted when the book is embedded, so they need no generation
+                answer = self._chapter_summary_answer(matching_chapter, label)
+                if answer is not None:
+                    observability.increment("structural_answers_without_llm")
+                    return self.make_answer_plan([self._chapter_source(matching_chapter)], answer=answer)
+
+            # Fetch that chapter's chunks directly, in reading order
+            similar_chunks = await self._retrieve_chapter(question, matching_chapter['path'], question_embedding)
+
+            # Use the content of the matching chunks to generate the response
+            context = [chunk['text_content'] for chunk in similar_chunks if chunk.get('text_content')]
+            if not context:
+                # If no specific content found, at least return the chapter name and summary
+                answer = f"The chapter is \"{label}\". {matching_chapter.get('summary', '')}".strip()
+                return self.make_answer_plan([self._chapter_source(matching_chapter)], answer=answer)
+
+            # Enhance the prompt to make responses more professional and mentor-like
+            enhanced_prompt = f"""
+            You are acting as a professional mentor for the book on Physical AI and Robotics.
+            The user has asked: "{question}"
+
+            Based on the following context about {label}, provide a comprehensive,
+            professional response that demonstrates expertise in the field:
+
+            {context}
+
+            Your response should be:
+            - Authoritative and based on the book's content
+            - Professional and educational
+            - Detailed enough to be helpful
+            - Connected to the broader concepts in Physical AI and Robotics
+            - If the context doesn't fully answer the question, acknowledge the limitations
+              but provide relevant information from what is available
+
+            Answer:
+            """
+            # Prepare sources
+            sources = []
+            for chunk in similar_chunks:
+                sources.append({
+                    "chapter_title": chunk.get("chapter_title", ""),
+                    "source_file": chunk.get("source_file", ""),
+                    "text_preview": chunk.get("text_content", "")[:200] + "..." if chunk.get("text_content") else ""
+                })
+
+            return self.make_answer_plan(sources, prompt=enhanced_prompt)
 
         except FileNotFoundError:
             # If chapter info file doesn't exist, fall back to regular RAG
-            return self._handle_regular_question(question, session_id)
+            return await self._handle_regular_question(question, session_id, question_embedding)
         except Exception as e:
             logger.error(f"Error handling specific chapter query: {e}")
             # Fall back to regular RAG if there's an issue
-            return self._handle_regular_question(question, session_id)
+            return await self._handle_regular_question(question, session_id, question_embedding)
+
+    async def _retrieve_chapter(
+        self,
+        question: str,
+        source_file: str,
+        question_embedding: Optional[List[float]] = None
+    ) -> List[Dict]:
+        """
+        Get the context chunks of a question about one chapter.
 
-    def _handle_regular_question(self, question: str, session_id: str) -> tuple[str, list]:
+        The chapter's chunks are fetched directly from the vector store. If they fit
+        in CHAPTER_CONTEXT_MAX_CHARS they are all used and the question is not
+        embedded; otherwise they are reranked against the question embedding and
+        the most similar ones that fit are kept.
+
+        Args:
+            question: The question text
+            source_file: The chapter's source file
+            question_embedding: The question's embedding if already computed
+
+        Returns:
+            The selected chunks in reading order (chunk_order)
+        """
+        chunks = await self.vector_store().chapter_chunks(source_file)
+        budget = settings.chapter_context_max_chars
+        lengths = [len(chunk.get('text_content') or "") for chunk in chunks]
+
+        if sum(lengths) > budget:
+            if question_embedding is None:
+                question_embedding = await self.embed_question(question)
+            vectors = np.asarray([chunk['embedding_vector'] for chunk in chunks], dtype=np.float32)
+            query = np.asarray(question_embedding, dtype=np.float32)
+            scores = vectors @ query / np.maximum(np.linalg.norm(vectors, axis=1) * np.linalg.norm(query), 1e-12)
+
+            # Best chunks first while they fit; the best one is always kept
+            selected, used = [], 0
+            for position in np.argsort(-scores):
+                if selected and used + lengths[position] > budget:
+                    continue
+                selected.append(int(position))
+                used += lengths[position]
+            observability.increment("chapter_context_reranks")
+            for position in selected:
+                chunks[position]['score'] = float(scores[position])
+            chunks = [chunks[position] for position in sorted(selected)]
+
+        return [{key: value for key, value in chunk.items() if key != 'embedding_vector'} for chunk in chunks]
+
+    async def _handle_regular_question(
+        self,
+        question: str,
+        session_id: str,
+        question_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """
         Handle regular questions using standard RAG approach.
         """
-        gemini_client_instance = get_gemini_client()
-        if gemini_client_instance is None:
-            raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
+        question_embeddings, similar_chunk_lists = await self._retrieve_questions(
+            [question],
+            question_embeddings=[question_embedding] if question_embedding is not None else None
+        )
+        return self._plan_from_chunks(question, question_embeddings[0], similar_chunk_lists[0])
+
+    async def _retrieve_questions(
+        self,
+        questions: List[str],
+        top_k: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        question_embeddings: Optional[List[List[float]]] = None
+    ) -> Tuple[List[Optional[List[float]]], List[List[Dict]]]:
+        """
+        Retrieve the context chunks of several questions with hybrid search.
 
-        # Generate embedding for the question using Gemini
-        question_embeddings = gemini_client_instance.generate_embeddings([question])
-        question_embedding = question_embeddings[0]  # Get the first (and only) embedding
+        BM25 keyword results and vector results are fused by reciprocal rank. Short
+        questions made of distinctive book terms (e.g. "What is ZMP?") are answered
+        from the keyword results alone, skipping the embedding call.
 
-        # Try to find similar chunks using Qdrant first
-        similar_chunks = []
-        qdrant_client_instance = get_qdrant_client()
+        Args:
+            questions: The questions to retrieve context for
+            top_k: Chunks per question (defaults to RETRIEVAL_TOP_K)
+            filters: Optional metadata values the chunks must match (see _retrieve_batch)
+            question_embeddings: Embeddings of the questions if already computed; they are
+                                 then used for every question, without short-circuiting
 
-        if qdrant_client_instance is not None and hasattr(qdrant_client_instance, 'is_available') and qdrant_client_instance.is_available:
-            # Qdrant is available and working, use it
-            similar_chunks = qdrant_client_instance.search_similar_chunks(
-                query_vector=question_embedding,
-                limit=5  # Get top 5 similar chunks
-            )
-        else:
-            # Qdrant is not available, use local similarity search as fallback
-            logger.warning("Qdrant not available, using local similarity search")
-            similar_chunks = self.find_similar_chunks(question_embedding, top_k=5)
+        Returns:
+            Tuple of (question embeddings, None where the embedding was skipped;
+            retrieved chunks per question), both in question order
+        """
+        top_k = top_k or settings.retrieval_top_k
+        if not settings.hybrid_search_enabled:
+            # Embeddings are cached, so repeated questions skip the API
+            if question_embeddings is None:
+                question_embeddings = await self.embed_questions(questions)
+            return question_embeddings, await self._retrieve_batch(question_embeddings, top_k=top_k, filters=filters)
+
+        keyword_index = embedding_service.keyword_index
+        keyword_results = [keyword_index.search(question, top_k=settings.hybrid_candidates, filters=filters) for question in questions]
+
+        embeddings: List[Optional[List[float]]] = [None] * len(questions)
+        similar_chunk_lists: List[List[Dict]] = [[] for _ in questions]
+        dense_positions = []
+        for position, question in enumerate(questions):
+            if question_embeddings is None and keyword_results[position] and self.answers_from_keywords(question):
+                observability.increment("keyword_short_circuits")
+                similar_chunk_lists[position] = keyword_results[position][:top_k]
+            else:
+                dense_positions.append(position)
 
+        if dense_positions:
+            if question_embeddings is not None:
+                dense_embeddings = [question_embeddings[position] for position in dense_positions]
+            else:
+                dense_embeddings = await self.embed_questions([questions[position] for position in dense_positions])
+            dense_results = await self._retrieve_batch(dense_embeddings, top_k=settings.hybrid_candidates, filters=filters)
+            for position, question_embedding, dense_chunks in zip(dense_positions, dense_embeddings, dense_results):
+                embeddings[position] = question_embedding
+                similar_chunk_lists[position] = self.fuse_results(
+                    [dense_chunks, keyword_results[position]],
+                    top_k=top_k,
+                    k=settings.hybrid_rrf_k
+                )
+
+        return embeddings, similar_chunk_lists
+
+    def answers_from_keywords(self, question: str) -> bool:
+        """
+        Check whether retrieval answers a question from its keyword results alone,
+        without embedding it (see _retrieve_questions).
+        """
+        return (settings.hybrid_search_enabled and settings.keyword_short_circuit_enabled
+                and embedding_service.keyword_index.is_keyword_query(question, max_terms=settings.keyword_short_circuit_max_terms))
+
+    @staticmethod
+    def fuse_results(result_lists: List[List[Dict]], top_k: int = 5, k: int = 60) -> List[Dict]:
+        """
+        Merge ranked result lists by reciprocal rank fusion.
+
+        A chunk scores sum(1 / (k + rank)) over the lists it appears in, so chunks
+        ranked well by several retrievers come first; the raw scores of the
+        retrievers are not comparable and are not used.
+
+        Args:
+            result_lists: Chunk lists, each ordered best first
+            top_k: Number of chunks to return
+            k: Rank smoothing constant
+
+        Returns:
+            The top_k fused chunks, each with an 'rrf_score' key
+        """
+        chunks: Dict[str, Dict] = {}
+        scores: Dict[str, float] = {}
+        for results in result_lists:
+            for rank, chunk in enumerate(results, start=1):
+                chunk_id = str(chunk.get('id'))
+                chunks.setdefault(chunk_id, chunk)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return [{**chunks[chunk_id], 'rrf_score': scores[chunk_id]} for chunk_id in ranked]
+
+    async def _retrieve_batch(
+        self,
+        question_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Retrieve the most similar chunks for each question embedding, from Qdrant when
+        it is available and from the local vector store otherwise, optionally restricted
+        to chunks whose metadata matches filters (e.g. {'source_file': ...}).
+        """
+        return await self.vector_store().search_batch(question_embeddings, limit=top_k, filters=filters)
+
+    def vector_store(self) -> VectorStore:
+        """
+        Get the vector store to search: Qdrant when it is available, the local store otherwise.
+        """
+        if self.qdrant_store.is_available:
+            return self.qdrant_store
+        logger.warning("Qdrant not available, using local similarity search")
+        observability.increment("vector_store_local_fallbacks")
+        return self.local_store
+
+    def _plan_from_chunks(self, question: str, question_embedding: Optional[List[float]], similar_chunks: List[Dict]) -> Dict[str, Any]:
+        """
+        Build the answer plan for a regular question from its retrieved chunks.
+
+        question_embedding is None when retrieval skipped it; the answer cache is then bypassed.
+        """
         if not similar_chunks:
             # No relevant content found in stored embeddings, return appropriate response
             answer = "I couldn't find any relevant content in the book to answer your question."
-            sources = []
-            return answer, sources
+            return self.make_answer_plan([], answer=answer)
+
+        # Near-duplicate questions answered from the same chunks reuse the cached answer
+        chunk_ids = [str(chunk.get('id')) for chunk in similar_chunks]
+        index_version = self.index_version()
+        if self.answer_cache is not None and question_embedding is not None:
+            cached = self.answer_cache.get(question_embedding, chunk_ids, index_version)
+            if cached is not None:
+                return self.make_answer_plan(cached[1], answer=cached[0])
 
         # Safely extract context from similar chunks, filtering any without text content
         context = [chunk['text_content'] for chunk in similar_chunks if chunk.get('text_content')]
@@ -407,10 +990,9 @@ class RagService:
 
             Answer:
             """
-            answer = gemini_client_instance.generate_response(enhanced_prompt)
         else:
             # If no valid context, generate a response without it.
-            answer = gemini_client_instance.generate_response(question)
+            enhanced_prompt = question
 
         # Prepare sources for response
         sources = []
@@ -421,7 +1003,11 @@ class RagService:
                 "text_preview": chunk.get("text_content", "")[:200] + "..." if chunk.get("text_content") else ""
             })
 
-        return answer, sources
+        return self.make_answer_plan(
+            sources,
+            prompt=enhanced_prompt,
+            cache_entry=(question_embedding, chunk_ids, index_version, "rag") if question_embedding is not None else None
+        )
 
 
 # Global instance
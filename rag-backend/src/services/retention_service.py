@@ -0,0 +1,68 @@
+import asyncio
+from typing import Dict, Any
+from src.config.settings import settings
+from src.core import postgres_client as pc_module
+from src.utils.observability import observability
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_postgres_client():
+    """Helper function to get the current postgres client instance."""
+    return pc_module.postgres_client
+
+
+class RetentionService:
+    def __init__(self):
+        pass
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one database maintenance pass: create upcoming query_logs partitions and,
+        if DB_RETENTION_HOURS is set, delete questions, query logs and sessions older than it.
+
+        Returns:
+            Summary of the dropped partitions and deleted rows
+        """
+        postgres_client_instance = get_postgres_client()
+        if postgres_client_instance is None:
+            raise RuntimeError("Postgres client not initialized. Please ensure the application lifespan has run.")
+
+        start_time = observability.start_timer()
+        result = postgres_client_instance.run_maintenance(
+            retention_hours=settings.db_retention_hours,
+            partition_days_ahead=settings.db_partition_days_ahead
+        )
+        elapsed_time = observability.stop_timer(start_time)
+
+        if not result.get('skipped'):
+            observability.observe("db_maintenance_seconds", elapsed_time)
+            observability.increment("db_retention_questions_deleted", result['deleted_questions'])
+            observability.log_info("Database maintenance completed", {"duration_seconds": elapsed_time, **result})
+        return result
+
+    async def run_periodically(self, interval_seconds: float):
+        """
+        Run maintenance every interval_seconds until cancelled, off the event loop.
+
+        A pass in progress when the task is cancelled is finished first, so the
+        caller can close the database pools once the task has stopped.
+
+        Args:
+            interval_seconds: Time between two maintenance passes
+        """
+        while True:
+            maintenance_pass = asyncio.ensure_future(asyncio.to_thread(self.run_once))
+            try:
+                await asyncio.shield(maintenance_pass)
+            except asyncio.CancelledError:
+                await asyncio.gather(maintenance_pass, return_exceptions=True)
+                raise
+            except Exception as e:
+                observability.log_error(f"Database maintenance failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+
+# Global instance
+retention_service = RetentionService()
@@ -1,17 +1,21 @@
 from typing import List, Dict, Any
-from src.core.gemini_client import gemini_client
-from src.core.postgres_client import postgres_client
+from src.core import gemini_client as gc_module
 from src.services.database_service import database_service
 from src.utils.observability import observability
 from src.utils.validation import ValidationUtils
 from src.models.request_models import SelectedTextRequest
 
 
+def get_gemini_client():
+    """Helper function to get the current gemini client instance."""
+    return gc_module.gemini_client
+
+
 class SelectedTextService:
     def __init__(self):
         pass
 
-    def answer_from_selected_text(self, question: str, selected_text: str, session_id: str) -> Dict[str, Any]:
+    async def answer_from_selected_text(self, question: str, selected_text: str, session_id: str) -> Dict[str, Any]:
         """
         Answer a question using only the provided selected text.
 
@@ -52,7 +56,10 @@ class SelectedTextService:
 
             # Generate response using Gemini with the specific prompt
             try:
-                answer = gemini_client.generate_response(prompt)
+                gemini_client_instance = get_gemini_client()
+                if gemini_client_instance is None:
+                    raise RuntimeError("Gemini client not initialized. Please ensure the application lifespan has run.")
+                answer = await gemini_client_instance.generate_response_async(prompt)
             except Exception as e:
                 observability.log_error(
                     f"Gemini response generation failed for selected text, using fallback: {str(e)}",
@@ -62,13 +69,13 @@ class SelectedTextService:
                 answer = "I'm currently unable to process your request due to a service issue. Please try again later."
 
                 # Store the query and response in the database
-                query_id = database_service.store_question({
+                query_id = database_service.queue_question({
                     'text': question,
                     'mode': 'SELECTED_TEXT',
                     'session_id': session_id
                 })
 
-                database_service.store_query_log({
+                database_service.queue_query_log({
                     'question_id': query_id,
                     'response_text': answer,
                     'mode_used': 'SELECTED_TEXT',
@@ -90,13 +97,13 @@ class SelectedTextService:
                 }
 
             # Store the query and response in the database
-            query_id = database_service.store_question({
+            query_id = database_service.queue_question({
                 'text': question,
                 'mode': 'SELECTED_TEXT',
                 'session_id': session_id
             })
 
-            database_service.store_query_log({
+            database_service.queue_query_log({
                 'question_id': query_id,
                 'response_text': answer,
                 'mode_used': 'SELECTED_TEXT',
@@ -127,13 +134,13 @@ class SelectedTextService:
 
             # Store the error in the database
             try:
-                query_id = database_service.store_question({
+                query_id = database_service.queue_question({
                     'text': question,
                     'mode': 'SELECTED_TEXT',
                     'session_id': session_id
                 })
 
-                database_service.store_query_log({
+                database_service.queue_query_log({
                     'question_id': query_id,
                     'response_text': "An error occurred while processing your request.",
                     'mode_used': 'SELECTED_TEXT',
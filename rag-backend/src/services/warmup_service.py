@@ -0,0 +1,149 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src.config.settings import settings
+from src.core import gemini_client as gc_module
+from src.core import postgres_client as pc_module
+from src.core import qdrant_client as qc_module
+from src.services.embedding_service import embedding_service
+from src.services.intent_service import intent_service
+from src.services.rag_service import rag_service
+from src.utils.observability import observability
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Loads the indexes and opens the connections the request path needs before the
+    application takes traffic, and tracks readiness for the /ready probe.
+
+    Required steps are retried until they succeed; the application is ready once
+    all of them have. Optional steps (the database and Qdrant, which have their
+    own fallbacks, and the intent prototypes, without which the intent regexes
+    still work) are attempted once and only reported.
+    """
+
+    REQUIRED_STEPS = ("vector_index", "keyword_index", "chapter_index", "gemini")
+
+    def __init__(self):
+        self.enabled = True
+        self.finished = False
+        # Step name -> {'status': 'ok' | 'failed' | 'skipped', 'seconds', 'detail'}
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every required warm-up step has succeeded."""
+        if not self.enabled:
+            return True
+        return all(self.steps.get(name, {}).get('status') == 'ok' for name in self.REQUIRED_STEPS)
+
+    def disable(self):
+        """Report ready immediately, without warming up."""
+        self.enabled = False
+        self.finished = True
+
+    def status(self) -> Dict[str, Any]:
+        """Get the readiness state and the outcome of every warm-up step."""
+        if self.is_ready:
+            state = "ready"
+        else:
+            state = "not_ready" if self.finished else "warming_up"
+        return {"status": state, "steps": self.steps}
+
+    async def run(self, retry_interval_seconds: float = 10):
+        """
+        Run every warm-up step, then retry the failed required steps until all succeed.
+
+        Args:
+            retry_interval_seconds: Time between two retries of the failed required steps
+        """
+        start_time = observability.start_timer()
+        steps = self._steps()
+        for name, step in steps.items():
+            await self._run_step(name, step)
+        self.finished = True
+
+        while not self.is_ready:
+            await asyncio.sleep(retry_interval_seconds)
+            for name in self.REQUIRED_STEPS:
+                if self.steps[name]['status'] != 'ok':
+                    await self._run_step(name, steps[name])
+
+        elapsed_time = observability.stop_timer(start_time)
+        observability.observe("warmup_seconds", elapsed_time)
+        observability.log_info("Warm-up completed, ready to serve", {"duration_seconds": elapsed_time, "steps": self.steps})
+
+    def _steps(self) -> Dict[str, Callable[[], Awaitable[Optional[str]]]]:
+        """The warm-up steps in execution order; each returns a short detail string."""
+
+        async def vector_index():
+            count = await asyncio.to_thread(len, rag_service.local_store.index)
+            return f"{count} chunks"
+
+        async def keyword_index():
+            count = await asyncio.to_thread(len, embedding_service.keyword_index)
+            return f"{count} chunks"
+
+        async def chapter_index():
+            try:
+                chapters = await asyncio.to_thread(rag_service.load_chapter_info)
+            except FileNotFoundError:
+                # Nothing embedded yet; structural questions fall back to regular RAG
+                return "no chapter list yet"
+            return f"{len(chapters)} chapters"
+
+        async def database():
+            postgres_client_instance = pc_module.postgres_client
+            if postgres_client_instance is None:
+                return None
+            connections = await postgres_client_instance.warm_up(settings.warmup_db_connections)
+            return f"{connections} connections per pool"
+
+        async def qdrant():
+            qdrant_client_instance = qc_module.qdrant_client
+            if qdrant_client_instance is None or not qdrant_client_instance.is_available:
+                return None
+            await qdrant_client_instance.warm_up()
+            return "connected"
+
+        async def gemini():
+            gemini_client_instance = gc_module.gemini_client
+            if gemini_client_instance is None:
+                raise RuntimeError("Gemini client not initialized")
+            await gemini_client_instance.warm_up()
+            return "embedding call succeeded"
+
+        async def intent_prototypes():
+            if not settings.intent_prototypes_enabled:
+                return None
+            count = await intent_service.load_prototypes()
+            return f"{count} prototypes"
+
+        return {
+            "vector_index": vector_index,
+            "keyword_index": keyword_index,
+            "chapter_index": chapter_index,
+            "database": database,
+            "qdrant": qdrant,
+            "gemini": gemini,
+            "intent_prototypes": intent_prototypes
+        }
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Optional[str]]]):
+        """Run one step and record its outcome."""
+        start_time = observability.start_timer()
+        try:
+            detail = await step()
+            status = 'ok' if detail is not None else 'skipped'
+        except Exception as e:
+            status, detail = 'failed', str(e)
+            logger.warning(f"Warm-up step '{name}' failed: {detail}")
+        elapsed_time = observability.stop_timer(start_time)
+        observability.observe(f"warmup_{name}_seconds", elapsed_time)
+        self.steps[name] = {'status': status, 'seconds': round(elapsed_time, 3), 'detail': detail}
+
+
+# Global instance
+warmup_service = WarmupService()
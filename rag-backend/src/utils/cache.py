@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from src.utils.observability import observability
+
+
+class TTLCache:
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: float = 3600):
+        """
+        Initialize a thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+        Args:
+            name: Cache name, used as the prefix of its hit/miss counters
+            max_size: Maximum number of entries; the least recently used entry is evicted first
+            ttl_seconds: Lifetime of an entry in seconds
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                observability.increment(f"{self.name}_cache_hits")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            observability.increment(f"{self.name}_cache_misses")
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size and hit/miss counts of the cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from src.core.chapter_catalog import NUMBER_WORDS
+from src.utils.observability import observability
+
+
+GREETING = "greeting"
+STRUCTURAL = "structural"
+CHAPTER = "chapter"
+BOOK_MENTOR = "book_mentor"
+RAG = "rag"
+
+# Whole-message greetings; trailing punctuation is ignored
+GREETING_PHRASES = [
+    "hi", "hello", "hey", "greetings", "good morning", "good afternoon",
+    "good evening", "what's up", "whats up", "howdy", "hi there",
+    "hello there", "hey there", "good day", "how are you", "how do you do",
+    "yo", "sup", "what's good", "what's happening", "what's new",
+    "hiya", "hola", "bonjour", "ciao", "gday", "morning", "afternoon",
+    "evening", "salutations", "top of the morning", "ahoy", "howdy do",
+    "how are you doing", "how's it going", "how goes it", "howdy partner",
+    "what's cracking", "what's shaking", "in the neighborhood", "yello"
+]
+
+# Questions about the organization of the book, answered from the chapter list
+STRUCTURAL_PATTERNS = [
+    r"how many (?:chapters|sections|parts)",
+    r"number of chapters",
+    r"(?:list|show|name)(?: me)?(?: all)?(?: the)? (?:chapters|sections|parts)",
+    r"(?:what|which|all)(?: the)? chapters",
+    r"(?:what|which) are(?: all)? the chapters",
+    r"(?:sections|parts) of (?:the|this) book",
+    r"table of contents",
+    r"book structure",
+    r"structure of (?:the|this) book",
+    r"(?:summary|overview|summari[sz]e)(?: of)? (?:the|this|the whole) book",
+    r"book (?:summary|overview)",
+]
+
+# Questions about the book itself and how to study it, rather than its subject
+# matter; topic questions ("what is ZMP?") are answered by retrieval instead.
+# Advice words only count next to reading or studying the book, so "tips for
+# tuning a PID controller" or "the case study on ZMP walking" stay RAG questions.
+BOOK_READING = r"(?:read(?:ing)?|study(?:ing)?|learn(?:ing)? from|approach(?:ing)?|get(?:ting)? through|us(?:e|ing)|start(?:ing)?(?: with)?) (?:the|this) book"
+BOOK_MENTOR_PATTERNS = [
+    r"why (?:is|was) this book", r"purpose of (?:the|this) book", r"intended for",
+    r"who is (?:the|this) book for", r"aim of (?:the|this) book", r"goals? of (?:the|this) book",
+    r"target audience", r"who should read", r"what is (?:the|this) book about",
+    r"book (?:objectives?|goals?)", r"what is the purpose", r"why (?:was )?(?:the |this )?book written",
+    r"book written for", r"(?:importance|value|benefits?) of (?:reading )?(?:the|this) book",
+    r"how (?:should|do|can|could) i (?:read|study|learn|approach|use|master|get through) (?:the|this) book",
+    r"how to (?:read|study|approach|master|get started|learn from)",
+    r"where (?:should|do|can) i (?:start|begin)",
+    r"study (?:plan|tips|strategy|strategies|guide|schedule)",
+    r"(?:reading|learning) (?:plan|path|order|strategy|schedule|roadmap)",
+    r"(?:tips|advice|suggestions?|recommendations?) (?:for|on|about) (?:how to )?" + BOOK_READING,
+    r"(?:would|do|did) you (?:recommend|advise) (?:reading )?(?:the|this) book",
+    r"recommended (?:reading )?(?:order|pace|path|schedule) (?:for|of) (?:the|this) book",
+    r"prerequisites? (?:for|of|to|before) (?:" + BOOK_READING + r"|(?:the|this) book)",
+    r"background(?: knowledge)? (?:is )?(?:needed|required) (?:for|to) (?:" + BOOK_READING + r"|(?:the|this) book)",
+    r"(?:is|was) (?:the|this) book (?:good |suitable |right |meant )?for (?:a )?(?:beginners?|newcomers?|novices?)",
+    r"(?:syllabus|curriculum|roadmap) (?:for|based on) (?:" + BOOK_READING + r"|(?:the|this) book)",
+    r"(?:should|do) i (?:do|try|work through) the exercises", r"at what pace (?:should|do|can) i",
+]
+
+# "chapter 13", "chapter five", "chapter on (the) robot locomotion"; a topic
+# reference runs to the end of the clause or to the verb that follows it
+# ("what does the chapter on robot locomotion cover?")
+CHAPTER_REFERENCE_PATTERN = re.compile(
+    r"\bchapter\s+(?:(?:on|about)\s+(?:the\s+)?([a-z0-9][a-z0-9\s'-]*?)"
+    r"(?=\s*(?:[?!.,;:]|$)|\s+(?:please|and|in detail|about|is|are|was|does|do|says?|covers?|discuss(?:es)?"
+    r"|explains?|describes?|mentions?|talks?|teach(?:es)?)\b)|(\d+|" + "|".join(NUMBER_WORDS) + r")\b)"
+)
+
+
+def _compile_alternation(patterns: List[str]) -> "re.Pattern":
+    """Compile patterns into one case-insensitive alternation matched on word boundaries."""
+    return re.compile(r"\b(?:" + "|".join(f"(?:{pattern})" for pattern in patterns) + r")\b", re.IGNORECASE)
+
+
+class IntentRouter:
+    """
+    Classifies a message into one intent with regexes compiled once.
+
+    Every intent is a single alternation matched on word boundaries, so short
+    terms no longer match inside longer words. Intents are tried in priority
+    order (greeting, structural, book mentor) and anything else is a regular
+    RAG question. Structural questions naming a chapter, and other questions
+    that reference one by number or topic ("summarize chapter 5", "what does
+    the chapter on locomotion cover?"), are classified as CHAPTER.
+    """
+
+    def __init__(self):
+        self._greeting = re.compile(
+            r"(?:" + "|".join(re.escape(phrase) for phrase in GREETING_PHRASES) + r")[\s!.,?]*",
+            re.IGNORECASE
+        )
+        self._intents: List[Tuple[str, "re.Pattern"]] = [
+            (STRUCTURAL, _compile_alternation(STRUCTURAL_PATTERNS)),
+            (BOOK_MENTOR, _compile_alternation(BOOK_MENTOR_PATTERNS)),
+        ]
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def classify(self, message: str) -> str:
+        """
+        Classify a message.
+
+        Args:
+            message: The user's message
+
+        Returns:
+            One of GREETING, STRUCTURAL, CHAPTER, BOOK_MENTOR or RAG
+        """
+        start = time.perf_counter()
+        intent = self._match(message)
+        elapsed = time.perf_counter() - start
+
+        observability.increment(f"intent_{intent}_hits")
+        observability.observe(f"intent_{intent}_seconds", elapsed)
+        with self._lock:
+            stats = self._stats.setdefault(intent, {"hits": 0, "seconds": 0.0})
+            stats["hits"] += 1
+            stats["seconds"] += elapsed
+        return intent
+
+    def _match(self, message: str) -> str:
+        normalized_message = " ".join((message or "").split())
+        if not normalized_message:
+            return RAG
+        if self._greeting.fullmatch(normalized_message):
+            return GREETING
+        for intent, pattern in self._intents:
+            if pattern.search(normalized_message):
+                if intent == STRUCTURAL and self.chapter_reference(normalized_message):
+                    return CHAPTER
+                return intent
+        if self.chapter_reference(normalized_message):
+            # "summarize chapter 5", "what does the chapter on locomotion cover?"
+            return CHAPTER
+        return RAG
+
+    def is_structural(self, question: str) -> bool:
+        """Check whether a question is about the book's structure or a chapter, without recording stats."""
+        return self._match(question) in (STRUCTURAL, CHAPTER)
+
+    @staticmethod
+    def chapter_reference(question: str) -> Optional[str]:
+        """
+        Extract the chapter a question refers to.
+
+        Returns:
+            The lowercased chapter number or number word after "chapter", the whole
+            topic after "chapter on/about", or None
+        """
+        match = CHAPTER_REFERENCE_PATTERN.search(question.lower())
+        if not match:
+            return None
+        return " ".join((match.group(1) or match.group(2)).split())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the hit count and mean classification latency of every intent."""
+        with self._lock:
+            return {
+                intent: {
+                    "hits": stats["hits"],
+                    "mean_latency_ms": stats["seconds"] * 1000 / stats["hits"]
+                }
+                for intent, stats in self._stats.items()
+            }
+
+
+# Global instance, compiled at import time
+intent_router = IntentRouter()
@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional
 import time
 from contextlib import contextmanager
 import json
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +14,11 @@ logger = logging.getLogger(__name__)
 class Observability:
     def __init__(self):
         self.metrics = {}
+        # Aggregated, bounded-size metrics for hot paths
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.summaries: Dict[str, Dict[str, float]] = {}
+        self.gauges: Dict[str, float] = {}
     
     def log_info(self, message: str, extra: Optional[Dict[str, Any]] = None):
         """Log an info message with optional extra context."""
@@ -77,6 +83,37 @@ class Observability:
     def get_metrics(self) -> Dict[str, Any]:
         """Get all collected metrics."""
         return self.metrics.copy()
+
+    def increment(self, name: str, value: float = 1):
+        """Increment a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Record a value into a running count/sum/min/max summary."""
+        with self._lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                self.summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get a snapshot of all counters, summaries and gauges."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "summaries": {name: dict(summary) for name, summary in self.summaries.items()},
+                "gauges": dict(self.gauges)
+            }
     
     def track_response_quality(self, query: str, response: str, context_used: list, score: float) -> bool:
         """
@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        """
+        Initialize a thread-safe token-bucket rate limiter.
+
+        Args:
+            rate_per_second: Tokens added to the bucket per second; 0 or less means unlimited
+                             (only pauses are enforced)
+            capacity: Maximum number of tokens the bucket can hold (burst size)
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last refill."""
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1):
+        """
+        Block until the requested number of tokens is available, then take them.
+
+        Args:
+            tokens: Number of tokens to take
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.rate_per_second <= 0:
+                    return
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait = (tokens - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for the given duration, e.g. after a 429 response.
+
+        Args:
+            seconds: How long every caller should back off
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            # Do not let a burst through as soon as the pause ends
+            self._tokens = 0
+            self._last_refill = now + seconds
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import numpy as np
+from src.utils.observability import observability
+
+
+class SemanticAnswerCache:
+    def __init__(self, name: str, max_size: int = 512, similarity_threshold: float = 0.95):
+        """
+        Initialize a size-bounded answer cache looked up by question-embedding similarity.
+
+        An entry is reused when a new question's embedding is within the cosine
+        similarity threshold of a cached question AND it was answered from the same
+        retrieved chunk set under the same index version and scope.
+
+        Args:
+            name: Cache name, used as the prefix of its hit/miss counters
+            max_size: Maximum number of entries; the least recently used entry is evicted first
+            similarity_threshold: Minimum cosine similarity between question embeddings
+        """
+        self.name = name
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # Stacked normalized embeddings of all entries, rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector_norm = np.linalg.norm(vector)
+        if vector_norm == 0:
+            return None
+        return vector / vector_norm
+
+    def _stacked(self) -> Tuple[Optional[np.ndarray], List[int]]:
+        if self._matrix is None and self._entries:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[entry_id]['embedding'] for entry_id in self._matrix_ids])
+        return self._matrix, self._matrix_ids
+
+    def get(
+        self,
+        embedding: List[float],
+        chunk_ids: Iterable[str],
+        version: Hashable,
+        scope: str = "rag"
+    ) -> Optional[Tuple[str, list]]:
+        """
+        Look up a cached answer.
+
+        Args:
+            embedding: Embedding of the new question
+            chunk_ids: Ids of the chunks retrieved for the new question
+            version: Index version the chunks were retrieved from (e.g. book version + store generation)
+            scope: Answering path the entry belongs to
+
+        Returns:
+            (answer, sources) of the matching entry, or None on a miss
+        """
+        query = self._normalize(embedding)
+        chunk_set = frozenset(chunk_ids)
+
+        with self._lock:
+            matrix, matrix_ids = self._stacked()
+            if query is not None and matrix is not None and matrix.shape[1] == query.shape[0]:
+                scores = matrix @ query
+                for position in np.argsort(-scores):
+                    if scores[position] < self.similarity_threshold:
+                        break
+                    entry_id = matrix_ids[position]
+                    entry = self._entries[entry_id]
+                    if entry['chunk_ids'] == chunk_set and entry['version'] == version and entry['scope'] == scope:
+                        self._entries.move_to_end(entry_id)
+                        observability.increment(f"{self.name}_cache_hits")
+                        return entry['answer'], [dict(source) for source in entry['sources']]
+
+        observability.increment(f"{self.name}_cache_misses")
+        return None
+
+    def set(
+        self,
+        embedding: List[float],
+        chunk_ids: Iterable[str],
+        version: Hashable,
+        answer: str,
+        sources: list,
+        scope: str = "rag"
+    ):
+        """
+        Cache an answer, evicting the least recently used entries if full.
+
+        Args:
+            embedding: Embedding of the answered question
+            chunk_ids: Ids of the chunks the answer was generated from
+            version: Index version the chunks were retrieved from
+            answer: The generated answer
+            sources: The sources returned with the answer
+            scope: Answering path the entry belongs to
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            self._entries[self._next_id] = {
+                'embedding': vector,
+                'chunk_ids': frozenset(chunk_ids),
+                'version': version,
+                'scope': scope,
+                'answer': answer,
+                'sources': [dict(source) for source in sources]
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        """Remove every entry, e.g. after the book has been re-embedded."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,6 +1,19 @@
 import re
+import hashlib
 from typing import List, Tuple
-from uuid import uuid4
+from uuid import UUID
+
+
+def make_chunk_id(source_file: str, text: str, book_version: str) -> str:
+    """
+    Build a deterministic chunk id from the source file, the chunk text and the book version.
+
+    The id is a UUID-formatted SHA-256 prefix, so it is accepted as a Qdrant point id
+    and stays stable across re-indexing runs while the text is unchanged. Including the
+    version keeps identical passages of different book versions apart in one collection.
+    """
+    digest = hashlib.sha256(f"{source_file}\x00{text}\x00{book_version}".encode('utf-8')).hexdigest()
+    return str(UUID(digest[:32]))
 
 
 class TextProcessor:
@@ -44,7 +57,7 @@ class TextProcessor:
             if current_chunk_word_count + sentence_word_count > self.chunk_size and current_chunk:
                 # Save the current chunk
                 chunks.append({
-                    'id': str(uuid4()),
+                    'id': make_chunk_id(source_file, current_chunk.strip(), book_version),
                     'text_content': current_chunk.strip(),
                     'chapter_title': chapter_title,
                     'source_file': source_file,
@@ -65,7 +78,7 @@ class TextProcessor:
         # Add the last chunk if it has content
         if current_chunk.strip():
             chunks.append({
-                'id': str(uuid4()),
+                'id': make_chunk_id(source_file, current_chunk.strip(), book_version),
                 'text_content': current_chunk.strip(),
                 'chapter_title': chapter_title,
                 'source_file': source_file,
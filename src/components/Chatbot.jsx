@@ -10,7 +10,7 @@ const Chatbot = () => {
   const inputRef = useRef(null);
 
   // Adjust this if your backend is on a different port/host
-  const API_ENDPOINT = 'http://localhost:8000/api/v1/chat/';
+  const API_ENDPOINT = 'http://localhost:8000/api/v1/chat/stream';
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -38,6 +38,19 @@ const Chatbot = () => {
     setIsLoading(true);
     setIsTyping(true);
 
+    // Set once the agent message exists; later errors update it instead of adding another bubble
+    let agentMessageAdded = false;
+    const updateAgentMessage = (update) => {
+      setMessages((prevMessages) => {
+        const lastMessage = prevMessages[prevMessages.length - 1];
+        return [...prevMessages.slice(0, -1), { ...lastMessage, text: update(lastMessage.text) }];
+      });
+    };
+    // Replace an empty agent message with the error, or keep a partial answer and append the error to it
+    const showAgentError = (message) => {
+      updateAgentMessage((text) => (text ? `${text} (${message})` : message));
+    };
+
     try {
       const requestBody = {
         message: newUserMessage.text
@@ -52,6 +65,7 @@ const Chatbot = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': 'text/event-stream',
         },
         body: JSON.stringify(requestBody),
       });
@@ -61,31 +75,75 @@ const Chatbot = () => {
         throw new Error(errorData.detail || 'Something went wrong!');
       }
 
-      const data = await response.json();
+      // Append an empty agent message and grow it as tokens arrive
+      setMessages((prevMessages) => [...prevMessages, { text: '', sender: 'agent' }]);
+      agentMessageAdded = true;
 
-      // Update session ID if returned from backend
-      if (data.session_id) {
-        setSessionId(data.session_id);
-      }
+      let answer = '';
+      const handleEvent = (eventName, data) => {
+        if (eventName === 'token') {
+          if (!answer) {
+            setIsTyping(false);
+          }
+          answer += data;
+          updateAgentMessage((text) => text + data);
+        } else if (eventName === 'done') {
+          // Update session ID if returned from backend
+          if (data.session_id) {
+            setSessionId(data.session_id);
+          }
+          if (answer === "The book is currently unavailable.") {
+            updateAgentMessage(() => "The chatbot is not configured correctly. Please make sure you have added your Gemini API key to the .env file in the backend.");
+          }
+        } else if (eventName === 'error') {
+          if (data.session_id) {
+            setSessionId(data.session_id);
+          }
+          setIsTyping(false);
+          showAgentError(data.message);
+        }
+      };
 
-      // Simulate typing delay for better UX
-      setTimeout(() => {
-        let agentResponse;
-        if (data.response === "The book is currently unavailable.") {
-          agentResponse = { text: "The chatbot is not configured correctly. Please make sure you have added your Gemini API key to the .env file in the backend.", sender: 'agent' };
-        } else {
-          agentResponse = { text: data.response, sender: 'agent' };
+      // Parse the Server-Sent Events stream: events are separated by a blank line
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let separatorIndex;
+        while ((separatorIndex = buffer.indexOf('\n\n')) !== -1) {
+          const rawEvent = buffer.slice(0, separatorIndex);
+          buffer = buffer.slice(separatorIndex + 2);
+
+          let eventName = 'message';
+          const dataLines = [];
+          rawEvent.split('\n').forEach((line) => {
+            if (line.startsWith('event:')) {
+              eventName = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+              dataLines.push(line.slice(5).trim());
+            }
+          });
+          if (dataLines.length) {
+            handleEvent(eventName, JSON.parse(dataLines.join('\n')));
+          }
         }
-        setMessages((prevMessages) => [...prevMessages, agentResponse]);
-        setIsTyping(false);
-      }, 500); // Add a small delay to simulate typing
+      }
+      setIsTyping(false);
     } catch (error) {
       console.error('Error sending message:', error);
       setIsTyping(false);
-      setMessages((prevMessages) => [
-        ...prevMessages,
-        { text: `Error: ${error.message}`, sender: 'agent' },
-      ]);
+      if (agentMessageAdded) {
+        showAgentError(`Error: ${error.message}`);
+      } else {
+        setMessages((prevMessages) => [
+          ...prevMessages,
+          { text: `Error: ${error.message}`, sender: 'agent' },
+        ]);
+      }
     } finally {
       setIsLoading(false);
     }